@@ -0,0 +1 @@
+# Offline RAG benchmark suite
\ No newline at end of file
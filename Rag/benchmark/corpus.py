@@ -0,0 +1,179 @@
+"""
+Synthetic corpus generator for the offline RAG benchmark
+"""
+import csv
+import io
+import json
+import random
+import textwrap
+from typing import List, Dict, Any
+
+SUPPORTED_FORMATS = ("pdf", "docx", "xlsx", "csv", "json")
+
+_VOCABULARY = (
+    "market customer revenue growth strategy product platform team quarter budget "
+    "pipeline service partner channel pricing forecast margin operations delivery "
+    "roadmap launch feedback retention analytics infrastructure security compliance "
+    "hiring training support onboarding region segment contract renewal milestone "
+    "investment risk supplier inventory logistics campaign brand research design "
+    "prototype release quality process review target metric dashboard workflow "
+    "automation integration migration capacity performance latency reliability"
+).split()
+
+_SYLLABLES = ("ka", "zor", "vex", "lin", "tor", "mi", "qua", "dra", "sel", "pho", "rin", "gal", "bex", "nu", "tav")
+
+
+def fact_sentence(codename: str, code: str) -> str:
+    """Sentence planted in a document; retrieval must find the chunk containing it"""
+    return f"The access code for project {codename} is {code}."
+
+
+def fact_query(codename: str) -> str:
+    """Question whose answer is the planted fact sentence"""
+    return f"What is the access code for project {codename}?"
+
+
+def generate_corpus(
+    docs_per_format: int = 3,
+    paragraphs_per_doc: int = 40,
+    facts_per_doc: int = 5,
+    formats: tuple = SUPPORTED_FORMATS,
+    seed: int = 42
+) -> List[Dict[str, Any]]:
+    """
+    Generate a deterministic corpus of binary documents with planted facts
+
+    Args:
+        docs_per_format: Number of documents generated for each format
+        paragraphs_per_doc: Number of filler paragraphs per document
+        facts_per_doc: Number of fact sentences planted per document
+        formats: File formats to generate (subset of SUPPORTED_FORMATS)
+        seed: Random seed; the same seed always yields byte-identical text
+
+    Returns:
+        List of dictionaries with filename, file_type, content (bytes) and facts
+    """
+    rng = random.Random(seed)
+    used_codenames = set()
+    corpus = []
+
+    for file_type in formats:
+        if file_type not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported benchmark format: {file_type}")
+
+        for doc_index in range(docs_per_format):
+            paragraphs = [_paragraph(rng) for _ in range(paragraphs_per_doc)]
+            facts = []
+
+            for _ in range(facts_per_doc):
+                codename = _codename(rng, used_codenames)
+                code = str(rng.randint(100000, 999999))
+                facts.append({"codename": codename, "code": code})
+
+                # Plant the fact at a random paragraph boundary
+                paragraphs.insert(rng.randint(0, len(paragraphs)), fact_sentence(codename, code))
+
+            filename = f"benchmark_{file_type}_{doc_index + 1}.{file_type}"
+            corpus.append({
+                "filename": filename,
+                "file_type": file_type,
+                "content": _WRITERS[file_type](paragraphs, filename),
+                "facts": facts
+            })
+
+    print(f"✅ Generated synthetic corpus: {len(corpus)} documents ({', '.join(formats)})")
+    return corpus
+
+
+def _paragraph(rng: random.Random) -> str:
+    sentences = []
+    for _ in range(rng.randint(3, 6)):
+        words = [rng.choice(_VOCABULARY) for _ in range(rng.randint(8, 16))]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return " ".join(sentences)
+
+
+def _codename(rng: random.Random, used: set) -> str:
+    while True:
+        codename = "".join(rng.choice(_SYLLABLES) for _ in range(3))
+        if codename not in used:
+            used.add(codename)
+            return codename
+
+
+def _write_pdf(paragraphs: List[str], filename: str) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    y = height - 50
+
+    for paragraph in paragraphs:
+        for line in textwrap.wrap(paragraph, width=90) + [""]:
+            if y < 50:
+                pdf.showPage()
+                y = height - 50
+            pdf.drawString(50, y, line)
+            y -= 14
+
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _write_docx(paragraphs: List[str], filename: str) -> bytes:
+    import docx
+
+    document = docx.Document()
+    document.add_heading(filename, level=1)
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _write_xlsx(paragraphs: List[str], filename: str) -> bytes:
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Notes"
+    sheet.append(["id", "section", "note"])
+    for index, paragraph in enumerate(paragraphs):
+        sheet.append([index + 1, f"Section {index // 10 + 1}", paragraph])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _write_csv(paragraphs: List[str], filename: str) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "section", "note"])
+    for index, paragraph in enumerate(paragraphs):
+        writer.writerow([index + 1, f"Section {index // 10 + 1}", paragraph])
+    return buffer.getvalue().encode("utf-8")
+
+
+def _write_json(paragraphs: List[str], filename: str) -> bytes:
+    data = {
+        "title": filename,
+        "sections": [
+            {"heading": f"Section {index + 1}", "body": paragraph}
+            for index, paragraph in enumerate(paragraphs)
+        ]
+    }
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+_WRITERS = {
+    "pdf": _write_pdf,
+    "docx": _write_docx,
+    "xlsx": _write_xlsx,
+    "csv": _write_csv,
+    "json": _write_json
+}
@@ -0,0 +1,182 @@
+"""
+Deterministic offline stand-ins for the OpenAI embedding service and Pinecone
+"""
+import asyncio
+import hashlib
+import math
+import re
+import time
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, Tuple
+
+
+class HashEmbeddingService:
+    """
+    Hash-based embedder with the same async interface as EmbeddingService.
+
+    Each distinct lowercase word is hashed into one of `dimension` buckets with a +/-1
+    sign (feature hashing), and the result is L2-normalized. Identical text always yields
+    the same vector, and texts sharing more distinct words score higher under cosine
+    similarity, so retrieval quality can be measured without calling OpenAI.
+    """
+
+    def __init__(self, dimension: int = 3072, latency: float = 0.0):
+        """
+        Args:
+            dimension: Embedding dimension (3072 matches text-embedding-3-large)
+            latency: Simulated seconds per embedding request
+        """
+        self.dimension = dimension
+        self.latency = latency
+        self.requests = 0
+
+    def embed_text(self, text: str) -> List[float]:
+        """Embed a single text synchronously"""
+        vector = [0.0] * self.dimension
+
+        for token in set(re.findall(r"\w+", text.lower())):
+            digest = hashlib.md5(token.encode()).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimension
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm:
+            vector = [value / norm for value in vector]
+
+        return vector
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Generate embedding for a single text"""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.embed_text(text)
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for multiple texts in one simulated request"""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self.embed_text(text) for text in texts]
+
+
+class InMemoryVectorStore:
+    """
+    In-memory vector store with the subset of the PineconeService interface used by RAG.
+
+    Queries are exact cosine-similarity scans, and responses mimic the Pinecone client
+    objects (`response.matches[i].id / .score / .metadata`).
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Simulated seconds per upsert request
+        """
+        self.latency = latency
+        self.namespaces: Dict[Optional[str], Dict[str, Tuple[List[float], Dict[str, Any]]]] = {}
+        self.requests = 0
+
+    def upsert_vectors(
+        self,
+        vectors: List[Tuple[str, List[float], Dict[str, Any]]],
+        namespace: Optional[str] = None,
+        batch_size: int = 100
+    ) -> Dict[str, Any]:
+        """Store (id, embedding, metadata) tuples"""
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        store = self.namespaces.setdefault(namespace, {})
+        for vector_id, embedding, metadata in vectors:
+            store[vector_id] = (embedding, metadata)
+
+        return {
+            "upserted_count": len(vectors),
+            "total_batches": (len(vectors) + batch_size - 1) // batch_size,
+            "failed_batches": 0
+        }
+
+    def query_vectors(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ):
+        """Return the top_k most similar vectors in a namespace"""
+        scored = []
+
+        for vector_id, (embedding, metadata) in self.namespaces.get(namespace, {}).items():
+            if filter_metadata and not _matches_filter(metadata, filter_metadata):
+                continue
+            score = sum(a * b for a, b in zip(query_embedding, embedding))
+            scored.append((score, vector_id, metadata))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        return SimpleNamespace(matches=[
+            SimpleNamespace(id=vector_id, score=score, metadata=metadata if include_metadata else None)
+            for score, vector_id, metadata in scored[:top_k]
+        ])
+
+    def delete_vectors(self, vector_ids: List[str], namespace: Optional[str] = None) -> Dict[str, Any]:
+        """Delete vectors by ID"""
+        store = self.namespaces.get(namespace, {})
+        for vector_id in vector_ids:
+            store.pop(vector_id, None)
+        return {}
+
+    def delete_namespace(self, namespace: str) -> Dict[str, Any]:
+        """Delete an entire namespace"""
+        self.namespaces.pop(namespace, None)
+        return {}
+
+    def get_index_stats(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """Get vector counts per namespace"""
+        return {
+            "total_vector_count": sum(len(store) for store in self.namespaces.values()),
+            "namespaces": {ns: len(store) for ns, store in self.namespaces.items()}
+        }
+
+
+def _matches_filter(metadata: Dict[str, Any], filter_metadata: Dict[str, Any]) -> bool:
+    """Evaluate the Pinecone metadata filter operators used by the RAG service"""
+    for key, condition in filter_metadata.items():
+        if key == "$and":
+            if not all(_matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(_matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for operator, operand in condition.items():
+            if operator == "$eq" and value != operand:
+                return False
+            if operator == "$ne" and value == operand:
+                return False
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$nin" and value in operand:
+                return False
+            if operator in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if operator == "$gt" and not value > operand:
+                    return False
+                if operator == "$gte" and not value >= operand:
+                    return False
+                if operator == "$lt" and not value < operand:
+                    return False
+                if operator == "$lte" and not value <= operand:
+                    return False
+
+    return True
@@ -0,0 +1,354 @@
+"""
+Offline RAG ingestion and retrieval benchmark
+
+Runs the real document processor, chunker, tokenizer and ingestion pipeline against a
+synthetic corpus, with a deterministic hash embedder and an in-memory vector store in
+place of OpenAI and Pinecone. No API keys or network access are needed, apart from the
+tiktoken encoding file, which must already be cached locally.
+
+Usage:
+    python -m Rag.benchmark.run --save Rag/benchmark/baselines/main.json
+    python -m Rag.benchmark.run --compare Rag/benchmark/baselines/main.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+# EmbeddingService validates the key at import time; the benchmark never calls OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+from Rag.benchmark.corpus import SUPPORTED_FORMATS, generate_corpus, fact_query
+from Rag.benchmark.fakes import HashEmbeddingService, InMemoryVectorStore
+from Rag.services.document_processor import document_processor
+from Rag.services.embedding_service import embedding_service
+from Rag.services.ingestion_pipeline import IngestionPipeline
+
+NAMESPACE = "benchmark"
+
+# Metrics compared against a saved baseline: (path, higher_is_better)
+TRACKED_METRICS = [
+    (("stages", "extract", "docs_per_second"), True),
+    (("stages", "extract", "mb_per_second"), True),
+    (("stages", "chunk", "chunks_per_second"), True),
+    (("stages", "tokenize", "tokens_per_second"), True),
+    (("stages", "embed", "chunks_per_second"), True),
+    (("stages", "upsert", "vectors_per_second"), True),
+    (("ingestion", "chunks_per_second"), True),
+    (("retrieval", "latency_ms", "p50"), False),
+    (("retrieval", "latency_ms", "p95"), False),
+    (("retrieval", "latency_ms", "p99"), False),
+    (("retrieval", "recall_at_k"), True),
+]
+
+
+async def run_benchmark(
+    docs_per_format: int = 3,
+    paragraphs_per_doc: int = 40,
+    facts_per_doc: int = 5,
+    formats: tuple = SUPPORTED_FORMATS,
+    top_k: int = 5,
+    dimension: int = 3072,
+    embed_latency: float = 0.0,
+    upsert_latency: float = 0.0,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Run the full offline benchmark
+
+    Args:
+        docs_per_format: Number of synthetic documents per file format
+        paragraphs_per_doc: Number of filler paragraphs per document
+        facts_per_doc: Number of planted facts (and therefore queries) per document
+        formats: File formats to include in the corpus
+        top_k: Number of results retrieved per query (the k in recall@k)
+        dimension: Fake embedding dimension
+        embed_latency: Simulated seconds per embedding request
+        upsert_latency: Simulated seconds per upsert request
+        seed: Corpus random seed
+
+    Returns:
+        Dictionary with configuration, per-stage throughput, ingestion and retrieval results
+    """
+    corpus = generate_corpus(docs_per_format, paragraphs_per_doc, facts_per_doc, formats, seed)
+    embedder = HashEmbeddingService(dimension=dimension, latency=embed_latency)
+    vector_store = InMemoryVectorStore(latency=upsert_latency)
+    pipeline = IngestionPipeline(embedder=embedder, vector_store=vector_store)
+
+    # Extract
+    extracted = []
+    extract_seconds = 0.0
+    total_bytes = 0
+    for document in corpus:
+        start = time.perf_counter()
+        result = document_processor.extract_text_from_file(document["content"], document["filename"])
+        extract_seconds += time.perf_counter() - start
+        total_bytes += len(document["content"])
+        extracted.append((document, result["text"]))
+
+    # Chunk (iter_chunks also counts tokens per chunk, as in production)
+    chunk_seconds = 0.0
+    chunk_texts = []
+    for _, text in extracted:
+        start = time.perf_counter()
+        chunk_texts.extend(chunk["content"] for chunk in embedding_service.iter_chunks(text))
+        chunk_seconds += time.perf_counter() - start
+
+    # Tokenize
+    start = time.perf_counter()
+    total_tokens = sum(embedding_service.count_tokens(text) for text in chunk_texts)
+    tokenize_seconds = time.perf_counter() - start
+
+    # Embed + upsert through the streaming pipeline, one run per document as in RAGService
+    ingestion_start = time.perf_counter()
+    embed_seconds = 0.0
+    upsert_seconds = 0.0
+    total_chunks = 0
+    for doc_id, (document, text) in enumerate(extracted, start=1):
+        stats = await pipeline.run(
+            chunks=embedding_service.iter_chunks(text),
+            namespace=NAMESPACE,
+            build_vector=lambda chunk, embedding, doc_id=doc_id, document=document: (
+                f"doc_{doc_id}_chunk_{chunk['chunk_index']}",
+                embedding,
+                {
+                    "document_id": doc_id,
+                    "filename": document["filename"],
+                    "file_type": document["file_type"],
+                    "chunk_index": chunk["chunk_index"],
+                    "content": chunk["content"]
+                }
+            )
+        )
+        embed_seconds += stats["stage_seconds"]["embed"]
+        upsert_seconds += stats["stage_seconds"]["upsert"]
+        total_chunks += stats["chunks"]
+    ingestion_seconds = time.perf_counter() - ingestion_start
+
+    # Retrieval
+    latencies = []
+    hits = 0
+    queries = [fact for document in corpus for fact in document["facts"]]
+    for fact in queries:
+        start = time.perf_counter()
+        query_embedding = await embedder.generate_embedding(fact_query(fact["codename"]))
+        response = vector_store.query_vectors(query_embedding, top_k=top_k, namespace=NAMESPACE)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        needle = f"project {fact['codename']} is {fact['code']}"
+        if any(needle in match.metadata.get("content", "") for match in response.matches):
+            hits += 1
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "config": {
+            "docs_per_format": docs_per_format,
+            "paragraphs_per_doc": paragraphs_per_doc,
+            "facts_per_doc": facts_per_doc,
+            "formats": list(formats),
+            "top_k": top_k,
+            "dimension": dimension,
+            "embed_latency": embed_latency,
+            "upsert_latency": upsert_latency,
+            "seed": seed
+        },
+        "corpus": {
+            "documents": len(corpus),
+            "bytes": total_bytes,
+            "chunks": total_chunks,
+            "tokens": total_tokens
+        },
+        "stages": {
+            "extract": {
+                "seconds": extract_seconds,
+                "docs_per_second": _rate(len(corpus), extract_seconds),
+                "mb_per_second": _rate(total_bytes / (1024 * 1024), extract_seconds)
+            },
+            "chunk": {
+                "seconds": chunk_seconds,
+                "chunks_per_second": _rate(len(chunk_texts), chunk_seconds)
+            },
+            "tokenize": {
+                "seconds": tokenize_seconds,
+                "tokens_per_second": _rate(total_tokens, tokenize_seconds)
+            },
+            "embed": {
+                "seconds": embed_seconds,
+                "chunks_per_second": _rate(total_chunks, embed_seconds)
+            },
+            "upsert": {
+                "seconds": upsert_seconds,
+                "vectors_per_second": _rate(total_chunks, upsert_seconds)
+            }
+        },
+        "ingestion": {
+            "wall_seconds": ingestion_seconds,
+            "chunks_per_second": _rate(total_chunks, ingestion_seconds)
+        },
+        "retrieval": {
+            "queries": len(queries),
+            "top_k": top_k,
+            "recall_at_k": hits / len(queries) if queries else 0.0,
+            "latency_ms": {
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "p99": _percentile(latencies, 99),
+                "max": max(latencies) if latencies else 0.0
+            }
+        }
+    }
+
+
+def save_baseline(results: Dict[str, Any], path: str):
+    """Write benchmark results to a JSON baseline file"""
+    baseline_path = Path(path)
+    baseline_path.parent.mkdir(parents=True, exist_ok=True)
+    baseline_path.write_text(json.dumps(results, indent=2))
+    print(f"💾 Saved baseline to {baseline_path}")
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compare results against a baseline
+
+    Args:
+        results: Current benchmark results
+        baseline: Previously saved benchmark results
+        tolerance: Relative change allowed before a metric counts as regressed
+
+    Returns:
+        List of per-metric comparisons with a `regressed` flag
+    """
+    comparisons = []
+
+    for path, higher_is_better in TRACKED_METRICS:
+        current = _lookup(results, path)
+        previous = _lookup(baseline, path)
+        if current is None or previous is None:
+            continue
+
+        change = (current - previous) / previous if previous else 0.0
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+
+        comparisons.append({
+            "metric": ".".join(path),
+            "baseline": previous,
+            "current": current,
+            "change": change,
+            "regressed": regressed
+        })
+
+    return comparisons
+
+
+def print_report(results: Dict[str, Any], comparisons: Optional[List[Dict[str, Any]]] = None):
+    """Print a human-readable benchmark report"""
+    corpus = results["corpus"]
+    stages = results["stages"]
+    retrieval = results["retrieval"]
+
+    print(f"\n📊 RAG benchmark @ {results['commit'] or 'unknown commit'}")
+    print(f"  Corpus: {corpus['documents']} docs, {corpus['bytes'] / 1024:.1f} KB, {corpus['chunks']} chunks, {corpus['tokens']} tokens")
+    print(f"  extract : {stages['extract']['docs_per_second']:10.1f} docs/s  {stages['extract']['mb_per_second']:8.2f} MB/s")
+    print(f"  chunk   : {stages['chunk']['chunks_per_second']:10.1f} chunks/s")
+    print(f"  tokenize: {stages['tokenize']['tokens_per_second']:10.1f} tokens/s")
+    print(f"  embed   : {stages['embed']['chunks_per_second']:10.1f} chunks/s")
+    print(f"  upsert  : {stages['upsert']['vectors_per_second']:10.1f} vectors/s")
+    print(f"  pipeline: {results['ingestion']['chunks_per_second']:10.1f} chunks/s end-to-end")
+    print(
+        f"  retrieval: recall@{retrieval['top_k']} = {retrieval['recall_at_k']:.3f} over {retrieval['queries']} queries, "
+        f"p50 {retrieval['latency_ms']['p50']:.2f}ms  p95 {retrieval['latency_ms']['p95']:.2f}ms  p99 {retrieval['latency_ms']['p99']:.2f}ms"
+    )
+
+    if comparisons:
+        print("\n📈 Comparison with baseline:")
+        for comparison in comparisons:
+            emoji = "❌" if comparison["regressed"] else "✅"
+            print(
+                f"  {emoji} {comparison['metric']}: {comparison['baseline']:.3f} → {comparison['current']:.3f} "
+                f"({comparison['change'] * 100:+.1f}%)"
+            )
+
+
+def _rate(amount: float, seconds: float) -> float:
+    return amount / seconds if seconds > 0 else 0.0
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percentile // 100))
+    return ordered[int(rank) - 1]
+
+
+def _lookup(data: Dict[str, Any], path: tuple) -> Optional[float]:
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline RAG ingestion and retrieval benchmark")
+    parser.add_argument("--docs-per-format", type=int, default=3)
+    parser.add_argument("--paragraphs", type=int, default=40, help="Filler paragraphs per document")
+    parser.add_argument("--facts", type=int, default=5, help="Planted facts (queries) per document")
+    parser.add_argument("--formats", default=",".join(SUPPORTED_FORMATS), help="Comma-separated formats")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--dimension", type=int, default=3072)
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="Simulated seconds per embedding request")
+    parser.add_argument("--upsert-latency", type=float, default=0.0, help="Simulated seconds per upsert request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="Write results to this baseline JSON file")
+    parser.add_argument("--compare", help="Compare results against this baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression (default 10%%)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(
+        docs_per_format=args.docs_per_format,
+        paragraphs_per_doc=args.paragraphs,
+        facts_per_doc=args.facts,
+        formats=tuple(f.strip() for f in args.formats.split(",") if f.strip()),
+        top_k=args.top_k,
+        dimension=args.dimension,
+        embed_latency=args.embed_latency,
+        upsert_latency=args.upsert_latency,
+        seed=args.seed
+    ))
+
+    comparisons = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        comparisons = compare_to_baseline(results, baseline, args.tolerance)
+
+    print_report(results, comparisons)
+
+    if args.save:
+        save_baseline(results, args.save)
+
+    if comparisons and any(c["regressed"] for c in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
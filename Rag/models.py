@@ -29,6 +29,10 @@ class RAGQueryRequest(BaseModel):
     session_id: Optional[str] = None
     max_results: Optional[int] = 5
     include_sources: Optional[bool] = True
+    document_ids: Optional[List[int]] = None
+    file_type: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
 
 class DocumentChunk(BaseModel):
     content: str
@@ -125,7 +125,11 @@ async def query_documents(
             user_id=request.user_id,
             query=request.query,
             max_results=request.max_results or 5,
-            session_id=request.session_id
+            session_id=request.session_id,
+            document_ids=request.document_ids,
+            file_type=request.file_type,
+            created_after=request.created_after,
+            created_before=request.created_before
         )
         
         return RAGQueryResponse(
@@ -2,7 +2,8 @@
 OpenAI Embedding Service for RAG
 """
 import os
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Iterator
 from openai import OpenAI
 import tiktoken
 
@@ -14,7 +15,7 @@ class EmbeddingService:
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = OpenAI(api_key=self.api_key, timeout=float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60")))
         self.model = "text-embedding-3-large"  # Match Pinecone configuration
         self.max_tokens = 8191  # Max tokens for embedding model
         self.target_dimension = 3072  # Match Pinecone index dimension
@@ -56,8 +57,9 @@ class EmbeddingService:
             # Truncate text if too long
             truncated_text = self.truncate_text(text)
             
-            # Generate embedding
-            response = self.client.embeddings.create(
+            # Generate embedding off the event loop (the OpenAI client is synchronous)
+            response = await asyncio.to_thread(
+                self.client.embeddings.create,
                 model=self.model,
                 input=truncated_text
             )
@@ -85,8 +87,9 @@ class EmbeddingService:
             # Truncate all texts
             truncated_texts = [self.truncate_text(text) for text in texts]
             
-            # Generate embeddings in batch
-            response = self.client.embeddings.create(
+            # Generate embeddings in batch off the event loop
+            response = await asyncio.to_thread(
+                self.client.embeddings.create,
                 model=self.model,
                 input=truncated_texts
             )
@@ -122,54 +125,7 @@ class EmbeddingService:
             List of chunk dictionaries with content and metadata
         """
         try:
-            chunks = []
-            
-            if preserve_sentences:
-                # Split by sentences first
-                sentences = text.split('. ')
-                current_chunk = ""
-                chunk_index = 0
-                
-                for sentence in sentences:
-                    # Add sentence to current chunk
-                    test_chunk = current_chunk + sentence + ". "
-                    
-                    if len(test_chunk) > chunk_size and current_chunk:
-                        # Save current chunk and start new one
-                        chunks.append({
-                            "content": current_chunk.strip(),
-                            "chunk_index": chunk_index,
-                            "char_count": len(current_chunk),
-                            "token_count": self.count_tokens(current_chunk)
-                        })
-                        
-                        # Start new chunk with overlap
-                        overlap_text = current_chunk[-chunk_overlap:] if len(current_chunk) > chunk_overlap else current_chunk
-                        current_chunk = overlap_text + sentence + ". "
-                        chunk_index += 1
-                    else:
-                        current_chunk = test_chunk
-                
-                # Add final chunk
-                if current_chunk.strip():
-                    chunks.append({
-                        "content": current_chunk.strip(),
-                        "chunk_index": chunk_index,
-                        "char_count": len(current_chunk),
-                        "token_count": self.count_tokens(current_chunk)
-                    })
-            
-            else:
-                # Simple character-based chunking
-                for i in range(0, len(text), chunk_size - chunk_overlap):
-                    chunk_text = text[i:i + chunk_size]
-                    
-                    chunks.append({
-                        "content": chunk_text,
-                        "chunk_index": len(chunks),
-                        "char_count": len(chunk_text),
-                        "token_count": self.count_tokens(chunk_text)
-                    })
+            chunks = list(self.iter_chunks(text, chunk_size, chunk_overlap, preserve_sentences))
             
             print(f"✅ Split text into {len(chunks)} chunks")
             return chunks
@@ -178,6 +134,75 @@ class EmbeddingService:
             print(f"❌ Error chunking text: {e}")
             raise
     
+    def iter_chunks(
+        self,
+        text: str,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        preserve_sentences: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily split text into chunks, yielding each chunk as soon as it is complete
+        
+        Produces exactly the same chunks as chunk_text, so callers can start
+        embedding the first chunks before the rest of the text has been split.
+        
+        Args:
+            text: Text to chunk
+            chunk_size: Target size of each chunk in characters
+            chunk_overlap: Overlap between chunks in characters
+            preserve_sentences: Try to preserve sentence boundaries
+            
+        Yields:
+            Chunk dictionaries with content and metadata
+        """
+        if preserve_sentences:
+            # Split by sentences first
+            sentences = text.split('. ')
+            current_chunk = ""
+            chunk_index = 0
+            
+            for sentence in sentences:
+                # Add sentence to current chunk
+                test_chunk = current_chunk + sentence + ". "
+                
+                if len(test_chunk) > chunk_size and current_chunk:
+                    # Emit current chunk and start new one
+                    yield {
+                        "content": current_chunk.strip(),
+                        "chunk_index": chunk_index,
+                        "char_count": len(current_chunk),
+                        "token_count": self.count_tokens(current_chunk)
+                    }
+                    
+                    # Start new chunk with overlap
+                    overlap_text = current_chunk[-chunk_overlap:] if len(current_chunk) > chunk_overlap else current_chunk
+                    current_chunk = overlap_text + sentence + ". "
+                    chunk_index += 1
+                else:
+                    current_chunk = test_chunk
+            
+            # Emit final chunk
+            if current_chunk.strip():
+                yield {
+                    "content": current_chunk.strip(),
+                    "chunk_index": chunk_index,
+                    "char_count": len(current_chunk),
+                    "token_count": self.count_tokens(current_chunk)
+                }
+        
+        else:
+            # Simple character-based chunking
+            for chunk_index, i in enumerate(range(0, len(text), chunk_size - chunk_overlap)):
+                chunk_text = text[i:i + chunk_size]
+                
+                yield {
+                    "content": chunk_text,
+                    "chunk_index": chunk_index,
+                    "char_count": len(chunk_text),
+                    "token_count": self.count_tokens(chunk_text)
+                }
+    
     def test_connection(self) -> bool:
         """Test OpenAI API connection"""
         try:
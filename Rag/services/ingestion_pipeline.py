@@ -0,0 +1,225 @@
+"""
+Streaming Ingestion Pipeline - Overlaps chunk → embed → upsert stages for RAG documents
+"""
+import asyncio
+import time
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Callable
+
+# (vector_id, embedding, metadata) - the tuple format accepted by PineconeService.upsert_vectors
+Vector = Tuple[str, List[float], Dict[str, Any]]
+
+# Marks the end of a stage's input stream
+_END_OF_STREAM = object()
+
+
+class IngestionPipeline:
+    """
+    Bounded async pipeline that streams chunks through embedding and vector upsert.
+
+    Chunks are grouped into embedding batches as they are produced. Embed workers and
+    upsert workers run concurrently and are connected by bounded queues, so a slow stage
+    applies backpressure to the stages before it. At most a few batches of embeddings
+    are held in memory at once, regardless of document size.
+    """
+
+    def __init__(
+        self,
+        embed_batch_size: int = 64,
+        upsert_batch_size: int = 50,
+        embed_concurrency: int = 2,
+        upsert_concurrency: int = 2,
+        queue_size: int = 4,
+        embedder=None,
+        vector_store=None
+    ):
+        """
+        Initialize ingestion pipeline
+
+        Args:
+            embed_batch_size: Number of chunks sent per embedding request
+            upsert_batch_size: Number of vectors sent per Pinecone upsert
+            embed_concurrency: Number of concurrent embedding workers
+            upsert_concurrency: Number of concurrent upsert workers
+            queue_size: Maximum number of batches buffered between two stages
+            embedder: Embedding service (defaults to the global OpenAI embedding service)
+            vector_store: Vector store (defaults to the global Pinecone service)
+        """
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.embed_concurrency = embed_concurrency
+        self.upsert_concurrency = upsert_concurrency
+        self.queue_size = queue_size
+        self._embedder = embedder
+        self._vector_store = vector_store
+
+    @property
+    def embedder(self):
+        """Embedding provider, resolved lazily so offline callers never need OpenAI credentials"""
+        if self._embedder is None:
+            from Rag.services.embedding_service import embedding_service
+            self._embedder = embedding_service
+        return self._embedder
+
+    @property
+    def vector_store(self):
+        """Vector store, resolved lazily so offline callers never need Pinecone credentials"""
+        if self._vector_store is None:
+            from Rag.services.vector_service import pinecone_service
+            self._vector_store = pinecone_service
+        return self._vector_store
+
+    async def run(
+        self,
+        chunks: Iterable[Dict[str, Any]],
+        namespace: Optional[str],
+        build_vector: Callable[[Dict[str, Any], List[float]], Vector],
+        on_batch_stored: Optional[Callable[[List[Dict[str, Any]], List[Vector]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream chunks through the embed and upsert stages
+
+        Args:
+            chunks: Iterable of chunk dictionaries (as produced by EmbeddingService.iter_chunks)
+            namespace: Pinecone namespace to upsert into
+            build_vector: Builds the (id, embedding, metadata) tuple for a chunk and its embedding
+            on_batch_stored: Optional callback invoked on the event loop after each upserted batch
+
+        Returns:
+            Dictionary with chunk/vector counts and per-stage timings
+
+        Raises:
+            Exception: If the vector store reports a failed upsert batch; on_batch_stored
+                is never called for vectors that weren't stored
+        """
+        start_time = time.time()
+        stats = {
+            "chunks": 0,
+            "upserted_count": 0,
+            "failed_batches": 0,
+            "stage_seconds": {"chunk": 0.0, "embed": 0.0, "upsert": 0.0}
+        }
+
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        producer = asyncio.create_task(self._produce(chunks, embed_queue, stats))
+        embedders = [
+            asyncio.create_task(self._embed_worker(embed_queue, upsert_queue, build_vector, stats))
+            for _ in range(self.embed_concurrency)
+        ]
+        upserters = [
+            asyncio.create_task(self._upsert_worker(upsert_queue, namespace, on_batch_stored, stats))
+            for _ in range(self.upsert_concurrency)
+        ]
+        closer = asyncio.create_task(self._close_upsert_stage(producer, embedders, upsert_queue))
+        tasks = [producer, *embedders, *upserters, closer]
+
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+
+            # A failed stage would leave its neighbours blocked on a queue forever
+            for task in done:
+                if not task.cancelled() and task.exception():
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        stats["wall_time"] = time.time() - start_time
+        print(
+            f"✅ Ingestion pipeline finished: {stats['upserted_count']}/{stats['chunks']} vectors "
+            f"in {stats['wall_time']:.2f}s (chunk {stats['stage_seconds']['chunk']:.2f}s, "
+            f"embed {stats['stage_seconds']['embed']:.2f}s, upsert {stats['stage_seconds']['upsert']:.2f}s)"
+        )
+        return stats
+
+    async def _produce(self, chunks: Iterable[Dict[str, Any]], embed_queue: asyncio.Queue, stats: Dict[str, Any]):
+        """Group chunks into embedding batches as they are produced"""
+        batch = []
+        iterator = iter(chunks)
+
+        while True:
+            chunk_start = time.perf_counter()
+            chunk = next(iterator, _END_OF_STREAM)
+            stats["stage_seconds"]["chunk"] += time.perf_counter() - chunk_start
+
+            if chunk is _END_OF_STREAM:
+                break
+
+            batch.append(chunk)
+            stats["chunks"] += 1
+
+            if len(batch) >= self.embed_batch_size:
+                await embed_queue.put(batch)
+                batch = []
+
+        if batch:
+            await embed_queue.put(batch)
+
+        for _ in range(self.embed_concurrency):
+            await embed_queue.put(_END_OF_STREAM)
+
+    async def _embed_worker(
+        self,
+        embed_queue: asyncio.Queue,
+        upsert_queue: asyncio.Queue,
+        build_vector: Callable[[Dict[str, Any], List[float]], Vector],
+        stats: Dict[str, Any]
+    ):
+        """Embed chunk batches and hand the resulting vectors to the upsert stage"""
+        while True:
+            batch = await embed_queue.get()
+            if batch is _END_OF_STREAM:
+                return
+
+            embed_start = time.perf_counter()
+            embeddings = await self.embedder.generate_embeddings_batch([chunk["content"] for chunk in batch])
+            stats["stage_seconds"]["embed"] += time.perf_counter() - embed_start
+
+            vectors = [build_vector(chunk, embedding) for chunk, embedding in zip(batch, embeddings)]
+
+            for i in range(0, len(vectors), self.upsert_batch_size):
+                await upsert_queue.put((batch[i:i + self.upsert_batch_size], vectors[i:i + self.upsert_batch_size]))
+
+    async def _upsert_worker(
+        self,
+        upsert_queue: asyncio.Queue,
+        namespace: Optional[str],
+        on_batch_stored: Optional[Callable[[List[Dict[str, Any]], List[Vector]], None]],
+        stats: Dict[str, Any]
+    ):
+        """Upsert vector batches to the vector store off the event loop"""
+        while True:
+            item = await upsert_queue.get()
+            if item is _END_OF_STREAM:
+                return
+
+            batch, vectors = item
+            upsert_start = time.perf_counter()
+            result = await asyncio.to_thread(
+                self.vector_store.upsert_vectors,
+                vectors=vectors,
+                namespace=namespace,
+                batch_size=self.upsert_batch_size
+            )
+            stats["stage_seconds"]["upsert"] += time.perf_counter() - upsert_start
+            stats["upserted_count"] += result.get("upserted_count", 0)
+            stats["failed_batches"] += result.get("failed_batches", 0)
+
+            if result.get("failed_batches", 0):
+                raise Exception(f"Vector store failed to upsert {len(vectors)} vectors")
+
+            if on_batch_stored:
+                on_batch_stored(batch, vectors)
+
+    async def _close_upsert_stage(self, producer: asyncio.Task, embedders: List[asyncio.Task], upsert_queue: asyncio.Queue):
+        """Signal the upsert workers once every embed worker has drained its input"""
+        await asyncio.gather(producer, *embedders)
+        for _ in range(self.upsert_concurrency):
+            await upsert_queue.put(_END_OF_STREAM)
+
+
+# Global ingestion pipeline instance
+ingestion_pipeline = IngestionPipeline()
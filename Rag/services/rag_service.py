@@ -2,8 +2,10 @@
 Main RAG Service - Orchestrates document processing and query answering
 """
 import os
+import asyncio
 import hashlib
 import uuid
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 from openai import OpenAI
 from sqlalchemy.orm import Session
@@ -11,6 +13,7 @@ from app.core.database import SessionLocal
 from Rag.services.vector_service import pinecone_service
 from Rag.services.embedding_service import embedding_service
 from Rag.services.web_scraper_service import web_scraper_service
+from Rag.services.ingestion_pipeline import ingestion_pipeline
 from Rag.db_models import RAGDocument, RAGDocumentChunk, RAGChatSession, RAGChatMessage
 import time
 import json
@@ -18,7 +21,11 @@ import json
 class RAGService:
     def __init__(self):
         """Initialize RAG service"""
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Bounded so a cancelled caller doesn't leave a worker thread waiting on OpenAI indefinitely
+        self.openai_client = OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+        )
         self.chat_model = "gpt-4o-mini"  # Using your existing model
         
         print(f"✅ RAG service initialized with chat model: {self.chat_model}")
@@ -48,11 +55,13 @@ class RAGService:
         try:
             print(f"🌐 Processing website: {url}")
             
-            # Scrape website content
+            # Scrape website content (blocking HTTP, so keep it off the event loop)
             if max_pages > 1:
-                scraped_results = web_scraper_service.scrape_website_with_sitemap(url, max_pages)
+                scraped_results = await asyncio.to_thread(
+                    web_scraper_service.scrape_website_with_sitemap, url, max_pages
+                )
             else:
-                scraped_results = [web_scraper_service.scrape_single_url(url, verify_ssl)]
+                scraped_results = [await asyncio.to_thread(web_scraper_service.scrape_single_url, url, verify_ssl)]
             
             if not scraped_results:
                 raise ValueError(f"No content could be scraped from {url}")
@@ -87,81 +96,36 @@ class RAGService:
             db.commit()
             db.refresh(document)
             
-            # Chunk the combined content
-            print("🔪 Chunking website content...")
-            chunks = embedding_service.chunk_text(
+            # Stream chunks through embedding and Pinecone upsert
+            print("🔪 Chunking, embedding and storing website content...")
+            chunks_count = await self._ingest_text(
+                db=db,
+                document=document,
                 text=combined_content,
-                chunk_size=1000,
-                chunk_overlap=200
-            )
-            
-            # Generate embeddings for chunks
-            print("🧠 Generating embeddings...")
-            chunk_texts = [chunk["content"] for chunk in chunks]
-            embeddings = await embedding_service.generate_embeddings_batch(chunk_texts)
-            
-            # Prepare vectors for Pinecone
-            vectors = []
-            chunk_records = []
-            
-            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                # Generate unique vector ID
-                vector_id = f"web_{document.id}_chunk_{i}"
-                
-                # Create content hash for deduplication
-                content_hash = hashlib.md5(chunk["content"].encode()).hexdigest()
-                
-                # Prepare metadata
-                chunk_metadata = {
+                vector_prefix="web",
+                base_metadata={
                     "document_id": document.id,
                     "user_id": user_id,
                     "source_url": url,
                     "title": document.title,
-                    "chunk_index": i,
-                    "content": chunk["content"],
-                    "char_count": chunk["char_count"],
-                    "token_count": chunk["token_count"],
                     "file_type": "website",
-                    "source_type": "website"
+                    "source_type": "website",
+                    "created_at": self._metadata_timestamp(document.created_at)
                 }
-                
-                vectors.append((vector_id, embedding, chunk_metadata))
-                
-                # Create chunk record for database
-                chunk_record = RAGDocumentChunk(
-                    document_id=document.id,
-                    chunk_index=i,
-                    content=chunk["content"],
-                    content_hash=content_hash,
-                    pinecone_id=vector_id,
-                    chunk_metadata=chunk_metadata
-                )
-                
-                chunk_records.append(chunk_record)
-            
-            # Store vectors in Pinecone
-            print("📊 Storing vectors in Pinecone...")
-            pinecone_service.upsert_vectors(
-                vectors=vectors,
-                namespace=f"user_{user_id}"
             )
             
-            # Store chunk records in database
-            print("💾 Storing chunks in database...")
-            db.add_all(chunk_records)
-            
             # Update document status
-            document.chunks_count = len(chunks)
+            document.chunks_count = chunks_count
             document.status = "completed"
             
             db.commit()
             db.refresh(document)
             
-            print(f"✅ Website processed successfully: {len(chunks)} chunks created from {len(scraped_results)} pages")
+            print(f"✅ Website processed successfully: {chunks_count} chunks created from {len(scraped_results)} pages")
             return document
             
-        except Exception as e:
-            # Update document status to failed
+        except (Exception, asyncio.CancelledError) as e:
+            # Update document status to failed (also when the caller timed out and cancelled us)
             if 'document' in locals():
                 document.status = "failed"
                 db.commit()
@@ -208,87 +172,42 @@ class RAGService:
                 file_type=file_type,
                 status="processing",
                 pinecone_namespace=f"user_{user_id}",
-                metadata=metadata or {}
+                document_metadata=metadata or {}
             )
             
             db.add(document)
             db.commit()
             db.refresh(document)
             
-            # Chunk the document
-            print("🔪 Chunking document...")
-            chunks = embedding_service.chunk_text(
+            # Stream chunks through embedding and Pinecone upsert
+            print("🔪 Chunking, embedding and storing document...")
+            chunks_count = await self._ingest_text(
+                db=db,
+                document=document,
                 text=file_content,
-                chunk_size=1000,
-                chunk_overlap=200
-            )
-            
-            # Generate embeddings for chunks
-            print("🧠 Generating embeddings...")
-            chunk_texts = [chunk["content"] for chunk in chunks]
-            embeddings = await embedding_service.generate_embeddings_batch(chunk_texts)
-            
-            # Prepare vectors for Pinecone
-            vectors = []
-            chunk_records = []
-            
-            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                # Generate unique vector ID
-                vector_id = f"doc_{document.id}_chunk_{i}"
-                
-                # Create content hash for deduplication
-                content_hash = hashlib.md5(chunk["content"].encode()).hexdigest()
-                
-                # Prepare metadata
-                chunk_metadata = {
+                vector_prefix="doc",
+                base_metadata={
                     "document_id": document.id,
                     "user_id": user_id,
                     "filename": filename,
                     "title": document.title,
-                    "chunk_index": i,
-                    "content": chunk["content"],  # Store content in metadata for retrieval
-                    "char_count": chunk["char_count"],
-                    "token_count": chunk["token_count"],
-                    "file_type": file_type
+                    "file_type": file_type,
+                    "created_at": self._metadata_timestamp(document.created_at)
                 }
-                
-                vectors.append((vector_id, embedding, chunk_metadata))
-                
-                # Create chunk record for database
-                chunk_record = RAGDocumentChunk(
-                    document_id=document.id,
-                    chunk_index=i,
-                    content=chunk["content"],
-                    content_hash=content_hash,
-                    pinecone_id=vector_id,
-                    metadata=chunk_metadata
-                )
-                
-                chunk_records.append(chunk_record)
-            
-            # Store vectors in Pinecone
-            print("📊 Storing vectors in Pinecone...")
-            pinecone_service.upsert_vectors(
-                vectors=vectors,
-                namespace=f"user_{user_id}"
             )
             
-            # Store chunk records in database
-            print("💾 Storing chunks in database...")
-            db.add_all(chunk_records)
-            
             # Update document status
-            document.chunks_count = len(chunks)
+            document.chunks_count = chunks_count
             document.status = "completed"
             
             db.commit()
             db.refresh(document)
             
-            print(f"✅ Document processed successfully: {len(chunks)} chunks created")
+            print(f"✅ Document processed successfully: {chunks_count} chunks created")
             return document
             
-        except Exception as e:
-            # Update document status to failed
+        except (Exception, asyncio.CancelledError) as e:
+            # Update document status to failed (also when the caller timed out and cancelled us)
             if 'document' in locals():
                 document.status = "failed"
                 db.commit()
@@ -298,12 +217,73 @@ class RAGService:
         finally:
             db.close()
     
+    async def _ingest_text(
+        self,
+        db: Session,
+        document: RAGDocument,
+        text: str,
+        vector_prefix: str,
+        base_metadata: Dict[str, Any]
+    ) -> int:
+        """
+        Stream a document's text through the chunk → embed → upsert pipeline
+        
+        Chunk records are added to the session as their vectors are stored;
+        the caller commits them together with the document status.
+        
+        Args:
+            db: Open database session holding the document
+            document: Document record the chunks belong to
+            text: Full text content to ingest
+            vector_prefix: Prefix for Pinecone vector IDs ("doc" or "web")
+            base_metadata: Metadata shared by every chunk of the document
+            
+        Returns:
+            Number of chunks ingested
+        """
+        def build_vector(chunk: Dict[str, Any], embedding: List[float]):
+            chunk_metadata = {
+                **base_metadata,
+                "chunk_index": chunk["chunk_index"],
+                "content": chunk["content"],  # Store content in metadata for retrieval
+                "char_count": chunk["char_count"],
+                "token_count": chunk["token_count"]
+            }
+            vector_id = f"{vector_prefix}_{document.id}_chunk_{chunk['chunk_index']}"
+            return vector_id, embedding, chunk_metadata
+        
+        def record_chunks(chunks: List[Dict[str, Any]], vectors: List[Any]):
+            db.add_all([
+                RAGDocumentChunk(
+                    document_id=document.id,
+                    chunk_index=chunk["chunk_index"],
+                    content=chunk["content"],
+                    content_hash=hashlib.md5(chunk["content"].encode()).hexdigest(),  # For deduplication
+                    pinecone_id=vector_id,
+                    chunk_metadata=chunk_metadata
+                )
+                for chunk, (vector_id, _, chunk_metadata) in zip(chunks, vectors)
+            ])
+        
+        stats = await ingestion_pipeline.run(
+            chunks=embedding_service.iter_chunks(text, chunk_size=1000, chunk_overlap=200),
+            namespace=f"user_{document.user_id}",
+            build_vector=build_vector,
+            on_batch_stored=record_chunks
+        )
+        
+        return stats["chunks"]
+    
     async def query_documents(
         self,
         user_id: int,
         query: str,
         max_results: int = 5,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        document_ids: Optional[List[int]] = None,
+        file_type: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Query documents and generate answer using RAG
@@ -313,6 +293,10 @@ class RAGService:
             query: User's question
             max_results: Maximum number of relevant chunks to retrieve
             session_id: Optional chat session ID
+            document_ids: Optional list of document IDs to restrict the search to
+            file_type: Optional file type to restrict the search to (pdf, website, ...)
+            created_after: Optional lower bound on document creation time
+            created_before: Optional upper bound on document creation time
             
         Returns:
             Dictionary with answer, sources, and metadata
@@ -325,11 +309,18 @@ class RAGService:
             # Generate embedding for query
             query_embedding = await embedding_service.generate_embedding(query)
             
-            # Search similar vectors in Pinecone
-            search_results = pinecone_service.query_vectors(
+            # Search similar vectors in Pinecone, scoped by metadata filters
+            search_results = await asyncio.to_thread(
+                pinecone_service.query_vectors,
                 query_embedding=query_embedding,
                 top_k=max_results,
                 namespace=f"user_{user_id}",
+                filter_metadata=self._build_metadata_filter(
+                    document_ids=document_ids,
+                    file_type=file_type,
+                    created_after=created_after,
+                    created_before=created_before
+                ),
                 include_metadata=True
             )
             
@@ -392,6 +383,43 @@ class RAGService:
             print(f"❌ Error processing RAG query: {e}")
             raise
     
+    def _build_metadata_filter(
+        self,
+        document_ids: Optional[List[int]] = None,
+        file_type: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build a Pinecone metadata filter so scoping happens inside the index query
+        
+        Returns:
+            Filter dictionary, or None when the whole namespace should be searched
+        """
+        metadata_filter: Dict[str, Any] = {}
+        
+        if document_ids:
+            metadata_filter["document_id"] = {"$in": list(document_ids)}
+        
+        if file_type:
+            metadata_filter["file_type"] = {"$eq": file_type.lower().lstrip('.')}
+        
+        # Pinecone range operators only work on numbers, so dates are stored as Unix timestamps
+        created_range = {}
+        if created_after:
+            created_range["$gte"] = self._metadata_timestamp(created_after)
+        if created_before:
+            created_range["$lte"] = self._metadata_timestamp(created_before)
+        if created_range:
+            metadata_filter["created_at"] = created_range
+        
+        return metadata_filter or None
+    
+    @staticmethod
+    def _metadata_timestamp(value: Optional[datetime]) -> int:
+        """Convert a datetime to the Unix timestamp stored in vector metadata"""
+        return int(value.timestamp()) if value else int(time.time())
+    
     async def _generate_answer_with_context(self, query: str, context_texts: List[str]) -> str:
         """Generate answer using GPT with retrieved context"""
         try:
@@ -425,7 +453,8 @@ Please answer the following question based on the context above."""
             ]
             
             # Generate response
-            response = self.openai_client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.openai_client.chat.completions.create,
                 model=self.chat_model,
                 messages=messages,
                 temperature=0.7,
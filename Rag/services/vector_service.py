@@ -13,6 +13,7 @@ class PineconeService:
         self.api_key = os.getenv("PINECONE_API_KEY")
         self.environment = os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
         self.index_name = os.getenv("PINECONE_INDEX_NAME", "scalebuild-rag")
+        self.request_timeout = float(os.getenv("PINECONE_REQUEST_TIMEOUT_SECONDS", "30"))
         
         if not self.api_key:
             raise ValueError("PINECONE_API_KEY environment variable is required")
@@ -118,7 +119,8 @@ class PineconeService:
                 try:
                     response = self.index.upsert(
                         vectors=formatted_vectors,
-                        namespace=namespace
+                        namespace=namespace,
+                        _request_timeout=self.request_timeout
                     )
                     
                     responses.append(response)
@@ -177,7 +179,8 @@ class PineconeService:
                 namespace=namespace,
                 filter=filter_metadata,
                 include_metadata=include_metadata,
-                include_values=False
+                include_values=False,
+                _request_timeout=self.request_timeout
             )
             
             print(f"✅ Queried Pinecone, found {len(response.matches)} matches")
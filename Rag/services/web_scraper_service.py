@@ -20,6 +20,8 @@ class WebScraperService:
             length_function=len,
             separators=["\n\n", "\n", " ", ""]
         )
+        # Per-request timeout, so a page that never answers doesn't hold a worker thread
+        self.request_timeout = float(os.getenv("WEB_SCRAPER_TIMEOUT_SECONDS", "30"))
         print("✅ Web scraper service initialized")
     
     def is_valid_url(self, url: str) -> bool:
@@ -56,9 +58,9 @@ class WebScraperService:
                 raise ValueError(f"Invalid or inaccessible URL: {url}")
             
             # Configure loader with SSL verification option
-            loader_kwargs = {}
+            loader_kwargs = {'requests_kwargs': {'timeout': self.request_timeout}}
             if not verify_ssl:
-                loader_kwargs['requests_kwargs'] = {'verify': False}
+                loader_kwargs['requests_kwargs']['verify'] = False
             
             # Create WebBaseLoader
             loader = WebBaseLoader(url, **loader_kwargs)
@@ -129,9 +131,9 @@ class WebScraperService:
             print(f"📋 {len(valid_urls)} valid URLs found")
             
             # Configure loader for multiple URLs
-            loader_kwargs = {}
+            loader_kwargs = {'requests_kwargs': {'timeout': self.request_timeout}}
             if not verify_ssl:
-                loader_kwargs['requests_kwargs'] = {'verify': False}
+                loader_kwargs['requests_kwargs']['verify'] = False
             
             # Create WebBaseLoader for multiple URLs
             loader = WebBaseLoader(valid_urls, **loader_kwargs)
@@ -32,13 +32,14 @@ from app.core.database import Base
 # IMPORTANT: import models so autogenerate can see them
 # Import all db_models to ensure Alembic sees all tables
 from app.auth.db_models import User  # noqa: F401
-from app.presentation.db_models import Presentation, PresentationImage  # noqa: F401
+from app.presentation.db_models import Presentation, PresentationImage, PresentationSlide  # noqa: F401
 from app.logo.db_models import Logo  # noqa: F401
 from app.document_generation.db_models import (  # noqa: F401
     BusinessProposal, PartnershipAgreement, NDA, 
     Contract, TermsOfService, PrivacyPolicy
 )
-from app.short_video.db_models import ShortVideo  # noqa: F401
+from app.short_video.db_models import ShortVideo, ShortVideoJob  # noqa: F401
+from app.core.db_models import StoredObject  # noqa: F401
 from Rag.db_models import RAGDocument, RAGDocumentChunk, RAGChatSession, RAGChatMessage  # noqa: F401
 
 target_metadata = Base.metadata
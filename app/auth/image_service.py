@@ -7,7 +7,8 @@ import os
 from typing import Tuple
 from fastapi import UploadFile, HTTPException
 from PIL import Image
-from app.core.gcs_client import get_shared_gcs_client
+from app.core.storage_service import storage_service
+from app.core.image_derivative_service import image_derivative_service
 
 
 class UserImageService:
@@ -73,8 +74,8 @@ class UserImageService:
         # Read file content
         file_content = await file.read()
         
-        # Process the image
-        processed_image, content_type = self.process_image(file_content)
+        # Process the image on the image worker pool so decoding/re-encoding doesn't block the event loop
+        processed_image, content_type = await image_derivative_service.run_in_pool(self.process_image, file_content)
         
         # Generate unique filename
         file_extension = '.jpg'  # Always save as JPEG after processing
@@ -82,24 +83,8 @@ class UserImageService:
         filename = f"user_images/user_{user_id}_{unique_id}{file_extension}"
         
         try:
-            # Get GCS client and bucket
-            storage_client = get_shared_gcs_client()
-            bucket_name = os.getenv("GCS_BUCKET_NAME", "deck123")
-            bucket = storage_client.bucket(bucket_name)
-            
-            # Create blob and upload
-            blob = bucket.blob(filename)
-            processed_image.seek(0)  # Reset file pointer to beginning
-            
-            blob.upload_from_file(
-                processed_image,
-                content_type=content_type
-            )
-            
-            # Make the blob publicly accessible
-            blob.make_public()
-            
-            public_url = blob.public_url
+            # Upload on the shared storage pool; the object is published in the same request
+            public_url = await storage_service.upload(processed_image, filename, content_type)
             print(f"✅ User image uploaded to GCS: {public_url}")
             
             return public_url
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, UniqueConstraint, Index, func
+from app.core.database import Base
+
+class StoredObject(Base):
+    """Content-addressed object in storage, shared by every upload of the same bytes"""
+    __tablename__ = "stored_objects"
+    __table_args__ = (
+        UniqueConstraint("bucket", "sha256", name="uq_stored_objects_bucket_sha256"),
+        Index("ix_stored_objects_bucket_object_name", "bucket", "object_name"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket = Column(String, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    object_name = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_referenced_at = Column(DateTime(timezone=True), server_default=func.now())
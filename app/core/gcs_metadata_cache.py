@@ -0,0 +1,114 @@
+"""
+GCS Metadata Cache - In-process cache of blob metadata, revalidated by ETag
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from google.api_core import exceptions
+
+
+class GCSMetadataCache:
+    """
+    LRU cache of Blob objects (metadata only) keyed by bucket and path.
+
+    Entries younger than ttl_seconds are served from memory. Older entries are
+    revalidated with a conditional reload (If-None-Match on the ETag), which GCS
+    answers with a body-less 304 when nothing changed. Missing objects are cached
+    too, so polling for a file that doesn't exist yet stays cheap. Our own upload
+    paths call invalidate() when they write an object; other writers are picked up
+    by revalidation within ttl_seconds. The cache is per process.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("GCS_METADATA_CACHE_ENABLED", "true").lower() == "true"
+        self.ttl_seconds = float(os.getenv("GCS_METADATA_CACHE_TTL", "30"))
+        self.max_entries = int(os.getenv("GCS_METADATA_CACHE_MAX_ENTRIES", "10000"))
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def get_blob(self, bucket, file_path: str):
+        """
+        Blob with current metadata, or None if the object doesn't exist (blocking)
+
+        Args:
+            bucket: google.cloud.storage Bucket
+            file_path: Object name
+
+        Raises:
+            google.api_core.exceptions.GoogleAPICallError: For errors other than not found
+        """
+        if not self.enabled:
+            return bucket.get_blob(file_path)
+
+        key = self._key(bucket.name, file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                if time.time() - entry[0] < self.ttl_seconds:
+                    self.hits += 1
+                    return entry[1]
+
+            cached = entry[1] if entry else None
+            if cached is not None and cached.etag:
+                self.revalidations += 1
+            else:
+                self.misses += 1
+
+        if cached is not None and cached.etag:
+            # Cached Blobs are shared between threads and never modified; a changed
+            # object is loaded into a fresh Blob that replaces the entry
+            blob = bucket.blob(file_path)
+            try:
+                blob.reload(if_etag_not_match=cached.etag)
+            except exceptions.NotModified:
+                blob = cached
+            except exceptions.NotFound:
+                blob = None
+        else:
+            blob = bucket.get_blob(file_path)
+
+        self._store(key, blob)
+        return blob
+
+    def invalidate(self, bucket_name: str, file_path: str):
+        """Drop the entry for an object we just wrote or deleted"""
+        with self._lock:
+            self._entries.pop(self._key(bucket_name, file_path), None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current size and hit/miss counters"""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations
+        }
+
+    def _store(self, key: str, blob: Optional[Any]):
+        with self._lock:
+            self._entries[key] = [time.time(), blob]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _key(bucket_name: str, file_path: str) -> str:
+        return f"{bucket_name}/{file_path}"
+
+
+# Global metadata cache instance
+gcs_metadata_cache = GCSMetadataCache()
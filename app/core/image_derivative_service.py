@@ -0,0 +1,155 @@
+"""
+Image Derivative Service - Builds responsive WebP/AVIF variants and blur placeholders in a worker pool
+"""
+import os
+import io
+import base64
+import hashlib
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional
+from PIL import Image, ImageFilter, ImageOps, features
+from app.core.storage_service import storage_service
+
+VARIANT_CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+
+
+class ImageDerivativeService:
+    """
+    Turns one uploaded image into smaller web-friendly derivatives.
+
+    Decoding, resizing and encoding run on a thread pool (Pillow releases the GIL for
+    that work), so the event loop stays free; the variants are then uploaded in parallel.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("IMAGE_DERIVATIVES_ENABLED", "true").lower() == "true"
+        self.widths = sorted(int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1024").split(","))
+        self.quality = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+        self.placeholder_width = int(os.getenv("IMAGE_PLACEHOLDER_WIDTH", "16"))
+        self.formats = ["webp"]
+        if os.getenv("IMAGE_VARIANT_AVIF", "false").lower() == "true":
+            if features.check("avif"):
+                self.formats.append("avif")
+            else:
+                print("⚠️ IMAGE_VARIANT_AVIF is set but this Pillow build has no AVIF support")
+        self.gcs_bucket_name = os.getenv("GCS_BUCKET_NAME", "deck123")
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("IMAGE_DERIVATIVE_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            thread_name_prefix="image-derivatives"
+        )
+
+    async def run_in_pool(self, function: Callable, *args) -> Any:
+        """Run CPU-bound image work on the derivative worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def create_variants(self, image_data: bytes, base_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Build and upload responsive variants of an image
+
+        Args:
+            image_data: Original encoded image (PNG, JPEG, ...)
+            base_name: GCS path without extension, e.g. "presentation_images/team_photo";
+                variants are named "<base_name>_<width>w_<content hash>.<format>"
+
+        Returns:
+            {"width", "height", "placeholder", "variants": [{"url", "format", "width",
+            "height", "bytes"}], "srcset": {format: srcset string}}, or None if
+            derivatives are disabled or the image can't be processed
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            derivatives = await self.run_in_pool(self.build_variants, image_data)
+
+            variants = derivatives.pop("variants")
+            # Names include a hash of the variant's bytes, so an object never changes under
+            # its URL (base names repeat, e.g. the same prompt) and can be cached forever
+            urls = await storage_service.upload_many([
+                {
+                    "data": variant["data"],
+                    "filename": f"{base_name}_{variant['width']}w_{hashlib.sha256(variant['data']).hexdigest()[:16]}.{variant['format']}",
+                    "content_type": VARIANT_CONTENT_TYPES[variant["format"]],
+                    "cache_control": "public, max-age=31536000"
+                }
+                for variant in variants
+            ], self.gcs_bucket_name)
+
+            derivatives["variants"] = [
+                {
+                    "url": url,
+                    "format": variant["format"],
+                    "width": variant["width"],
+                    "height": variant["height"],
+                    "bytes": len(variant["data"])
+                }
+                for url, variant in zip(urls, variants)
+            ]
+            derivatives["srcset"] = {
+                image_format: ", ".join(
+                    f"{variant['url']} {variant['width']}w"
+                    for variant in derivatives["variants"] if variant["format"] == image_format
+                )
+                for image_format in self.formats
+            }
+
+            print(f"🖼️ Stored {len(variants)} variants for {base_name} ({sum(len(v['data']) for v in variants)} bytes, original {len(image_data)})")
+            return derivatives
+
+        except Exception as e:
+            # Variants are an optimization; the original image is still usable
+            print(f"⚠️ Could not create image variants for {base_name}: {e}")
+            return None
+
+    def build_variants(self, image_data: bytes) -> Dict[str, Any]:
+        """
+        Encode every configured width and format plus a blur placeholder (blocking)
+
+        Widths larger than the original are clamped to the original width. Each size is
+        resized from the next larger one, which is cheaper than resizing from the
+        original every time.
+
+        Returns:
+            {"width", "height", "placeholder", "variants": [{"format", "width", "height", "data"}]}
+        """
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(image_data)))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+        original_width, original_height = image.size
+        widths = sorted({min(width, original_width) for width in self.widths}, reverse=True)
+
+        variants = []
+        source = image
+        for width in widths:
+            height = max(1, round(original_height * width / original_width))
+            if source.size != (width, height):
+                source = source.resize((width, height), Image.Resampling.LANCZOS)
+
+            for image_format in self.formats:
+                options = {"quality": self.quality}
+                if image_format == "webp":
+                    options["method"] = 4  # Balanced encode speed vs. size
+                output = io.BytesIO()
+                source.save(output, format=image_format.upper(), **options)
+                variants.append({"format": image_format, "width": width, "height": height, "data": output.getvalue()})
+
+        return {
+            "width": original_width,
+            "height": original_height,
+            "placeholder": self._placeholder(source),
+            "variants": sorted(variants, key=lambda variant: (variant["format"], variant["width"]))
+        }
+
+    def _placeholder(self, image: Image.Image) -> str:
+        """Tiny blurred WebP as a data URI, shown while the real image loads"""
+        height = max(1, round(image.height * self.placeholder_width / image.width))
+        tiny = image.resize((self.placeholder_width, height), Image.Resampling.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+        output = io.BytesIO()
+        tiny.save(output, format="WEBP", quality=30)
+        return "data:image/webp;base64," + base64.b64encode(output.getvalue()).decode("ascii")
+
+
+# Global image derivative service instance
+image_derivative_service = ImageDerivativeService()
@@ -0,0 +1,176 @@
+"""
+Object Index Service - Reference-counted index of content-addressed objects for upload deduplication
+"""
+import os
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional, Callable, IO
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.db_models import StoredObject
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def content_sha256(file_obj: IO[bytes]) -> str:
+    """SHA-256 of a seekable file-like object, read in chunks; the position is reset to 0 afterwards"""
+    digest = hashlib.sha256()
+    file_obj.seek(0)
+    for chunk in iter(lambda: file_obj.read(HASH_CHUNK_BYTES), b""):
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+class ObjectIndexService:
+    """
+    Maps (bucket, SHA-256 of the content) to one stored object and counts its references.
+
+    Deduplicated uploads are stored under a name derived from their hash
+    (STORAGE_DEDUP_PREFIX/<sha256><ext>), so identical bytes share one object and an
+    object's contents can never be overwritten by a different upload. Every upload
+    that returns the object's URL holds one reference and release() drops one.
+
+    Stored URLs are also copied into records that hold no reference (avatars, pasted
+    logo_url values, presentation content), so by default an object is kept when its
+    count reaches zero. STORAGE_DEDUP_DELETE_UNREFERENCED=true deletes it instead; only
+    enable that once every path that copies a stored URL calls retain(). Row locks
+    serialize acquire and release of the same object, and the object is deleted before
+    its row so a concurrent upload of the same bytes can't be handed a URL that is
+    about to disappear.
+
+    All methods are blocking; storage_service calls them on its thread pool.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("STORAGE_DEDUP_ENABLED", "true").lower() == "true"
+        self.prefix = os.getenv("STORAGE_DEDUP_PREFIX", "objects").strip("/")
+        self.delete_unreferenced = os.getenv("STORAGE_DEDUP_DELETE_UNREFERENCED", "false").lower() == "true"
+
+    def object_name(self, sha256: str, filename: str) -> str:
+        """Content-addressed object name, keeping the original file extension"""
+        extension = os.path.splitext(filename)[1].lower()
+        return f"{self.prefix}/{sha256}{extension}"
+
+    def acquire(self, bucket: str, sha256: str) -> Optional[str]:
+        """
+        Take a reference to an existing object with this content
+
+        Returns:
+            The object's name, or None if the content isn't stored yet
+        """
+        db: Session = SessionLocal()
+        try:
+            stored = db.query(StoredObject).filter(
+                StoredObject.bucket == bucket,
+                StoredObject.sha256 == sha256
+            ).with_for_update().first()
+            if not stored:
+                return None
+
+            stored.ref_count += 1
+            stored.last_referenced_at = datetime.now(timezone.utc)
+            db.commit()
+            return stored.object_name
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def register(self, bucket: str, sha256: str, object_name: str, size_bytes: int, content_type: str) -> str:
+        """
+        Record a freshly uploaded object with one reference
+
+        If another upload of the same content registered first, a reference to that
+        object is taken instead and its name is returned; the caller should then
+        delete its own copy if the names differ.
+
+        Returns:
+            Name of the object the reference belongs to
+        """
+        db: Session = SessionLocal()
+        try:
+            db.add(StoredObject(
+                bucket=bucket,
+                sha256=sha256,
+                object_name=object_name,
+                content_type=content_type,
+                size_bytes=size_bytes,
+                ref_count=1
+            ))
+            db.commit()
+            return object_name
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
+
+        return self.acquire(bucket, sha256) or self.register(bucket, sha256, object_name, size_bytes, content_type)
+
+    def retain(self, bucket: str, object_name: str) -> bool:
+        """
+        Take another reference to an indexed object (e.g. when its URL is stored in a new record)
+
+        Returns:
+            False if the object isn't in the index (not a deduplicated upload)
+        """
+        db: Session = SessionLocal()
+        try:
+            stored = self._find(db, bucket, object_name)
+            if not stored:
+                return False
+            stored.ref_count += 1
+            stored.last_referenced_at = datetime.now(timezone.utc)
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def release(self, bucket: str, object_name: str, delete_object: Callable[[], None]) -> bool:
+        """
+        Drop one reference, deleting the object when it was the last one and
+        STORAGE_DEDUP_DELETE_UNREFERENCED is enabled
+
+        Args:
+            bucket: Bucket name
+            object_name: Object name in the bucket
+            delete_object: Deletes the object from storage; called while the index row is locked
+
+        Returns:
+            True if the object was deleted; False if it is still referenced, deletion
+            is disabled or it isn't in the index (objects uploaded before
+            deduplication are never deleted)
+        """
+        db: Session = SessionLocal()
+        try:
+            stored = self._find(db, bucket, object_name)
+            if not stored:
+                return False
+
+            stored.ref_count = max(0, stored.ref_count - 1)
+            deleted = stored.ref_count == 0 and self.delete_unreferenced
+            if deleted:
+                delete_object()
+                db.delete(stored)
+            db.commit()
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _find(self, db: Session, bucket: str, object_name: str) -> Optional[StoredObject]:
+        return db.query(StoredObject).filter(
+            StoredObject.bucket == bucket,
+            StoredObject.object_name == object_name
+        ).with_for_update().first()
+
+
+# Global object index instance
+object_index_service = ObjectIndexService()
@@ -0,0 +1,480 @@
+"""
+Storage Backends - Object storage behind one interface (Google Cloud Storage, local filesystem, in-memory)
+"""
+import os
+import io
+import time
+import hashlib
+import mimetypes
+import uuid
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterator, Iterable, List
+from google.api_core import exceptions
+from app.core.gcs_client import get_shared_gcs_client
+from app.core.gcs_metadata_cache import gcs_metadata_cache
+
+STORAGE_BACKENDS = ("gcs", "local", "memory")
+
+# Resumable chunks must be a multiple of 256 KB
+_CHUNK_UNIT = 256 * 1024
+
+
+class StorageBackend:
+    """
+    Object storage for one bucket.
+
+    All methods are blocking; async callers run them through storage_service's
+    thread pool. stat() returns {"name", "size", "content_type", "etag",
+    "generation", "created", "updated", "md5_hash"} or None if the object is missing.
+    """
+
+    kind = None
+
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+
+    def put(
+        self,
+        name: str,
+        file_obj: io.IOBase,
+        size: int,
+        content_type: str,
+        cache_control: Optional[str] = None,
+        public: bool = True
+    ):
+        """Store a seekable file-like object positioned at 0"""
+        raise NotImplementedError
+
+    def put_stream(
+        self,
+        name: str,
+        chunks: Iterable[bytes],
+        content_type: str,
+        cache_control: Optional[str] = None,
+        public: bool = True
+    ) -> int:
+        """
+        Store an object of unknown size from an iterable of chunks, consumed once
+
+        Nothing is stored under name if the iterable raises (an existing object is kept).
+
+        Returns:
+            Number of bytes stored
+        """
+        raise NotImplementedError
+
+    def get(self, name: str) -> bytes:
+        """Whole object contents; raises FileNotFoundError if missing"""
+        return b"".join(self.stream(name))
+
+    def stream(
+        self,
+        name: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = 1024 * 1024,
+        generation: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Yield bytes start..end (inclusive) in chunks; generation pins the object version where supported"""
+        raise NotImplementedError
+
+    def stat(self, name: str, cached: bool = False) -> Optional[Dict[str, Any]]:
+        """Object metadata without the contents, or None if missing"""
+        raise NotImplementedError
+
+    def delete(self, name: str):
+        """Remove an object; missing objects are ignored"""
+        raise NotImplementedError
+
+    def delete_many(self, names: List[str]):
+        for name in names:
+            self.delete(name)
+
+    def public_url(self, name: str) -> str:
+        raise NotImplementedError
+
+    def signed_url(self, name: str, expires_at: float, response_disposition: Optional[str] = None) -> str:
+        """Time-limited download URL; backends whose URLs are already public return public_url"""
+        return self.public_url(name)
+
+    def local_path(self, name: str) -> Optional[str]:
+        """Filesystem path of the object when it can be served with sendfile, else None"""
+        return None
+
+    def health_check(self) -> bool:
+        return True
+
+
+class GCSStorageBackend(StorageBackend):
+    """
+    Google Cloud Storage bucket over the shared client.
+
+    Files larger than GCS_RESUMABLE_THRESHOLD, and all streams of unknown size, are
+    sent as resumable uploads in GCS_UPLOAD_CHUNK_SIZE chunks. Objects are published in the upload request itself
+    (predefined publicRead ACL), or not at all with GCS_PUBLIC_ACCESS=bucket when the
+    bucket is public through uniform bucket-level access.
+    """
+
+    kind = "gcs"
+
+    def __init__(self, bucket_name: str):
+        super().__init__(bucket_name)
+        self.public_access = os.getenv("GCS_PUBLIC_ACCESS", "acl").lower()
+        if self.public_access not in ("acl", "bucket"):
+            print(f"⚠️ Unknown GCS_PUBLIC_ACCESS '{self.public_access}', using 'acl'")
+            self.public_access = "acl"
+        self.resumable_threshold = int(os.getenv("GCS_RESUMABLE_THRESHOLD", str(8 * 1024 * 1024)))
+        chunk_size = int(os.getenv("GCS_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+        self.chunk_size = max(_CHUNK_UNIT, chunk_size - chunk_size % _CHUNK_UNIT)
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        """Bucket handle on the shared client, created on first use"""
+        if self._bucket is None:
+            self._bucket = get_shared_gcs_client().bucket(self.bucket_name)
+        return self._bucket
+
+    def put(self, name, file_obj, size, content_type, cache_control=None, public=True):
+        blob = self.bucket.blob(name)
+        if cache_control:
+            blob.cache_control = cache_control
+        if size > self.resumable_threshold:
+            blob.chunk_size = self.chunk_size
+
+        blob.upload_from_file(
+            file_obj,
+            size=size,
+            content_type=content_type,
+            predefined_acl="publicRead" if public and self.public_access == "acl" else None
+        )
+        gcs_metadata_cache.invalidate(self.bucket_name, name)
+
+    def put_stream(self, name, chunks, content_type, cache_control=None, public=True):
+        # Resumable upload that sends each GCS_UPLOAD_CHUNK_SIZE chunk as it fills, so at
+        # most one chunk is buffered regardless of the object size. A BlobWriter finalizes
+        # whatever it was sent once it is closed or garbage-collected, so the stream goes
+        # to a private temporary object that a one-part compose publishes under name only
+        # after the source is exhausted; a failed source never touches name.
+        temp_name = f"{name}.upload-{uuid.uuid4().hex[:8]}"
+        writer = self.bucket.blob(temp_name).open(
+            "wb",
+            chunk_size=self.chunk_size,
+            ignore_flush=True,
+            content_type=content_type
+        )
+
+        size = 0
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+                size += len(chunk)
+            writer.close()
+            self.compose(name, [temp_name], content_type, public, cache_control)
+        except Exception:
+            # Finalize the truncated temporary object now, so it is deleted below
+            try:
+                writer.close()
+            except Exception:
+                pass
+            raise
+        finally:
+            self.delete(temp_name)
+        return size
+
+    def compose(
+        self,
+        name: str,
+        part_names: List[str],
+        content_type: str,
+        public: bool = True,
+        cache_control: Optional[str] = None
+    ):
+        """Concatenate uploaded parts into one object server-side (at most 32 parts)"""
+        blob = self.bucket.blob(name)
+        blob.content_type = content_type
+        if cache_control:
+            blob.cache_control = cache_control
+        blob.compose([self.bucket.blob(part_name) for part_name in part_names])
+        gcs_metadata_cache.invalidate(self.bucket_name, name)
+        if public and self.public_access == "acl":
+            # Compose can't apply a predefined ACL, so the composed object gets one ACL call
+            blob.make_public()
+
+    def stream(self, name, start=0, end=None, chunk_size=1024 * 1024, generation=None):
+        if end is None:
+            info = self.stat(name)
+            if info is None:
+                raise FileNotFoundError(f"File not found: {name}")
+            end, generation = info["size"] - 1, info["generation"]
+
+        blob = self.bucket.blob(name, generation=generation)
+        position = start
+        while position <= end:
+            chunk = blob.download_as_bytes(start=position, end=min(position + chunk_size - 1, end), checksum=None)
+            if not chunk:
+                break
+            yield chunk
+            position += len(chunk)
+
+    def stat(self, name, cached=False):
+        blob = gcs_metadata_cache.get_blob(self.bucket, name) if cached else self.bucket.get_blob(name)
+        if blob is None:
+            return None
+        return {
+            "name": name,
+            "size": blob.size or 0,
+            "content_type": blob.content_type or "application/octet-stream",
+            "etag": blob.etag,
+            "generation": blob.generation,
+            "created": blob.time_created.isoformat() if blob.time_created else None,
+            "updated": blob.updated.isoformat() if blob.updated else None,
+            "md5_hash": blob.md5_hash
+        }
+
+    def delete(self, name):
+        try:
+            self.bucket.blob(name).delete()
+        except exceptions.NotFound:
+            pass
+        gcs_metadata_cache.invalidate(self.bucket_name, name)
+
+    def delete_many(self, names):
+        """Delete in one batch request"""
+        with self.bucket.client.batch():
+            for name in names:
+                self.bucket.blob(name).delete()
+        for name in names:
+            gcs_metadata_cache.invalidate(self.bucket_name, name)
+
+    def public_url(self, name):
+        return self.bucket.blob(name).public_url
+
+    def signed_url(self, name, expires_at, response_disposition=None):
+        return self.bucket.blob(name).generate_signed_url(
+            version="v4",
+            method="GET",
+            expiration=datetime.fromtimestamp(expires_at, tz=timezone.utc),
+            response_disposition=response_disposition
+        )
+
+    def health_check(self):
+        return self.bucket.exists()
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Objects as files under STORAGE_LOCAL_ROOT/<bucket>/<name>.
+
+    Writes go to a temporary file that is renamed into place, so readers never see
+    partial objects. Files are served by the API with FileResponse (zero-copy where
+    the server supports the ASGI pathsend extension), or a reverse proxy can serve
+    STORAGE_LOCAL_ROOT directly at STORAGE_PUBLIC_BASE_URL. Content types are derived
+    from the file extension.
+    """
+
+    kind = "local"
+
+    def __init__(self, bucket_name: str, root: str, public_base_url: str):
+        super().__init__(bucket_name)
+        # Directories are created by writes only, never on the read path
+        self.root = os.path.realpath(os.path.join(root, bucket_name))
+        self.public_base_url = public_base_url.rstrip("/")
+
+    def put(self, name, file_obj, size, content_type, cache_control=None, public=True):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(temp_path, "wb") as target:
+            while True:
+                chunk = file_obj.read(1024 * 1024)
+                if not chunk:
+                    break
+                target.write(chunk)
+        os.replace(temp_path, path)
+
+    def put_stream(self, name, chunks, content_type, cache_control=None, public=True):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        size = 0
+        try:
+            with open(temp_path, "wb") as target:
+                for chunk in chunks:
+                    target.write(chunk)
+                    size += len(chunk)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return size
+
+    def stream(self, name, start=0, end=None, chunk_size=1024 * 1024, generation=None):
+        path = self._path(name)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"File not found: {name}")
+        with open(path, "rb") as source:
+            source.seek(start)
+            remaining = (end - start + 1) if end is not None else None
+            while remaining is None or remaining > 0:
+                chunk = source.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def stat(self, name, cached=False):
+        try:
+            stat_result = os.stat(self._path(name))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        modified = datetime.fromtimestamp(stat_result.st_mtime, tz=timezone.utc).isoformat()
+        return {
+            "name": name,
+            "size": stat_result.st_size,
+            "content_type": mimetypes.guess_type(name)[0] or "application/octet-stream",
+            "etag": f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}",
+            "generation": stat_result.st_mtime_ns,
+            "created": modified,
+            "updated": modified,
+            "md5_hash": None
+        }
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def public_url(self, name):
+        return f"{self.public_base_url}/{self.bucket_name}/{name}"
+
+    def local_path(self, name):
+        path = self._path(name)
+        return path if os.path.isfile(path) else None
+
+    def health_check(self):
+        # The bucket directory appears with the first upload; until then its parent must be writable
+        path = self.root
+        while not os.path.isdir(path) and os.path.dirname(path) != path:
+            path = os.path.dirname(path)
+        return os.access(path, os.W_OK)
+
+    def _path(self, name: str) -> str:
+        """Resolve an object name to a path, refusing names that escape the bucket directory"""
+        path = os.path.realpath(os.path.join(self.root, name))
+        if os.path.commonpath([path, self.root]) != self.root:
+            raise PermissionError(f"Invalid object name: {name}")
+        return path
+
+
+class MemoryStorageBackend(StorageBackend):
+    """
+    Objects kept in a process-local dict, for tests and load tests that should
+    measure our own code without any storage I/O. Contents are lost on restart.
+    """
+
+    kind = "memory"
+
+    def __init__(self, bucket_name: str, public_base_url: str):
+        super().__init__(bucket_name)
+        self.public_base_url = public_base_url.rstrip("/")
+        self._objects: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, name, file_obj, size, content_type, cache_control=None, public=True):
+        data = file_obj.read()
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            created = self._objects.get(name, {}).get("created", now)
+            self._objects[name] = {
+                "data": data,
+                "content_type": content_type,
+                "generation": time.time_ns(),
+                "created": created,
+                "updated": now,
+                "md5_hash": hashlib.md5(data).hexdigest()
+            }
+
+    def put_stream(self, name, chunks, content_type, cache_control=None, public=True):
+        data = b"".join(chunks)
+        self.put(name, io.BytesIO(data), len(data), content_type, cache_control, public)
+        return len(data)
+
+    def stream(self, name, start=0, end=None, chunk_size=1024 * 1024, generation=None):
+        entry = self._objects.get(name)
+        if entry is None:
+            raise FileNotFoundError(f"File not found: {name}")
+        data = entry["data"]
+        end = len(data) - 1 if end is None else min(end, len(data) - 1)
+        for offset in range(start, end + 1, chunk_size):
+            yield data[offset:min(offset + chunk_size, end + 1)]
+
+    def stat(self, name, cached=False):
+        entry = self._objects.get(name)
+        if entry is None:
+            return None
+        return {
+            "name": name,
+            "size": len(entry["data"]),
+            "content_type": entry["content_type"] or "application/octet-stream",
+            "etag": entry["md5_hash"],
+            "generation": entry["generation"],
+            "created": entry["created"],
+            "updated": entry["updated"],
+            "md5_hash": entry["md5_hash"]
+        }
+
+    def delete(self, name):
+        with self._lock:
+            self._objects.pop(name, None)
+
+    def public_url(self, name):
+        return f"{self.public_base_url}/{self.bucket_name}/{name}"
+
+
+_backends: Dict[str, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_storage_backend(bucket_name: Optional[str] = None) -> StorageBackend:
+    """
+    Storage backend for a bucket, selected by STORAGE_BACKEND (gcs, local or memory)
+
+    Args:
+        bucket_name: Bucket name, defaults to GCS_BUCKET_NAME
+
+    Returns:
+        Backend instance, shared per bucket
+    """
+    bucket_name = bucket_name or os.getenv("GCS_BUCKET_NAME", "deck123")
+    backend = _backends.get(bucket_name)
+    if backend:
+        return backend
+
+    with _backends_lock:
+        if bucket_name not in _backends:
+            kind = storage_backend_kind()
+            public_base_url = os.getenv("STORAGE_PUBLIC_BASE_URL", "http://localhost:8000/gcs/objects")
+            if kind == "local":
+                _backends[bucket_name] = LocalStorageBackend(
+                    bucket_name, os.getenv("STORAGE_LOCAL_ROOT", "storage_data"), public_base_url
+                )
+            elif kind == "memory":
+                _backends[bucket_name] = MemoryStorageBackend(bucket_name, public_base_url)
+            else:
+                _backends[bucket_name] = GCSStorageBackend(bucket_name)
+            print(f"🗄️ Storage backend for '{bucket_name}': {kind}")
+        return _backends[bucket_name]
+
+
+def storage_backend_kind() -> str:
+    """Configured backend kind (STORAGE_BACKEND), defaulting to gcs"""
+    kind = os.getenv("STORAGE_BACKEND", "gcs").lower()
+    if kind not in STORAGE_BACKENDS:
+        print(f"⚠️ Unknown STORAGE_BACKEND '{kind}', using 'gcs'")
+        kind = "gcs"
+    return kind
@@ -1,57 +1,303 @@
 """
-Generic Google Cloud Storage Service
+Generic Object Storage Service
 """
 import os
 import io
-from typing import Optional
-from app.core.gcs_client import get_shared_gcs_client
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union, List, Dict, Any, Callable, Tuple, Iterable
+from app.core.storage_backends import StorageBackend, get_storage_backend
+from app.core.object_index_service import object_index_service, content_sha256
+from app.gcs.utils import GCSURLParser
+
 
 class StorageService:
+    """
+    Async upload layer over the configured storage backend (STORAGE_BACKEND).
+
+    All blocking backend calls run on one bounded thread pool, so uploads from async
+    code neither block the event loop nor open an unbounded number of connections.
+    Generated videos are piped into storage as they download (upload_stream)
+    instead of being buffered. See storage_backends for resumable uploads and how
+    objects are published.
+
+    Uploads are deduplicated by content (STORAGE_DEDUP_ENABLED): bytes that are
+    already stored return the existing object's URL without uploading again, and
+    new content is stored under a name derived from its SHA-256. See
+    object_index_service for the reference counting behind release().
+    """
+
     def __init__(self):
         self.gcs_bucket_name = os.getenv("GCS_BUCKET_NAME", "deck123")
-        self.storage_client = get_shared_gcs_client()
-        self.bucket = self.storage_client.bucket(self.gcs_bucket_name)
-        print("✅ Storage Service: Using credentials from environment variables")
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("GCS_UPLOAD_WORKERS", "8")),
+            thread_name_prefix="gcs-upload"
+        )
+
+    def backend(self, bucket_name: Optional[str] = None) -> StorageBackend:
+        """Storage backend for a bucket (default GCS_BUCKET_NAME)"""
+        return get_storage_backend(bucket_name or self.gcs_bucket_name)
+
+    async def run(self, function: Callable, *args, **kwargs) -> Any:
+        """Run a blocking storage call on the upload thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: function(*args, **kwargs))
+
+    def upload_sync(
+        self,
+        data: Union[bytes, io.IOBase],
+        filename: str,
+        content_type: str,
+        bucket_name: Optional[str] = None,
+        cache_control: Optional[str] = None,
+        dedupe: bool = True
+    ) -> str:
+        """Upload bytes or a file-like object and return its public URL (blocking)"""
+        file_obj = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+        file_obj.seek(0, io.SEEK_END)
+        size = file_obj.tell()
+        file_obj.seek(0)  # Reset file pointer to beginning
+
+        backend = self.backend(bucket_name)
+        if dedupe and object_index_service.enabled:
+            sha256 = content_sha256(file_obj)
+            indexed, existing = self._acquire(backend, sha256)
+            if existing:
+                return existing
+            if indexed:
+                object_name = object_index_service.object_name(sha256, filename)
+                backend.put(object_name, file_obj, size, content_type, cache_control)
+                return self._register(backend, sha256, object_name, size, content_type)
+
+        backend.put(filename, file_obj, size, content_type, cache_control)
+
+        public_url = backend.public_url(filename)
+        print(f"File uploaded to storage: {public_url}")
+        return public_url
+
+    def _acquire(self, backend: StorageBackend, sha256: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up already stored content (blocking)
+
+        Returns:
+            (indexed, public URL of the existing object or None); indexed is False
+            when the index is unavailable and the upload should skip deduplication
+        """
+        try:
+            existing = object_index_service.acquire(backend.bucket_name, sha256)
+        except Exception as e:
+            print(f"⚠️ Object index unavailable, uploading without deduplication: {e}")
+            return False, None
+
+        if not existing:
+            return True, None
+        public_url = backend.public_url(existing)
+        print(f"♻️ Reusing stored object: {public_url}")
+        return True, public_url
+
+    def _register(self, backend: StorageBackend, sha256: str, object_name: str, size: int, content_type: str) -> str:
+        """Index a freshly stored content-addressed object and return the URL to hand out (blocking)"""
+        try:
+            registered = object_index_service.register(backend.bucket_name, sha256, object_name, size, content_type)
+        except Exception as e:
+            # The object is stored; it just won't be shared or deleted through the index
+            print(f"⚠️ Could not index stored object {object_name}: {e}")
+            registered = object_name
+
+        if registered != object_name:
+            # Same content was stored concurrently under another name
+            self._delete_objects(backend, [object_name])
+
+        public_url = backend.public_url(registered)
+        print(f"File uploaded to storage: {public_url}")
+        return public_url
+
+    async def upload(
+        self,
+        data: Union[bytes, io.IOBase],
+        filename: str,
+        content_type: str,
+        bucket_name: Optional[str] = None,
+        cache_control: Optional[str] = None,
+        dedupe: bool = True
+    ) -> str:
+        """
+        Upload bytes or a file-like object off the event loop and return its public URL
+
+        Args:
+            data: File contents or a seekable file-like object
+            filename: Object name in the bucket
+            content_type: MIME type of the file
+            bucket_name: Optional bucket name, uses default if not provided
+            cache_control: Optional Cache-Control header for the object
+            dedupe: Reuse an existing object with the same content (if STORAGE_DEDUP_ENABLED);
+                pass False when the object must live under exactly filename
+
+        Returns:
+            Public URL of the uploaded file (or of the identical object already stored)
+        """
+        return await self.run(self.upload_sync, data, filename, content_type, bucket_name, cache_control, dedupe)
+
+    async def upload_many(self, files: List[Dict[str, Any]], bucket_name: Optional[str] = None) -> List[str]:
+        """
+        Upload several files in parallel
+
+        Args:
+            files: Dictionaries with "data", "filename", "content_type" and optional "cache_control"
+            bucket_name: Optional bucket name, uses default if not provided
+
+        Returns:
+            Public URLs in the same order as files
+        """
+        return list(await asyncio.gather(*[
+            self.upload(f["data"], f["filename"], f["content_type"], bucket_name, f.get("cache_control"))
+            for f in files
+        ]))
+
+    def upload_stream_sync(
+        self,
+        chunks: Iterable[bytes],
+        filename: str,
+        content_type: str,
+        bucket_name: Optional[str] = None,
+        cache_control: Optional[str] = None,
+        dedupe: bool = True
+    ) -> str:
+        """Upload an iterable of chunks as it is produced and return the public URL (blocking)"""
+        backend = self.backend(bucket_name)
+        digest = hashlib.sha256()
+
+        def hashed_chunks():
+            for chunk in chunks:
+                digest.update(chunk)
+                yield chunk
+
+        size = backend.put_stream(filename, hashed_chunks(), content_type, cache_control)
+        if dedupe and object_index_service.enabled:
+            return self._register(backend, digest.hexdigest(), filename, size, content_type)
+
+        public_url = backend.public_url(filename)
+        print(f"File uploaded to storage: {public_url}")
+        return public_url
+
+    async def upload_stream(
+        self,
+        chunks: Iterable[bytes],
+        filename: str,
+        content_type: str,
+        bucket_name: Optional[str] = None,
+        cache_control: Optional[str] = None,
+        dedupe: bool = True
+    ) -> str:
+        """
+        Pipe a stream of chunks (e.g. a provider download) into storage without buffering it
+
+        The iterable is consumed on the upload thread pool, so it may block on network
+        reads. Only one upload chunk (GCS_UPLOAD_CHUNK_SIZE) is held in memory and
+        nothing touches the local disk. Since the content hash is only known at the
+        end, the object is stored under filename and indexed there; if the same
+        content is already stored, the new copy is deleted and the existing URL
+        returned.
+
+        Args:
+            chunks: Iterable of bytes; consumed once
+            filename: Object name in the bucket
+            content_type: MIME type of the file
+            bucket_name: Optional bucket name, uses default if not provided
+            cache_control: Optional Cache-Control header for the object
+            dedupe: Index the object by content (if STORAGE_DEDUP_ENABLED)
+
+        Returns:
+            Public URL of the uploaded file (or of the identical object already stored)
+        """
+        return await self.run(self.upload_stream_sync, chunks, filename, content_type, bucket_name, cache_control, dedupe)
+
+    async def retain(self, url: str) -> bool:
+        """
+        Take another reference to a deduplicated object whose URL is stored in a new record
+
+        Returns:
+            False if the URL isn't a deduplicated object (nothing to count)
+        """
+        try:
+            bucket_name, object_name = GCSURLParser.parse_gcs_url(url)
+            return await self.run(object_index_service.retain, bucket_name, object_name)
+        except Exception as e:
+            print(f"⚠️ Could not retain stored object {url}: {e}")
+            return False
+
+    async def release(self, url: str) -> bool:
+        """
+        Drop one reference to a deduplicated object
+
+        The object is only deleted once nothing references it and
+        STORAGE_DEDUP_DELETE_UNREFERENCED is enabled. Objects that aren't in the index
+        (uploaded before deduplication, or with dedupe=False) are left alone.
+
+        Returns:
+            True if the object was deleted
+        """
+        try:
+            bucket_name, object_name = GCSURLParser.parse_gcs_url(url)
+            backend = self.backend(bucket_name)
+            deleted = await self.run(
+                object_index_service.release, bucket_name, object_name, lambda: backend.delete(object_name)
+            )
+            if deleted:
+                print(f"🗑️ Deleted unreferenced object: {url}")
+            return deleted
+        except Exception as e:
+            print(f"⚠️ Could not release stored object {url}: {e}")
+            return False
+
+    def _delete_objects(self, backend: StorageBackend, names: List[str]):
+        """Delete objects nothing refers to; leftovers only cost storage"""
+        try:
+            backend.delete_many(names)
+        except Exception as e:
+            print(f"⚠️ Could not delete unneeded objects: {e}")
+
 
 def upload_to_gcs(file_obj: io.BytesIO, filename: str, content_type: str, bucket_name: Optional[str] = None) -> str:
     """
-    Upload a file to Google Cloud Storage and return the public URL
-    
+    Upload a file to the configured storage backend (Google Cloud Storage by default) and return the public URL (blocking)
+
     Args:
         file_obj: File-like object containing the data
         filename: Name of the file in GCS
         content_type: MIME type of the file
         bucket_name: Optional bucket name, uses default if not provided
-    
+
     Returns:
         Public URL of the uploaded file
     """
     try:
-        storage_service = StorageService()
-        
-        # Use provided bucket or default
-        if bucket_name:
-            bucket = storage_service.storage_client.bucket(bucket_name)
-        else:
-            bucket = storage_service.bucket
-        
-        # Create blob and upload
-        blob = bucket.blob(filename)
-        file_obj.seek(0)  # Reset file pointer to beginning
-        
-        blob.upload_from_file(
-            file_obj,
-            content_type=content_type
-        )
-        
-        # Make the blob publicly accessible
-        blob.make_public()
-        
-        public_url = blob.public_url
-        print(f"File uploaded to GCS: {public_url}")
-        
-        return public_url
-        
+        return storage_service.upload_sync(file_obj, filename, content_type, bucket_name)
     except Exception as e:
-        print(f"Error uploading to GCS: {e}")
-        raise e
\ No newline at end of file
+        print(f"Error uploading to storage: {e}")
+        raise e
+
+
+async def upload_to_gcs_async(
+    file_obj: Union[bytes, io.IOBase],
+    filename: str,
+    content_type: str,
+    bucket_name: Optional[str] = None
+) -> str:
+    """
+    Async variant of upload_to_gcs for use inside request handlers and services
+
+    Returns:
+        Public URL of the uploaded file
+    """
+    try:
+        return await storage_service.upload(file_obj, filename, content_type, bucket_name)
+    except Exception as e:
+        print(f"Error uploading to storage: {e}")
+        raise e
+
+
+# Global storage service instance
+storage_service = StorageService()
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.storage_service import upload_to_gcs
+from app.core.storage_service import upload_to_gcs_async
 from app.document_generation.models import (
     BusinessProposalRequest, BusinessProposalResponse,
     PartnershipAgreementRequest, PartnershipAgreementResponse,
@@ -123,7 +123,7 @@ async def upload_business_proposal_file(proposal_id: int, file: UploadFile = Fil
         file_content = await file.read()
         file_obj = io.BytesIO(file_content)
         
-        docs_url = upload_to_gcs(file_obj, unique_filename, file.content_type or "application/octet-stream")
+        docs_url = await upload_to_gcs_async(file_obj, unique_filename, file.content_type or "application/octet-stream")
         
         proposal = update_business_proposal_docs_url(db, proposal_id, docs_url)
         if not proposal:
@@ -211,7 +211,7 @@ async def upload_partnership_agreement_file(agreement_id: int, file: UploadFile
         file_content = await file.read()
         file_obj = io.BytesIO(file_content)
         
-        docs_url = upload_to_gcs(file_obj, unique_filename, file.content_type or "application/octet-stream")
+        docs_url = await upload_to_gcs_async(file_obj, unique_filename, file.content_type or "application/octet-stream")
         
         agreement = update_partnership_agreement_docs_url(db, agreement_id, docs_url)
         if not agreement:
@@ -299,7 +299,7 @@ async def upload_nda_file(nda_id: int, file: UploadFile = File(...), db: Session
         file_content = await file.read()
         file_obj = io.BytesIO(file_content)
         
-        docs_url = upload_to_gcs(file_obj, unique_filename, file.content_type or "application/octet-stream")
+        docs_url = await upload_to_gcs_async(file_obj, unique_filename, file.content_type or "application/octet-stream")
         
         nda = update_nda_docs_url(db, nda_id, docs_url)
         if not nda:
@@ -392,7 +392,7 @@ async def upload_contract_file(contract_id: int, file: UploadFile = File(...), d
         file_content = await file.read()
         file_obj = io.BytesIO(file_content)
         
-        docs_url = upload_to_gcs(file_obj, unique_filename, file.content_type or "application/octet-stream")
+        docs_url = await upload_to_gcs_async(file_obj, unique_filename, file.content_type or "application/octet-stream")
         
         contract = update_contract_docs_url(db, contract_id, docs_url)
         if not contract:
@@ -480,7 +480,7 @@ async def upload_terms_of_service_file(terms_id: int, file: UploadFile = File(..
         file_content = await file.read()
         file_obj = io.BytesIO(file_content)
         
-        docs_url = upload_to_gcs(file_obj, unique_filename, file.content_type or "application/octet-stream")
+        docs_url = await upload_to_gcs_async(file_obj, unique_filename, file.content_type or "application/octet-stream")
         
         terms = update_terms_of_service_docs_url(db, terms_id, docs_url)
         if not terms:
@@ -567,7 +567,7 @@ async def upload_privacy_policy_file(policy_id: int, file: UploadFile = File(...
         file_content = await file.read()
         file_obj = io.BytesIO(file_content)
         
-        docs_url = upload_to_gcs(file_obj, unique_filename, file.content_type or "application/octet-stream")
+        docs_url = await upload_to_gcs_async(file_obj, unique_filename, file.content_type or "application/octet-stream")
         
         policy = update_privacy_policy_docs_url(db, policy_id, docs_url)
         if not policy:
@@ -1,9 +1,9 @@
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.schema.output_parser import StrOutputParser
-from services.document_utils import save_docx_to_gcs
+from app.document_generation.services.document_utils import save_docx_to_gcs
 from datetime import datetime
-from google.cloud import storage
+from app.core.storage_service import upload_to_gcs_async
 import os
 from docx import Document
 from docx.shared import Inches, Pt
@@ -89,12 +89,7 @@ async def generate_business_proposal(data: dict):
         filename = f"Business_Proposal_{data.get('client_name', '').replace(' ', '_')}_{unique_id}.docx"
 
         # Upload DOCX to GCS
-        client = storage.Client()
-        bucket = client.bucket("deck123")
-        docx_blob = bucket.blob(filename)
-        docx_blob.upload_from_string(docx_bytes.getvalue(), content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
-        docx_blob.make_public()
-        document_url = docx_blob.public_url
+        document_url = await upload_to_gcs_async(docx_bytes, filename, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
         
         return {
             "document_content": document_content.strip(),
@@ -110,23 +105,10 @@ async def generate_business_proposal(data: dict):
         raise e
 
 async def upload_to_gcs(content: str, filename: str, content_type: str = "text/plain"):
-    """Upload content to Google Cloud Storage and return the public URL"""
+    """Upload content through the shared storage service and return the public URL"""
     try:
-        # Initialize GCS client
-        client = storage.Client()
-        bucket_name = "deck123"  # Your bucket name
-        bucket = client.bucket(bucket_name)
-        
-        # Create blob
-        blob = bucket.blob(filename)
-        
-        # Upload content
-        blob.upload_from_string(content, content_type=content_type)
-        
-        # Make blob public
-        blob.make_public()
-        
-        return blob.public_url
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        return await upload_to_gcs_async(data, filename, content_type)
     except Exception as e:
         print(f"Error uploading to GCS: {e}")
         return None
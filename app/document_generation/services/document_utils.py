@@ -1,4 +1,4 @@
-from services.storage_service import upload_to_gcs
+from app.core.storage_service import upload_to_gcs_async
 import io
 import os
 from docx import Document
@@ -28,7 +28,7 @@ async def save_document_to_gcs(document_content: str, document_type: str, genera
             raise Exception("GCS_BUCKET_NAME environment variable is not set")
         
         # Upload to Google Cloud Storage
-        public_url = upload_to_gcs(file_obj, file_name, "text/plain", bucket_name)
+        public_url = await upload_to_gcs_async(file_obj, file_name, "text/plain", bucket_name)
         return public_url
     except Exception as e:
         print(f"Error saving document to GCS: {e}")
@@ -64,7 +64,7 @@ async def save_docx_to_gcs(document_content: str, document_type: str, generated_
             raise Exception("GCS_BUCKET_NAME environment variable is not set")
         
         # Upload to Google Cloud Storage
-        public_url = upload_to_gcs(doc_bytes, file_name, "application/vnd.openxmlformats-officedocument.wordprocessingml.document", bucket_name)
+        public_url = await upload_to_gcs_async(doc_bytes, file_name, "application/vnd.openxmlformats-officedocument.wordprocessingml.document", bucket_name)
         return public_url
     except Exception as e:
         print(f"Error saving .docx document to GCS: {e}")
@@ -1,7 +1,7 @@
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.schema.output_parser import StrOutputParser
-from services.document_utils import save_docx_to_gcs
+from app.document_generation.services.document_utils import save_docx_to_gcs
 from datetime import datetime
 
 # --- OpenAI Model ---
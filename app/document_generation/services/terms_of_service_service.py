@@ -1,7 +1,8 @@
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.schema.output_parser import StrOutputParser
-from services.document_utils import save_docx_to_gcs, upload_to_gcs
+from app.document_generation.services.document_utils import save_docx_to_gcs
+from app.core.storage_service import upload_to_gcs_async
 from datetime import datetime
 import os
 import tempfile
@@ -270,7 +271,6 @@ def parse_markdown_to_runs(paragraph, text):
 async def generate_terms_of_service(data: dict):
     """Generate Terms of Service document using GPT-4o and save as .docx with logo and page numbers"""
     try:
-        from google.cloud import storage
         import uuid
         import io
         
@@ -314,12 +314,7 @@ async def generate_terms_of_service(data: dict):
         filename = f"Terms_of_Service_{data.get('company_name', '').replace(' ', '_')}_{unique_id}.docx"
 
         # Upload DOCX to GCS
-        client = storage.Client()
-        bucket = client.bucket("deck123")
-        docx_blob = bucket.blob(filename)
-        docx_blob.upload_from_string(docx_bytes.getvalue(), content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
-        docx_blob.make_public()
-        document_url = docx_blob.public_url
+        document_url = await upload_to_gcs_async(docx_bytes, filename, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
         
         return {
             "document_content": document_content.strip(),
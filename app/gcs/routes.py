@@ -1,41 +1,135 @@
 """
 Google Cloud Storage Routes
 """
-from fastapi import APIRouter, HTTPException, Response
-from fastapi.responses import StreamingResponse
-import io
+from fastapi import APIRouter, HTTPException, Response, Header, Query
+from fastapi.responses import StreamingResponse, RedirectResponse, FileResponse
+import asyncio
+from typing import Optional
 from .models import GCSDownloadRequest, GCSDownloadResponse, GCSErrorResponse
-from .services.download_service import GCSDownloadService
+from app.core.gcs_metadata_cache import gcs_metadata_cache
+from app.core.storage_backends import storage_backend_kind
+from .services.download_service import gcs_download_service
 
 router = APIRouter()
 
 @router.post("/download", response_model=GCSDownloadResponse)
-async def download_gcs_file(request: GCSDownloadRequest):
+async def download_gcs_file(
+    request: GCSDownloadRequest,
+    mode: Optional[str] = Query(None, description="proxy (stream through the API) or redirect (303 to a signed URL); defaults to GCS_DOWNLOAD_MODE"),
+    range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Download a file from Google Cloud Storage and return it as a streaming response.
     
+    The file is streamed chunk by chunk from GCS, so memory use per download is
+    constant. Range requests return 206 Partial Content and a matching If-None-Match
+    returns 304 Not Modified. In redirect mode the client is sent to a short-lived
+    signed URL instead and downloads straight from GCS.
+    
     Args:
         request: GCSDownloadRequest containing the GCS file URL
+        mode: "proxy" or "redirect"
+        range: Optional Range header, e.g. "bytes=0-1048575"
+        if_none_match: Optional If-None-Match header with a previously returned ETag
         
     Returns:
         StreamingResponse with the file content
     """
-    try:
-        download_service = GCSDownloadService()
-        
-        # Download the file
-        file_content, filename, content_type, size_bytes = download_service.download_file(request.file_url)
+    if (mode or gcs_download_service.download_mode) == "redirect":
+        # 303 so clients follow the redirect with a GET
+        return _redirect_to_signed_url(request.file_url, status_code=303)
+    return await _stream_gcs_file(request.file_url, range, if_none_match)
+
+
+@router.get("/download")
+async def download_gcs_file_get(
+    file_url: str = Query(..., description="Google Cloud Storage file URL"),
+    mode: Optional[str] = Query(None, description="proxy or redirect (302 to a signed URL); defaults to GCS_DOWNLOAD_MODE"),
+    range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    GET variant of /download, usable directly as a <video>/<img> src so browsers can seek with Range requests.
+    """
+    if (mode or gcs_download_service.download_mode) == "redirect":
+        return _redirect_to_signed_url(file_url, status_code=302)
+    return await _stream_gcs_file(file_url, range, if_none_match)
+
+
+@router.get("/objects/{bucket_name}/{file_path:path}")
+async def get_stored_object(
+    bucket_name: str,
+    file_path: str,
+    range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Public URL of objects kept by the local or in-memory storage backend (STORAGE_BACKEND).
+    
+    GCS objects are served by GCS itself, so this returns 404 with the gcs backend.
+    """
+    if storage_backend_kind() == "gcs":
+        raise HTTPException(status_code=404, detail="Not found")
+    return await _stream_gcs_file(f"gs://{bucket_name}/{file_path}", range, if_none_match, disposition="inline")
+
+
+@router.post("/signed-url")
+async def get_gcs_signed_url(request: GCSDownloadRequest):
+    """
+    Get a short-lived V4 signed URL for downloading a file directly from GCS.
+    
+    Args:
+        request: GCSDownloadRequest containing the GCS file URL
         
-        # Return as streaming response
-        return StreamingResponse(
-            io.BytesIO(file_content.read()),
-            media_type=content_type,
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Length": str(size_bytes)
-            }
+    Returns:
+        Signed URL with its expiry time
+    """
+    try:
+        signed = gcs_download_service.get_signed_url(request.file_url)
+        return {
+            "success": True,
+            **signed
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid URL: {str(e)}")
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+def _redirect_to_signed_url(file_url: str, status_code: int) -> RedirectResponse:
+    """Redirect to a cached signed URL; the API does no GCS request for the download"""
+    try:
+        signed = gcs_download_service.get_signed_url(file_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid URL: {str(e)}")
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    # Clients may reuse the redirect while the signed URL is still comfortably valid
+    max_age = max(0, signed["expires_in"] - gcs_download_service.signed_url_ttl)
+    return RedirectResponse(
+        signed["url"],
+        status_code=status_code,
+        headers={"Cache-Control": f"private, max-age={max_age}"}
+    )
+
+
+async def _stream_gcs_file(
+    file_url: str,
+    range_header: Optional[str],
+    if_none_match: Optional[str],
+    disposition: str = "attachment"
+):
+    """Resolve the download with one metadata call and stream the requested bytes"""
+    try:
+        download = await asyncio.to_thread(
+            gcs_download_service.open_download, file_url, range_header, if_none_match
         )
-        
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid URL: {str(e)}")
     except FileNotFoundError as e:
@@ -45,6 +139,40 @@ async def download_gcs_file(request: GCSDownloadRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+    headers = {"Accept-Ranges": "bytes"}
+    if download["etag"]:
+        headers["ETag"] = download["etag"]
+
+    if download["status"] == 304:
+        return Response(status_code=304, headers=headers)
+    if download["status"] == 416:
+        headers["Content-Range"] = f"bytes */{download['size_bytes']}"
+        return Response(status_code=416, headers=headers)
+
+    if download["local_path"]:
+        # Served from disk; FileResponse handles Range itself and can use sendfile (pathsend)
+        return FileResponse(
+            download["local_path"],
+            media_type=download["content_type"],
+            filename=download["filename"],
+            content_disposition_type=disposition,
+            headers=headers
+        )
+
+    start, end = download["start"], download["end"]
+    headers["Content-Disposition"] = f"{disposition}; filename={download['filename']}"
+    headers["Content-Length"] = str(end - start + 1)
+    if download["status"] == 206:
+        headers["Content-Range"] = f"bytes {start}-{end}/{download['size_bytes']}"
+
+    # A sync iterator: Starlette pulls each chunk in its thread pool
+    return StreamingResponse(
+        gcs_download_service.iter_content(download),
+        status_code=download["status"],
+        media_type=download["content_type"],
+        headers=headers
+    )
+
 
 @router.post("/file-info")
 async def get_gcs_file_info(request: GCSDownloadRequest):
@@ -58,10 +186,8 @@ async def get_gcs_file_info(request: GCSDownloadRequest):
         File information including size, content type, etc.
     """
     try:
-        download_service = GCSDownloadService()
-        
         # Get file information
-        file_info = download_service.get_file_info(request.file_url)
+        file_info = await asyncio.to_thread(gcs_download_service.get_file_info, request.file_url)
         
         return {
             "success": True,
@@ -81,4 +207,4 @@ async def get_gcs_file_info(request: GCSDownloadRequest):
 @router.get("/health")
 async def health_check():
     """Health check endpoint for GCS service."""
-    return {"status": "healthy", "service": "gcs-download"}
\ No newline at end of file
+    return {"status": "healthy", "service": "gcs-download", "metadata_cache": gcs_metadata_cache.stats()}
\ No newline at end of file
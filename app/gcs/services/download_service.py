@@ -1,105 +1,274 @@
 """
 Google Cloud Storage Download Service
 """
-import io
-from typing import Tuple, Optional
+import os
+import re
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Iterator, Optional, Dict, Any
 from google.api_core import exceptions
-from app.core.gcs_client import get_shared_gcs_client
+from app.core.storage_backends import get_storage_backend
 from ..utils import GCSURLParser
 
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+GCS_DOWNLOAD_MODES = ("proxy", "redirect")
+
 
 class GCSDownloadService:
     def __init__(self):
-        self.storage_client = get_shared_gcs_client()
-        print("✅ GCS Download Service: Using credentials from environment variables")
+        self.chunk_size = int(os.getenv("GCS_DOWNLOAD_CHUNK_SIZE", str(2 * 1024 * 1024)))
+        self.download_mode = os.getenv("GCS_DOWNLOAD_MODE", "proxy").lower()
+        if self.download_mode not in GCS_DOWNLOAD_MODES:
+            print(f"⚠️ Unknown GCS_DOWNLOAD_MODE '{self.download_mode}', using 'proxy'")
+            self.download_mode = "proxy"
 
-    def download_file(self, gcs_url: str) -> Tuple[io.BytesIO, str, str, int]:
+        # Signed URLs: valid for at least signed_url_ttl seconds when handed out; one URL
+        # per object is signed per signed_url_window and reused until the window ends
+        self.signed_url_ttl = int(os.getenv("GCS_SIGNED_URL_TTL", "900"))
+        self.signed_url_window = int(os.getenv("GCS_SIGNED_URL_WINDOW", "300"))
+        # Buckets clients may download from or get signed URLs for; bucket names come from
+        # unauthenticated requests, so nothing else reaches get_storage_backend
+        self.allowed_buckets = {
+            bucket.strip()
+            for bucket in os.getenv(
+                "GCS_DOWNLOAD_BUCKETS",
+                os.getenv("GCS_SIGNED_URL_BUCKETS", os.getenv("GCS_BUCKET_NAME", "deck123"))
+            ).split(",")
+            if bucket.strip()
+        }
+        # Signed URLs of the current window by "bucket/path"; the dict is replaced when the window ends
+        self.signed_url_cache_max_entries = int(os.getenv("GCS_SIGNED_URL_CACHE_MAX_ENTRIES", "10000"))
+        self._signed_urls: Dict[str, Dict[str, Any]] = {}
+        self._signed_urls_window = None
+        self._signed_urls_lock = threading.Lock()
+
+    def open_download(
+        self,
+        gcs_url: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Download a file from Google Cloud Storage.
-        
+        Resolve a download with a single metadata request, without reading the content.
+
         Args:
             gcs_url: GCS URL in format gs://bucket-name/path/to/file
-            
+            range_header: Optional HTTP Range header ("bytes=start-end", "bytes=start-" or "bytes=-suffix")
+            if_none_match: Optional HTTP If-None-Match header
+
         Returns:
-            Tuple of (file_content, filename, content_type, size_bytes)
-            
+            Dictionary with backend, path, generation, local_path (set when the file
+            can be served from disk), filename, content_type, size_bytes, etag and
+            status: 304 if the client's copy is current, 206 for a satisfiable range
+            (with start/end), 416 for an unsatisfiable one, 200 otherwise
+
         Raises:
             ValueError: If URL format is invalid
             FileNotFoundError: If file doesn't exist
             PermissionError: If access is denied
             Exception: For other GCS errors
         """
+        backend, file_path, info = self._stat(gcs_url)
+        size_bytes = info["size"]
+        download = {
+            "backend": backend,
+            "path": file_path,
+            "generation": info["generation"],
+            "local_path": backend.local_path(file_path),
+            "filename": file_path.split('/')[-1],
+            "content_type": info["content_type"],
+            "size_bytes": size_bytes,
+            "etag": f'"{info["etag"]}"' if info["etag"] else None,
+            "status": 200,
+            "start": 0,
+            "end": size_bytes - 1
+        }
+
+        if if_none_match and download["etag"] and self._etag_matches(if_none_match, download["etag"]):
+            download["status"] = 304
+            return download
+
+        if range_header:
+            byte_range = self._parse_range(range_header, size_bytes)
+            if byte_range is None:
+                download["status"] = 416
+            elif byte_range != (0, size_bytes - 1):
+                download["status"] = 206
+                download["start"], download["end"] = byte_range
+
+        return download
+
+    def iter_content(self, download: Dict[str, Any]) -> Iterator[bytes]:
+        """
+        Yield the requested bytes of an open_download result in GCS_DOWNLOAD_CHUNK_SIZE ranged reads.
+
+        The generation from open_download is pinned, so every chunk is read from the
+        same object version even if it is overwritten meanwhile. Only one chunk is
+        held in memory at a time.
+        """
+        return download["backend"].stream(
+            download["path"],
+            download["start"],
+            download["end"],
+            chunk_size=self.chunk_size,
+            generation=download["generation"]
+        )
+
+    def get_signed_url(self, gcs_url: str) -> Dict[str, Any]:
+        """
+        Issue a short-lived V4 signed GET URL so the client downloads straight from GCS.
+
+        Local and in-memory storage backends have no signing; their public URL is returned.
+
+        Signing happens locally with the service account key (no GCS request), and
+        the result is cached per object and expiry window, so repeated downloads of
+        the same file cost a dictionary lookup. Object existence is not checked; GCS
+        answers 404 for missing objects itself. Range and conditional requests
+        against the signed URL are handled by GCS.
+
+        Args:
+            gcs_url: GCS URL in format gs://bucket-name/path/to/file
+
+        Returns:
+            {"url", "expires_at" (ISO 8601), "expires_in" (seconds from now)}
+
+        Raises:
+            ValueError: If URL format is invalid
+            PermissionError: If the bucket is not in GCS_DOWNLOAD_BUCKETS
+        """
         try:
-            # Parse and validate the GCS URL
             bucket_name, file_path = GCSURLParser.parse_gcs_url(gcs_url)
-            
-            # Get the bucket and blob
-            bucket = self.storage_client.bucket(bucket_name)
-            blob = bucket.blob(file_path)
-            
-            # Check if the blob exists
-            if not blob.exists():
-                raise FileNotFoundError(f"File not found: {gcs_url}")
-            
-            # Download the file content
-            file_content = io.BytesIO()
-            blob.download_to_file(file_content)
-            file_content.seek(0)  # Reset pointer to beginning
-            
-            # Get file metadata
-            blob.reload()  # Refresh metadata
-            filename = file_path.split('/')[-1]  # Extract filename from path
-            content_type = blob.content_type or 'application/octet-stream'
-            size_bytes = blob.size or 0
-            
-            return file_content, filename, content_type, size_bytes
-            
         except ValueError as e:
-            # URL parsing errors
             raise ValueError(f"Invalid GCS URL: {str(e)}")
-        except exceptions.NotFound:
-            raise FileNotFoundError(f"File not found: {gcs_url}")
-        except exceptions.Forbidden:
-            raise PermissionError(f"Access denied to file: {gcs_url}")
-        except Exception as e:
-            raise Exception(f"Error downloading file from GCS: {str(e)}")
+
+        if bucket_name not in self.allowed_buckets:
+            raise PermissionError(f"Signed URLs are not allowed for bucket: {bucket_name}")
+
+        now = time.time()
+        window_start = int(now // self.signed_url_window) * self.signed_url_window
+        cache_key = f"{bucket_name}/{file_path}"
+
+        with self._signed_urls_lock:
+            if window_start != self._signed_urls_window:
+                # Every cached URL belongs to an earlier window
+                self._signed_urls = {}
+                self._signed_urls_window = window_start
+            signed = self._signed_urls.get(cache_key)
+
+        if not signed:
+            expires_at = window_start + self.signed_url_window + self.signed_url_ttl
+            signed = {
+                "url": get_storage_backend(bucket_name).signed_url(
+                    file_path,
+                    expires_at,
+                    response_disposition=f"attachment; filename={file_path.split('/')[-1]}"
+                ),
+                "expires_at": expires_at
+            }
+            with self._signed_urls_lock:
+                if self._signed_urls_window == window_start and len(self._signed_urls) < self.signed_url_cache_max_entries:
+                    self._signed_urls[cache_key] = signed
+
+        return {
+            "url": signed["url"],
+            "expires_at": datetime.fromtimestamp(signed["expires_at"], tz=timezone.utc).isoformat(),
+            "expires_in": int(signed["expires_at"] - now)
+        }
 
     def get_file_info(self, gcs_url: str) -> dict:
         """
         Get file information without downloading the content.
-        
+
+        Answered from the metadata cache when possible; stale entries are revalidated
+        with a conditional (ETag) request.
+
         Args:
             gcs_url: GCS URL in format gs://bucket-name/path/to/file
-            
+
         Returns:
             Dictionary with file information
         """
+        _, file_path, info = self._stat(gcs_url, cached=True)
+
+        return {
+            "filename": file_path.split('/')[-1],
+            "content_type": info["content_type"],
+            "size_bytes": info["size"],
+            "created": info["created"],
+            "updated": info["updated"],
+            "etag": info["etag"],
+            "md5_hash": info["md5_hash"]
+        }
+
+    def _stat(self, gcs_url: str, cached: bool = False):
+        """
+        Fetch object metadata in one request (replaces exists() + reload())
+
+        Returns:
+            Tuple of (backend, file_path, metadata)
+
+        Downloads always read fresh metadata, since a stale generation would make the
+        chunked read fail once the object is overwritten; file info may use the cache.
+        """
         try:
             bucket_name, file_path = GCSURLParser.parse_gcs_url(gcs_url)
-            
-            bucket = self.storage_client.bucket(bucket_name)
-            blob = bucket.blob(file_path)
-            
-            if not blob.exists():
-                raise FileNotFoundError(f"File not found: {gcs_url}")
-            
-            blob.reload()  # Refresh metadata
-            
-            return {
-                "filename": file_path.split('/')[-1],
-                "content_type": blob.content_type or 'application/octet-stream',
-                "size_bytes": blob.size or 0,
-                "created": blob.time_created.isoformat() if blob.time_created else None,
-                "updated": blob.updated.isoformat() if blob.updated else None,
-                "etag": blob.etag,
-                "md5_hash": blob.md5_hash
-            }
-            
         except ValueError as e:
             raise ValueError(f"Invalid GCS URL: {str(e)}")
+
+        if bucket_name not in self.allowed_buckets:
+            raise PermissionError(f"Access denied to file: {gcs_url}")
+
+        try:
+            backend = get_storage_backend(bucket_name)
+            info = backend.stat(file_path, cached=cached)
         except exceptions.NotFound:
-            raise FileNotFoundError(f"File not found: {gcs_url}")
-        except exceptions.Forbidden:
+            info = None
+        except (exceptions.Forbidden, PermissionError):
             raise PermissionError(f"Access denied to file: {gcs_url}")
         except Exception as e:
-            raise Exception(f"Error getting file info from GCS: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error reading file metadata from GCS: {str(e)}")
+
+        if info is None:
+            raise FileNotFoundError(f"File not found: {gcs_url}")
+        return backend, file_path, info
+
+    @staticmethod
+    def _parse_range(range_header: str, size_bytes: int) -> Optional[tuple]:
+        """
+        Parse a single-range Range header into inclusive (start, end) offsets.
+
+        Returns (0, size - 1) for headers we don't support (multiple ranges, other
+        units), which means the whole file is served, and None if the range can't be
+        satisfied.
+        """
+        match = _RANGE_PATTERN.match(range_header.strip().replace(" ", ""))
+        if not match or not any(match.groups()):
+            return 0, size_bytes - 1
+
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0 or size_bytes == 0:
+                return None
+            return max(0, size_bytes - length), size_bytes - 1
+
+        start = int(first)
+        end = min(int(last), size_bytes - 1) if last else size_bytes - 1
+        if start >= size_bytes or start > end:
+            return None
+        return start, end
+
+    @staticmethod
+    def _etag_matches(if_none_match: str, etag: str) -> bool:
+        """Weak comparison of an If-None-Match header against our ETag"""
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        return "*" in candidates or etag in [
+            candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates
+        ]
+
+
+# Global download service instance
+gcs_download_service = GCSDownloadService()
@@ -1,4 +1,5 @@
 from typing import Tuple
+import os
 import re
 from urllib.parse import urlparse
 
@@ -16,6 +17,7 @@ class GCSURLParser:
             url: GCS URL in format:
                 - gs://bucket-name/path/to/file
                 - https://storage.googleapis.com/bucket-name/path/to/file
+                - <STORAGE_PUBLIC_BASE_URL>/bucket-name/path/to/file (local/memory storage backends)
             
         Returns:
             Tuple of (bucket_name, file_path)
@@ -30,9 +32,18 @@ class GCSURLParser:
             return GCSURLParser._parse_gs_url(url)
         elif url.startswith('https://storage.googleapis.com/'):
             return GCSURLParser._parse_https_url(url)
+        elif GCSURLParser._storage_public_prefix() and url.startswith(GCSURLParser._storage_public_prefix()):
+            return GCSURLParser._parse_gs_url('gs://' + url[len(GCSURLParser._storage_public_prefix()):])
         else:
             raise ValueError('URL must start with gs:// or https://storage.googleapis.com/')
     
+    @staticmethod
+    def _storage_public_prefix() -> str:
+        """Public URL prefix of the local/memory storage backends, empty when objects live in GCS"""
+        if os.getenv("STORAGE_BACKEND", "gcs").lower() not in ("local", "memory"):
+            return ''
+        return os.getenv("STORAGE_PUBLIC_BASE_URL", "http://localhost:8000/gcs/objects").rstrip('/') + '/'
+    
     @staticmethod
     def _parse_gs_url(url: str) -> Tuple[str, str]:
         """Parse gs:// format URL."""
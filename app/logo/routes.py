@@ -22,6 +22,7 @@ from app.logo.service.logo_service import (
     LOGO_STYLES
 )
 from app.logo.service.background_removal_service import remove_background_from_url
+from app.core.storage_service import storage_service
 from app.logo.service.crud import (
     create_logo,
     get_logo,
@@ -59,7 +60,8 @@ async def create_logo_design(request: LogoRequest, db: Session = Depends(get_db)
             "design_specification": design_result.get("design_specification"),
             "generation_type": design_result.get("generation_type"),
             "enhanced_prompt": image_result.get("enhanced_prompt"),
-            "image_model": image_result.get("image_model")
+            "image_model": image_result.get("image_model"),
+            "image_variants": image_result.get("image_variants")
         }
         
         # Save to database
@@ -167,9 +169,15 @@ async def get_user_logos_endpoint(user_id: int, db: Session = Depends(get_db)):
 @router.delete("/logo/{logo_id}")
 async def delete_logo_endpoint(logo_id: int, db: Session = Depends(get_db)):
     """Delete a logo"""
+    logo = get_logo(db, logo_id)
+    image_urls = [logo.logo_image_url, logo.remove_bg_logo_image_url] if logo else []
     success = delete_logo(db, logo_id)
     if not success:
         raise HTTPException(status_code=404, detail="Logo not found")
+    
+    # Drop this logo's references to the stored images (see object_index_service)
+    for image_url in filter(None, image_urls):
+        await storage_service.release(image_url)
     return {"message": "Logo deleted successfully"}
 
 # Keep the original design-only endpoint for backward compatibility
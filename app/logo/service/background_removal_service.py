@@ -1,6 +1,6 @@
 import requests
 import os
-from app.core.storage_service import upload_to_gcs
+from app.core.storage_service import upload_to_gcs_async
 import io
 
 REMOVE_BG_API_KEY = os.getenv("REMOVE_BG_API_KEY", "LFNiKM3HshXHUc5vcWccHpiL")
@@ -25,7 +25,7 @@ async def remove_background_from_url(image_url: str):
             bucket_name = os.getenv("GCS_BUCKET_NAME", "deck123")
 
             # Upload to Google Cloud Storage
-            public_url = upload_to_gcs(file_obj, file_name, "image/png", bucket_name)
+            public_url = await upload_to_gcs_async(file_obj, file_name, "image/png", bucket_name)
             return {"new_image_url": public_url}
         else:
             raise Exception(f"Error from remove.bg API: {response.status_code} {response.text}")
@@ -3,10 +3,12 @@ from langchain.prompts import PromptTemplate
 from langchain.schema.output_parser import StrOutputParser
 from openai import OpenAI
 import base64
-from app.core.storage_service import upload_to_gcs
+from app.core.storage_service import upload_to_gcs_async
+from app.core.image_derivative_service import image_derivative_service
 import io
 import os
 import json
+import asyncio
 
 # --- OpenAI Models ---
 model = ChatOpenAI(model_name="gpt-4o", temperature=0.7)
@@ -264,11 +266,15 @@ async def generate_logo_image(logo_title: str, logo_vision: str, color_palette_n
 
             bucket_name = os.getenv("GCS_BUCKET_NAME", "deck123")
 
-            # Upload to Google Cloud Storage
-            public_url = upload_to_gcs(file_obj, file_name, "image/png", bucket_name)
+            # Upload to Google Cloud Storage, building WebP variants meanwhile
+            public_url, image_variants = await asyncio.gather(
+                upload_to_gcs_async(file_obj, file_name, "image/png", bucket_name),
+                image_derivative_service.create_variants(image_data, file_name.rsplit(".", 1)[0])
+            )
             
             return {
                 "logo_image_url": public_url,
+                "image_variants": image_variants,
                 "logo_title": logo_title,
                 "enhanced_prompt": direct_prompt,
                 "image_model": "dall-e-3",
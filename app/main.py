@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.auth.routes import router as auth_router
@@ -9,8 +10,22 @@ from app.gcs.routes import router as gcs_router
 from app.core.email_routes import router as email_router
 from app.core.resend_routes import router as resend_router
 from Rag.routes import router as rag_router
+from app.presentation.service.google_image_service import google_image_service
+from app.short_video.services.video_job_service import video_job_service
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared HTTP connection pool for image search/downloads
+    await google_image_service.startup()
+    # Veo job workers; resumes video jobs left unfinished by a previous run
+    await video_job_service.startup()
+    yield
+    await video_job_service.close()
+    await google_image_service.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow CORS for all origins
 app.add_middleware(
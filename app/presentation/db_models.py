@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, UniqueConstraint, func
 from app.core.database import Base
 
 class Presentation(Base):
@@ -26,4 +26,22 @@ class PresentationImage(Base):
     filename = Column(String, nullable=True)
     model = Column(String, default="dall-e-3")
     size = Column(String, default="1024x1024")
+    # Normalized prompt/model/size hash used to reuse images across presentations
+    prompt_hash = Column(String(64), nullable=True, index=True)
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+    # Responsive WebP/AVIF variants, srcset and blur placeholder (see image_derivative_service)
+    variants = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class PresentationSlide(Base):
+    __tablename__ = "presentation_slides"
+    __table_args__ = (UniqueConstraint("presentation_id", "position", name="uq_presentation_slides_presentation_position"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    presentation_id = Column(Integer, ForeignKey("presentations.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)  # Zero-based slide order
+    layout = Column(String, nullable=True)
+    data = Column(JSON, nullable=False)  # Structured form from slide_parser.parse_section
+    xml = Column(Text, nullable=False)  # The slide's <SECTION> XML
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
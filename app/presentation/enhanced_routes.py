@@ -23,6 +23,7 @@ from app.presentation.service.improved_presentation_service import (
     ImageGenerationError
 )
 from typing import List, Optional
+import json
 
 router = APIRouter()
 
@@ -83,6 +84,7 @@ async def generate_slides(request: SlidesRequest):
 async def generate_image_enhanced(
     request: ImageGenerationRequest,
     prefer_ai: bool = Query(True, description="Prefer AI generation over search"),
+    hedge_policy: Optional[str] = Query(None, pattern="^(fastest|prefer_ai)$", description="Race DALL-E against Google search: 'fastest' or 'prefer_ai' (AI if it finishes within IMAGE_AI_DEADLINE)"),
     current_user: User = Depends(get_current_user)
 ):
     """Enhanced image generation with fallback strategy and user authentication"""
@@ -91,7 +93,9 @@ async def generate_image_enhanced(
             prompt=request.prompt,
             presentation_id=request.presentation_id,
             prefer_ai=prefer_ai,
-            size=request.size or "1024x1024"
+            size=request.size or "1024x1024",
+            hedge_policy=hedge_policy,
+            user_id=current_user.id
         )
         
         if result["success"]:
@@ -225,28 +229,32 @@ async def batch_generate_images(
     prompts: List[str],
     presentation_id: Optional[int] = None,
     prefer_ai: bool = Query(True, description="Prefer AI generation over search"),
+    hedge_policy: Optional[str] = Query(None, pattern="^(fastest|prefer_ai)$", description="Race DALL-E against Google search: 'fastest' or 'prefer_ai' (AI if it finishes within IMAGE_AI_DEADLINE)"),
+    stream: bool = Query(False, description="Stream each result as newline-delimited JSON as soon as it finishes"),
     current_user: User = Depends(get_current_user)
 ):
-    """Generate multiple images in batch for better performance"""
+    """Generate multiple images concurrently (bounded per provider)"""
     try:
         if len(prompts) > 10:
             raise HTTPException(status_code=400, detail="Maximum 10 prompts allowed per batch")
         
-        results = []
-        for prompt in prompts:
-            try:
-                result = await improved_presentation_service.generate_image_with_fallback(
-                    prompt=prompt,
-                    presentation_id=presentation_id,
-                    prefer_ai=prefer_ai
-                )
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    "success": False,
-                    "prompt": prompt,
-                    "error": str(e)
-                })
+        results_stream = improved_presentation_service.batch_generate_images(
+            prompts=prompts,
+            presentation_id=presentation_id,
+            prefer_ai=prefer_ai,
+            hedge_policy=hedge_policy,
+            user_id=current_user.id
+        )
+        
+        if stream:
+            async def stream_response():
+                async for result in results_stream:
+                    yield json.dumps(result, default=str) + "\n"
+            return StreamingResponse(stream_response(), media_type="application/x-ndjson")
+        
+        results = [None] * len(prompts)
+        async for result in results_stream:
+            results[result.pop("index")] = result
         
         return {
             "results": results,
@@ -257,6 +265,8 @@ async def batch_generate_images(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch image generation failed: {str(e)}")
 
@@ -306,5 +316,6 @@ async def get_presentation_config():
         "image_sizes": ["1024x1024", "1792x1024", "1024x1792"],
         "max_slides_per_presentation": 50,
         "max_images_per_batch": 10,
+        "image_hedge_policies": ["fastest", "prefer_ai"],
         "supported_image_models": ["dall-e-3", "dall-e-2", "google_search"]
     }
\ No newline at end of file
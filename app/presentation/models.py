@@ -7,12 +7,14 @@ class OutlineRequest(BaseModel):
     prompt: str
     numberOfCards: int
     language: str
+    regenerate: bool = False  # Bypass the generation cache
 
 class SlidesRequest(BaseModel):
     title: str
     outline: list[str]
     language: str
     tone: str
+    regenerate: bool = False  # Bypass the generation cache
 
 # New models for presentation management
 class PresentationCreateRequest(BaseModel):
@@ -27,6 +29,27 @@ class PresentationUpdateRequest(BaseModel):
     content: Optional[Dict[str, Any]] = None
     title: Optional[str] = None
 
+class PresentationSlideUpdateRequest(BaseModel):
+    xml: str  # A single <SECTION>...</SECTION> element
+
+class PresentationSlideResponse(BaseModel):
+    id: int
+    presentation_id: int
+    position: int
+    layout: Optional[str] = None
+    data: Dict[str, Any]
+    xml: str
+    updated_at: Optional[datetime] = None
+
+class SlideRegenerateRequest(BaseModel):
+    start: int = Field(..., ge=0, description="Zero-based position of the first slide to regenerate")
+    end: Optional[int] = Field(None, ge=0, description="Zero-based position of the last slide (inclusive); defaults to start")
+    instructions: Optional[str] = Field(None, description="Optional guidance for the regenerated slides")
+
+class SlideRegenerateResponse(BaseModel):
+    slides: List[PresentationSlideResponse] = []
+    failed_slides: List[int] = []
+
 class PresentationResponse(BaseModel):
     id: str
     title: str
@@ -57,6 +80,7 @@ class ImageGenerationResponse(BaseModel):
     size: Optional[str] = None
     quality: Optional[str] = None
     filename: Optional[str] = None
+    variants: Optional[Dict[str, Any]] = None  # Responsive WebP variants, srcset and blur placeholder
     error: Optional[str] = None
 
 # Presentation Image models
@@ -68,6 +92,7 @@ class PresentationImageResponse(BaseModel):
     filename: Optional[str] = None
     model: str
     size: str
+    variants: Optional[Dict[str, Any]] = None
     created_at: datetime
 
 class GeneratedImageResponse(BaseModel):
@@ -124,6 +149,11 @@ class UnifiedPresentationResponse(BaseModel):
     context_sources_used: List[Dict[str, Any]] = []
     error: Optional[str] = None
     
+    # Slide generation details
+    generation_mode: Optional[str] = None
+    failed_slides: List[int] = []
+    cache_hit: bool = False
+    
     # Database information
     presentation_id: Optional[int] = None  # Renamed from database_id for clarity
     database_id: Optional[int] = None  # Keep for backward compatibility
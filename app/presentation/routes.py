@@ -8,8 +8,9 @@ def slugify_prompt(prompt: str) -> str:
     return slug + '.png'
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request
 from fastapi.responses import StreamingResponse
+import json
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from app.core.database import get_db
 from app.presentation.models import (
     OutlineRequest, 
@@ -23,14 +24,21 @@ from app.presentation.models import (
     UserResponse,
     PresentationImageResponse,
     UnifiedPresentationRequest,
-    UnifiedPresentationResponse
+    UnifiedPresentationResponse,
+    PresentationSlideUpdateRequest,
+    PresentationSlideResponse,
+    SlideRegenerateRequest,
+    SlideRegenerateResponse
 )
 
 from app.presentation.service.presentation_service import outline_chain, slides_chain
 from app.presentation.service.enhanced_image_service import enhanced_image_service
 from app.presentation.service.presentation_db_service import presentation_db_service
 from app.presentation.service.unified_presentation_service import unified_presentation_service
+from app.presentation.service.generation_cache import generation_cache
+from app.presentation.service.slide_generation_service import slide_generation_service, compress_context, SlideGenerationError
 from app.presentation.service.crud import create_presentation_image, get_presentation_images
+from app.presentation.service.image_cache_service import image_cache_service
 from app.presentation.db_models import Presentation
 from app.core.security import get_current_user
 from app.auth.db_models import User
@@ -62,6 +70,120 @@ def to_presentation_response(presentation):
     )
 
 # NEW UNIFIED PRESENTATION ENDPOINT WITH FILE UPLOADS
+async def _read_context_files(request: Request) -> List[Dict[str, Any]]:
+    """Extract text from the context_files uploaded with a unified presentation request"""
+    context_documents = []
+    try:
+        # Get form data from request
+        form_data = await request.form()
+        context_files = form_data.getlist("context_files")
+        
+        if context_files and len(context_files) > 0:
+            # Filter out empty strings and only process actual UploadFile objects
+            actual_files = [f for f in context_files if hasattr(f, 'filename') and f.filename]
+            
+            if actual_files:
+                print(f"📄 Processing {len(actual_files)} uploaded context files...")
+                
+                for file in actual_files:
+                    try:
+                        # Read file content
+                        file_content = await file.read()
+                        
+                        # Process document with RAG service
+                        from Rag.services.document_processor import document_processor
+                        
+                        # Extract text from uploaded file
+                        extraction_result = document_processor.extract_text_from_file(
+                            file_content=file_content,
+                            filename=file.filename
+                        )
+                        
+                        if extraction_result["text"].strip():
+                            context_documents.append({
+                                "filename": file.filename,
+                                "content": extraction_result["text"],
+                                "metadata": extraction_result["metadata"]
+                            })
+                            print(f"✅ Processed context file: {file.filename}")
+                        else:
+                            print(f"⚠️ No content extracted from: {file.filename}")
+                            
+                    except Exception as e:
+                        print(f"❌ Error processing file {file.filename}: {e}")
+                        continue
+            else:
+                print("📄 No valid files found in context_files")
+        else:
+            print("📄 No context files provided")
+            
+    except Exception as e:
+        print(f"⚠️ Error processing form data: {e}")
+        # Continue without files if there's an error
+    
+    return context_documents
+
+async def _save_unified_presentation(
+    result: Dict[str, Any],
+    user_id: int,
+    prompt: str,
+    slides_count: int,
+    color_theme: str,
+    language: str,
+    tone: str,
+    business_context: Dict[str, Any],
+    website_url_list: List[str],
+    context_documents: List[Dict[str, Any]]
+) -> None:
+    """Save a generated unified presentation and record its ID (or the save error) on the result"""
+    try:
+        print("💾 Saving presentation to database...")
+        
+        # Create presentation content structure
+        presentation_content = {
+            "slides": result["presentation_xml"],
+            "context_sources": result["context_sources_used"],
+            "business_context": business_context,
+            "generation_metadata": {
+                "slides_count": slides_count,
+                "processing_time": result["processing_time"],
+                "website_urls": website_url_list,
+                "context_files": [doc.get("filename") for doc in context_documents],
+                "generation_mode": result.get("generation_mode"),
+                "outline": result.get("outline", []),
+                # Kept so single slides can be regenerated without rebuilding the context
+                "enhanced_context": compress_context(result.get("enhanced_context"))
+            }
+        }
+        
+        # Save to database using presentation service
+        saved_presentation = await presentation_db_service.create_presentation(
+            title=prompt,
+            content=presentation_content,
+            user_id=user_id,  # Use provided user ID from request
+            theme=color_theme,
+            language=language,
+            tone=tone
+        )
+        
+        # Add presentation ID to result (both fields for clarity and backward compatibility)
+        result["presentation_id"] = saved_presentation.id
+        result["database_id"] = saved_presentation.id
+        print(f"✅ Presentation saved to database with ID: {saved_presentation.id}")
+        
+        if result.get("generated_images"):
+            attached = await presentation_db_service.add_presentation_images(saved_presentation.id, result["generated_images"])
+            print(f"🖼️ Attached {attached} prefetched images to presentation {saved_presentation.id}")
+        
+    except Exception as db_error:
+        print(f"⚠️ Error saving to database: {db_error}")
+        # Don't fail the request if database save fails
+        result["database_error"] = str(db_error)
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 @router.post("/presentation/generate-unified", response_model=UnifiedPresentationResponse)
 async def generate_unified_presentation(
     request: Request,
@@ -83,7 +205,10 @@ async def generate_unified_presentation(
     vision: Optional[str] = Form(None, description="Company/project vision"),
     language: Optional[str] = Form("English", description="Presentation language"),
     tone: Optional[str] = Form("Professional", description="Presentation tone"),
-    generate_images: Optional[bool] = Form(True, description="Generate AI images for slides"),
+    generate_images: Optional[bool] = Form(True, description="Fetch/generate slide images while slides are generated"),
+    image_provider: Optional[str] = Form(None, pattern="^(google|dalle)$", description="'google' (image search) or 'dalle' (DALL-E 3); defaults to PRESENTATION_IMAGE_PROVIDER"),
+    generation_mode: Optional[str] = Form("single", pattern="^(single|parallel)$", description="'single' (one call for the whole deck) or 'parallel' (one call per slide)"),
+    regenerate: Optional[bool] = Form(False, description="Bypass the generation cache and generate a fresh presentation"),
     
     # User identification
     user_id: int = Form(..., description="User ID for presentation ownership")
@@ -106,56 +231,21 @@ async def generate_unified_presentation(
             website_url_list = [url.strip() for url in website_urls.split(',') if url.strip()]
         
         # Process uploaded context files (handle manually from request)
-        context_documents = []
-        try:
-            # Get form data from request
-            form_data = await request.form()
-            context_files = form_data.getlist("context_files")
-            
-            if context_files and len(context_files) > 0:
-                # Filter out empty strings and only process actual UploadFile objects
-                actual_files = [f for f in context_files if hasattr(f, 'filename') and f.filename]
-                
-                if actual_files:
-                    print(f"📄 Processing {len(actual_files)} uploaded context files...")
-                    
-                    for file in actual_files:
-                        try:
-                            # Read file content
-                            file_content = await file.read()
-                            
-                            # Process document with RAG service
-                            from Rag.services.document_processor import document_processor
-                            
-                            # Extract text from uploaded file
-                            extraction_result = document_processor.extract_text_from_file(
-                                file_content=file_content,
-                                filename=file.filename
-                            )
-                            
-                            if extraction_result["text"].strip():
-                                context_documents.append({
-                                    "filename": file.filename,
-                                    "content": extraction_result["text"],
-                                    "metadata": extraction_result["metadata"]
-                                })
-                                print(f"✅ Processed context file: {file.filename}")
-                            else:
-                                print(f"⚠️ No content extracted from: {file.filename}")
-                                
-                        except Exception as e:
-                            print(f"❌ Error processing file {file.filename}: {e}")
-                            continue
-                else:
-                    print("📄 No valid files found in context_files")
-            else:
-                print("📄 No context files provided")
-                
-        except Exception as e:
-            print(f"⚠️ Error processing form data: {e}")
-            # Continue without files if there's an error
+        context_documents = await _read_context_files(request)
         
-        # Generate presentation with RAG context (no image generation)
+        business_context = {
+            "industry_sector": industry_sector,
+            "one_line_pitch": one_line_pitch,
+            "problem_solving": problem_solving,
+            "unique_solution": unique_solution,
+            "target_audience": target_audience,
+            "business_model": business_model,
+            "revenue_plan": revenue_plan,
+            "competitors": competitors,
+            "vision": vision
+        }
+        
+        # Generate presentation with RAG context, prefetching slide images as sections complete
         result = await unified_presentation_service.generate_presentation_with_context(
             user_id=user_id,  # Use provided user ID from request
             slides_count=slides_count,
@@ -163,70 +253,29 @@ async def generate_unified_presentation(
             color_theme=color_theme or "default",
             website_urls=website_url_list,
             context_documents=context_documents,  # Pass processed documents instead of text sources
-            industry_sector=industry_sector,
-            one_line_pitch=one_line_pitch,
-            problem_solving=problem_solving,
-            unique_solution=unique_solution,
-            target_audience=target_audience,
-            business_model=business_model,
-            revenue_plan=revenue_plan,
-            competitors=competitors,
-            vision=vision,
+            **business_context,
             language=language or "English",
             tone=tone or "Professional",
-            generate_images=False  # Always disable image generation
+            generate_images=bool(generate_images),
+            image_provider=image_provider,
+            generation_mode=generation_mode or "single",
+            regenerate=regenerate or False
         )
         
         # Save presentation to database if generation was successful
         if result["success"] and result["presentation_xml"]:
-            try:
-                print("💾 Saving presentation to database...")
-                
-                # Create presentation content structure
-                presentation_content = {
-                    "slides": result["presentation_xml"],
-                    "context_sources": result["context_sources_used"],
-                    "business_context": {
-                        "industry_sector": industry_sector,
-                        "one_line_pitch": one_line_pitch,
-                        "problem_solving": problem_solving,
-                        "unique_solution": unique_solution,
-                        "target_audience": target_audience,
-                        "business_model": business_model,
-                        "revenue_plan": revenue_plan,
-                        "competitors": competitors,
-                        "vision": vision
-                    },
-                    "generation_metadata": {
-                        "slides_count": slides_count,
-                        "processing_time": result["processing_time"],
-                        "website_urls": website_url_list,
-                        "context_files": [doc.get("filename") for doc in context_documents]
-                    }
-                }
-                
-                # Save to database using presentation service
-                saved_presentation = await presentation_db_service.create_presentation(
-                    title=prompt,
-                    content=presentation_content,
-                    user_id=user_id,  # Use provided user ID from request
-                    theme=color_theme or "default",
-                    language=language or "English",
-                    tone=tone or "Professional"
-                )
-                
-                # Add presentation ID to result (both fields for clarity and backward compatibility)
-                result["presentation_id"] = saved_presentation.id
-                result["database_id"] = saved_presentation.id
-                print(f"✅ Presentation saved to database with ID: {saved_presentation.id}")
-                
-            except Exception as db_error:
-                print(f"⚠️ Error saving to database: {db_error}")
-                # Don't fail the request if database save fails
-                result["database_error"] = str(db_error)
-        
-        # Always return empty images array
-        result["generated_images"] = []
+            await _save_unified_presentation(
+                result,
+                user_id=user_id,
+                prompt=prompt,
+                slides_count=slides_count,
+                color_theme=color_theme or "default",
+                language=language or "English",
+                tone=tone or "Professional",
+                business_context=business_context,
+                website_url_list=website_url_list,
+                context_documents=context_documents
+            )
         
         return UnifiedPresentationResponse(**result)
         
@@ -246,23 +295,169 @@ async def generate_unified_presentation(
             tone=tone or "Professional"
         )
 
+@router.post("/presentation/generate-unified/stream")
+async def stream_unified_presentation(
+    request: Request,
+    # Required fields
+    slides_count: int = Form(..., ge=3, le=20, description="Number of slides (3-20)"),
+    prompt: str = Form(..., min_length=10, description="Main presentation topic/prompt"),
+    
+    # Optional fields
+    color_theme: Optional[str] = Form("default", description="Presentation color theme"),
+    website_urls: Optional[str] = Form(None, description="Comma-separated website URLs"),
+    industry_sector: Optional[str] = Form(None, description="Industry sector"),
+    one_line_pitch: Optional[str] = Form(None, description="One-line pitch"),
+    problem_solving: Optional[str] = Form(None, description="Problem you're solving"),
+    unique_solution: Optional[str] = Form(None, description="Your unique solution"),
+    target_audience: Optional[str] = Form(None, description="Target audience"),
+    business_model: Optional[str] = Form(None, description="Business model"),
+    revenue_plan: Optional[str] = Form(None, description="Revenue plan"),
+    competitors: Optional[str] = Form(None, description="Competitors analysis"),
+    vision: Optional[str] = Form(None, description="Company/project vision"),
+    language: Optional[str] = Form("English", description="Presentation language"),
+    tone: Optional[str] = Form("Professional", description="Presentation tone"),
+    generate_images: Optional[bool] = Form(True, description="Fetch/generate slide images while slides are generated"),
+    image_provider: Optional[str] = Form(None, pattern="^(google|dalle)$", description="'google' (image search) or 'dalle' (DALL-E 3); defaults to PRESENTATION_IMAGE_PROVIDER"),
+    generation_mode: Optional[str] = Form("single", pattern="^(single|parallel)$", description="'single' (one call for the whole deck) or 'parallel' (one call per slide)"),
+    regenerate: Optional[bool] = Form(False, description="Bypass the generation cache and generate a fresh presentation"),
+    
+    # User identification
+    user_id: int = Form(..., description="User ID for presentation ownership")
+):
+    """
+    Generate a unified presentation as a server-sent event stream
+    
+    Takes the same form fields (and context_files) as /presentation/generate-unified.
+    Events, in order:
+    - source_processed: one per website URL / context file
+    - outline: the slide topics
+    - section: {"index", "xml"} as soon as each <SECTION> is complete
+    - image: {"slide_index", "query", "url", ...} as each slide image resolves
+    - saved: {"presentation_id"} once the presentation is stored
+    - done: the same payload as the /presentation/generate-unified response
+    - error: {"error"} if generation fails
+    """
+    website_url_list = [url.strip() for url in website_urls.split(',') if url.strip()] if website_urls else []
+    context_documents = await _read_context_files(request)
+    business_context = {
+        "industry_sector": industry_sector,
+        "one_line_pitch": one_line_pitch,
+        "problem_solving": problem_solving,
+        "unique_solution": unique_solution,
+        "target_audience": target_audience,
+        "business_model": business_model,
+        "revenue_plan": revenue_plan,
+        "competitors": competitors,
+        "vision": vision
+    }
+    
+    async def event_stream():
+        print(f"🎯 Starting streamed unified presentation generation for user {user_id}")
+        try:
+            async for event in unified_presentation_service.stream_presentation_with_context(
+                user_id=user_id,
+                slides_count=slides_count,
+                prompt=prompt,
+                color_theme=color_theme or "default",
+                website_urls=website_url_list,
+                context_documents=context_documents,
+                **business_context,
+                language=language or "English",
+                tone=tone or "Professional",
+                generate_images=bool(generate_images),
+                image_provider=image_provider,
+                generation_mode=generation_mode or "single",
+                regenerate=regenerate or False
+            ):
+                if event["event"] != "generated":
+                    yield _sse_event(event["event"], event["data"])
+                    continue
+                
+                result = event["data"]
+                if not (result["success"] and result["presentation_xml"]):
+                    yield _sse_event("error", {"error": result.get("error", "Presentation generation failed")})
+                    return
+                
+                await _save_unified_presentation(
+                    result,
+                    user_id=user_id,
+                    prompt=prompt,
+                    slides_count=slides_count,
+                    color_theme=color_theme or "default",
+                    language=language or "English",
+                    tone=tone or "Professional",
+                    business_context=business_context,
+                    website_url_list=website_url_list,
+                    context_documents=context_documents
+                )
+                if result.get("presentation_id"):
+                    yield _sse_event("saved", {"presentation_id": result["presentation_id"]})
+                
+                yield _sse_event("done", UnifiedPresentationResponse(**result).model_dump())
+                
+        except Exception as e:
+            print(f"❌ Error in streamed unified presentation generation: {e}")
+            yield _sse_event("error", {"error": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Existing presentation generation endpoints (kept for backward compatibility)
 @router.post("/presentation/outline")
 async def generate_outline(request: OutlineRequest):
-    """Generate presentation outline using AI"""
+    """Generate presentation outline using AI (cached by inputs unless regenerate is set)"""
+    cache_key = generation_cache.make_key(
+        "outline",
+        prompt=request.prompt,
+        numberOfCards=request.numberOfCards,
+        language=request.language
+    )
+    cached_outline = None if request.regenerate else generation_cache.get(cache_key)
+    
     async def stream_response():
+        if cached_outline is not None:
+            yield cached_outline
+            return
+        
+        outline_text = ""
         async for chunk in outline_chain.astream({
             "prompt": request.prompt,
             "numberOfCards": request.numberOfCards,
             "language": request.language,
         }):
+            outline_text += chunk
             yield chunk
-    return StreamingResponse(stream_response(), media_type="text/plain")
+        
+        # Only cache outlines that streamed to completion
+        generation_cache.set(cache_key, outline_text)
+    return StreamingResponse(
+        stream_response(),
+        media_type="text/plain",
+        headers={"X-Cache": "HIT" if cached_outline is not None else "MISS"}
+    )
 
 @router.post("/presentation/generate")
 async def generate_slides(request: SlidesRequest):
-    """Generate presentation slides XML using AI"""
+    """Generate presentation slides XML using AI (cached by inputs unless regenerate is set)"""
+    cache_key = generation_cache.make_key(
+        "slides",
+        title=request.title,
+        outline=request.outline,
+        language=request.language,
+        tone=request.tone
+    )
+    cached_chunks = None if request.regenerate else generation_cache.get(cache_key)
+    
     async def stream_response():
+        if cached_chunks is not None:
+            for chunk in cached_chunks:
+                yield chunk
+            return
+        
+        chunks = []
         async for chunk in slides_chain.astream({
             "TITLE": request.title,
             "LANGUAGE": request.language,
@@ -273,8 +468,16 @@ async def generate_slides(request: SlidesRequest):
             # Escape newlines and double quotes in the XML chunk
             if isinstance(chunk, str):
                 chunk = chunk.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            chunks.append(chunk)
             yield chunk
-    return StreamingResponse(stream_response(), media_type="application/xml")
+        
+        # Only cache decks that streamed to completion
+        generation_cache.set(cache_key, chunks)
+    return StreamingResponse(
+        stream_response(),
+        media_type="application/xml",
+        headers={"X-Cache": "HIT" if cached_chunks is not None else "MISS"}
+    )
 
 # New image generation endpoint (replaces Together AI)
 @router.post("/presentation/generate-image", response_model=ImageGenerationResponse)
@@ -286,14 +489,29 @@ async def generate_image(request: ImageGenerationRequest, db: Session = Depends(
         bucket = "deck123"
         image_url = f"https://storage.googleapis.com/{bucket}/{filename}"
 
-        # Generate image using DALL-E service and upload with the slugified filename
-        # The enhanced_image_service should accept a filename override (add this if not present)
-        generated_url = await enhanced_image_service.generate_presentation_image(
-            prompt=request.prompt,
-            model="dall-e-3",
-            size=request.size or "1024x1024",
-            filename=filename
+        # Reuse an image already generated for the same prompt and size (scoped to the
+        # presentation owner when IMAGE_CACHE_SCOPE=user)
+        owner_id = None
+        if request.presentation_id:
+            presentation = db.query(Presentation).filter(Presentation.id == request.presentation_id).first()
+            owner_id = presentation.user_id if presentation else None
+        cached_image = await image_cache_service.lookup(
+            request.prompt, "dall-e-3", request.size or "1024x1024", user_id=owner_id
         )
+        
+        if cached_image:
+            generated_url = cached_image["url"]
+            variants = cached_image.get("variants")
+        else:
+            # Generate image using DALL-E service and upload with the slugified filename
+            generated = await enhanced_image_service.generate_presentation_image_with_variants(
+                prompt=request.prompt,
+                model="dall-e-3",
+                size=request.size or "1024x1024",
+                filename=filename
+            )
+            generated_url = generated["url"]
+            variants = generated["variants"]
         # Use the actual generated URL if the service returns it, else use the constructed one
         final_url = generated_url or image_url
 
@@ -306,7 +524,8 @@ async def generate_image(request: ImageGenerationRequest, db: Session = Depends(
                 prompt=request.prompt,
                 filename=filename,
                 model="dall-e-3",
-                size=request.size or "1024x1024"
+                size=request.size or "1024x1024",
+                variants=variants
             )
 
         return ImageGenerationResponse(
@@ -315,7 +534,8 @@ async def generate_image(request: ImageGenerationRequest, db: Session = Depends(
             prompt=request.prompt,
             model="dall-e-3",
             size=request.size or "1024x1024",
-            filename=filename
+            filename=filename,
+            variants=variants
         )
 
     except Exception as e:
@@ -368,6 +588,61 @@ async def update_presentation(presentation_id: str, request: PresentationUpdateR
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Per-slide endpoints
+def to_slide_response(slide) -> PresentationSlideResponse:
+    return PresentationSlideResponse(
+        id=slide.id,
+        presentation_id=slide.presentation_id,
+        position=slide.position,
+        layout=slide.layout,
+        data=slide.data,
+        xml=slide.xml,
+        updated_at=slide.updated_at
+    )
+
+@router.get("/presentation/{presentation_id}/slides", response_model=List[PresentationSlideResponse])
+async def get_presentation_slides(presentation_id: int):
+    """Get the structured slides of a presentation in order"""
+    slides = await presentation_db_service.get_slides(presentation_id)
+    return [to_slide_response(slide) for slide in slides]
+
+@router.get("/presentation/{presentation_id}/slides/{position}", response_model=PresentationSlideResponse)
+async def get_presentation_slide(presentation_id: int, position: int):
+    """Get a single slide by its zero-based position"""
+    slide = await presentation_db_service.get_slide(presentation_id, position)
+    if not slide:
+        raise HTTPException(status_code=404, detail="Slide not found")
+    return to_slide_response(slide)
+
+@router.patch("/presentation/{presentation_id}/slides/{position}", response_model=PresentationSlideResponse)
+async def update_presentation_slide(presentation_id: int, position: int, request: PresentationSlideUpdateRequest):
+    """Replace a single slide's <SECTION> XML without rewriting the whole presentation"""
+    try:
+        slide = await presentation_db_service.update_slide(presentation_id, position, request.xml)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not slide:
+        raise HTTPException(status_code=404, detail="Slide not found")
+    return to_slide_response(slide)
+
+@router.post("/presentation/{presentation_id}/slides/regenerate", response_model=SlideRegenerateResponse)
+async def regenerate_presentation_slides(presentation_id: int, request: SlideRegenerateRequest):
+    """Regenerate one slide, or the contiguous range start..end, of a stored presentation"""
+    try:
+        result = await slide_generation_service.regenerate_slides(
+            presentation_id=presentation_id,
+            start=request.start,
+            end=request.end,
+            instructions=request.instructions
+        )
+    except SlideGenerationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return SlideRegenerateResponse(
+        slides=[to_slide_response(slide) for slide in result["slides"]],
+        failed_slides=result["failed_slides"]
+    )
+
 @router.get("/presentation/user/{user_email}", response_model=List[PresentationResponse])
 async def get_user_presentations(user_email: str):
     """Get all presentations for a user by email"""
@@ -418,6 +693,7 @@ async def get_presentation_images_endpoint(presentation_id: int, db: Session = D
                 filename=img.filename,
                 model=img.model,
                 size=img.size,
+                variants=img.variants,
                 created_at=img.created_at
             ) for img in images
         ]
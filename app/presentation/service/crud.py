@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from app.presentation.db_models import Presentation, PresentationImage
+from app.presentation.service.image_cache_service import image_prompt_hash
 
 def create_presentation(db: Session, user_id: int, prompt: str, image_url: str):
     presentation = Presentation(user_id=user_id, prompt=prompt, image_url=image_url)
@@ -15,7 +16,8 @@ def create_presentation_image(
     prompt: str, 
     filename: str = None,
     model: str = "dall-e-3",
-    size: str = "1024x1024"
+    size: str = "1024x1024",
+    variants: dict = None
 ):
     """Create a new presentation image record"""
     presentation_image = PresentationImage(
@@ -24,7 +26,9 @@ def create_presentation_image(
         prompt=prompt,
         filename=filename,
         model=model,
-        size=size
+        size=size,
+        prompt_hash=image_prompt_hash(prompt, model, size),
+        variants=variants
     )
     db.add(presentation_image)
     db.commit()
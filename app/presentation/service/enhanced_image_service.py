@@ -6,113 +6,62 @@ import os
 import io
 import base64
 import asyncio
-from typing import Optional
-from openai import OpenAI
-from google.cloud import storage
+from typing import Optional, Dict, Any
+from openai import OpenAI, AsyncOpenAI
 from datetime import datetime
 import uuid
 
+from app.core.image_derivative_service import image_derivative_service
+from app.core.storage_service import storage_service
+
 class PresentationImageService:
     def __init__(self):
-        from google.oauth2 import service_account
-
         self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Async client so concurrent image requests don't occupy worker threads
+        self.async_openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.gcs_bucket_name = os.getenv("GCS_BUCKET_NAME", "deck123")
 
-        # Build Google credentials from environment variables
-        service_account_info = {
-            "type": os.getenv("TYPE"),
-            "project_id": os.getenv("PROJECT_ID"),
-            "private_key_id": os.getenv("PRIVATE_KEY_ID"),
-            "private_key": os.getenv("PRIVATE_KEY"),
-            "client_email": os.getenv("CLIENT_EMAIL"),
-            "client_id": os.getenv("CLIENT_ID"),
-            "auth_uri": os.getenv("AUTH_URI"),
-            "token_uri": os.getenv("TOKEN_URI"),
-            "auth_provider_x509_cert_url": os.getenv("AUTH_PROVIDER_X509_CERT_URL"),
-            "client_x509_cert_url": os.getenv("CLIENT_X509_CERT_URL"),
-            "universe_domain": os.getenv("UNIVERSE_DOMAIN"),
-        }
-
-        # Use centralized GCS client
-        from app.core.gcs_client import get_shared_gcs_client
-        self.storage_client = get_shared_gcs_client()
-        print("✅ Enhanced Image Service: Using credentials from environment variables")
-
-        self.bucket = self.storage_client.bucket(self.gcs_bucket_name)
+        # Images are stored through storage_service (STORAGE_BACKEND)
+        print("✅ Enhanced Image Service initialized")
     
     async def generate_image_dalle3(self, prompt: str, size: str = "1024x1024", filename: str = None) -> str:
         """
         Generate image using DALL-E 3
         Returns the public GCS URL
         """
-        try:
-            print(f"Generating image with DALL-E 3: {prompt}")
-            
-            # Generate image with DALL-E 3
-            response = self.openai_client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size=size,
-                quality="standard",
-                n=1,
-                response_format="b64_json"
-            )
-            
-            if not response.data or not response.data[0].b64_json:
-                raise Exception("No image data received from DALL-E")
-            
-            # Decode base64 image
-            image_data = base64.b64decode(response.data[0].b64_json)
-            
-            # Use provided filename or generate one
-            if filename:
-                gcs_filename = filename if filename.startswith("presentation_images/") else f"presentation_images/{filename}"
-            else:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                unique_id = str(uuid.uuid4())[:8]
-                safe_prompt = "".join(c for c in prompt if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                safe_prompt = safe_prompt.replace(' ', '_')[:30]
-                gcs_filename = f"presentation_images/dalle3_{safe_prompt}_{timestamp}_{unique_id}.png"
-            
-            # Upload to Google Cloud Storage
-            blob = self.bucket.blob(gcs_filename)
-            blob.upload_from_string(
-                image_data,
-                content_type="image/png"
-            )
-            
-            # Make the blob publicly readable
-            blob.make_public()
-            
-            public_url = blob.public_url
-            print(f"Image uploaded to GCS: {public_url}")
-            
-            return public_url
-            
-        except Exception as e:
-            print(f"Error generating image with DALL-E 3: {e}")
-            raise e
+        return (await self._generate_dalle_image("dall-e-3", prompt, size, filename))["url"]
     
     async def generate_image_dalle2(self, prompt: str, size: str = "1024x1024", filename: str = None) -> str:
         """
         Generate image using DALL-E 2 (fallback option)
         Returns the public GCS URL
         """
+        return (await self._generate_dalle_image("dall-e-2", prompt, size, filename))["url"]
+    
+    async def _generate_dalle_image(self, model: str, prompt: str, size: str, filename: str = None) -> Dict[str, Any]:
+        """
+        Generate an image with DALL-E, store the PNG and its responsive variants in GCS
+        
+        Returns:
+            {"url", "model", "variants"}; variants is the image_derivative_service manifest
+            (WebP widths, srcset and blur placeholder) or None if it could not be built
+        """
+        label = "DALL-E 3" if model == "dall-e-3" else "DALL-E 2"
         try:
-            print(f"Generating image with DALL-E 2: {prompt}")
+            print(f"Generating image with {label}: {prompt}")
             
-            # Generate image with DALL-E 2
-            response = self.openai_client.images.generate(
-                model="dall-e-2",
+            options = {"quality": "standard"} if model == "dall-e-3" else {}
+            response = await self.async_openai_client.images.generate(
+                model=model,
                 prompt=prompt,
                 size=size,
                 n=1,
-                response_format="b64_json"
+                response_format="b64_json",
+                **options
             )
             
             if not response.data or not response.data[0].b64_json:
-                raise Exception("No image data received from DALL-E 2")
+                raise Exception(f"No image data received from {label}")
             
             # Decode base64 image
             image_data = base64.b64decode(response.data[0].b64_json)
@@ -125,25 +74,20 @@ class PresentationImageService:
                 unique_id = str(uuid.uuid4())[:8]
                 safe_prompt = "".join(c for c in prompt if c.isalnum() or c in (' ', '-', '_')).rstrip()
                 safe_prompt = safe_prompt.replace(' ', '_')[:30]
-                gcs_filename = f"presentation_images/dalle2_{safe_prompt}_{timestamp}_{unique_id}.png"
+                gcs_filename = f"presentation_images/{model.replace('-', '')}_{safe_prompt}_{timestamp}_{unique_id}.png"
             
-            # Upload to Google Cloud Storage
-            blob = self.bucket.blob(gcs_filename)
-            blob.upload_from_string(
-                image_data,
-                content_type="image/png"
+            # Upload the original and build/upload the WebP variants at the same time
+            public_url, variants = await asyncio.gather(
+                storage_service.upload(image_data, gcs_filename, "image/png", self.gcs_bucket_name),
+                image_derivative_service.create_variants(image_data, gcs_filename.rsplit(".", 1)[0])
             )
             
-            # Make the blob publicly readable
-            blob.make_public()
-            
-            public_url = blob.public_url
             print(f"Image uploaded to GCS: {public_url}")
             
-            return public_url
+            return {"url": public_url, "model": model, "variants": variants}
             
         except Exception as e:
-            print(f"Error generating image with DALL-E 2: {e}")
+            print(f"Error generating image with {label}: {e}")
             raise e
     
     async def generate_presentation_image(
@@ -157,20 +101,30 @@ class PresentationImageService:
         Main method to generate images for presentations
         Supports model selection: "dalle3" or "dalle2"
         """
+        return (await self.generate_presentation_image_with_variants(prompt, model, size, filename))["url"]
+    
+    async def generate_presentation_image_with_variants(
+        self,
+        prompt: str,
+        model: str = "dalle3",
+        size: str = "1024x1024",
+        filename: str = None
+    ) -> Dict[str, Any]:
+        """
+        Same as generate_presentation_image, returning {"url", "model", "variants"}
+        so callers can record the responsive variant URLs
+        """
         try:
-            if model.lower() == "dalle3":
-                return await self.generate_image_dalle3(prompt, size, filename)
-            elif model.lower() == "dalle2":
-                return await self.generate_image_dalle2(prompt, size, filename)
-            else:
-                # Default to DALL-E 3
-                return await self.generate_image_dalle3(prompt, size, filename)
+            if model.lower() == "dalle2":
+                return await self._generate_dalle_image("dall-e-2", prompt, size, filename)
+            # Default to DALL-E 3
+            return await self._generate_dalle_image("dall-e-3", prompt, size, filename)
         except Exception as e:
             print(f"Error with {model}, trying fallback...")
             # If DALL-E 3 fails, try DALL-E 2
             if model.lower() == "dalle3":
                 try:
-                    return await self.generate_image_dalle2(prompt, size, filename)
+                    return await self._generate_dalle_image("dall-e-2", prompt, size, filename)
                 except Exception as fallback_error:
                     print(f"Fallback also failed: {fallback_error}")
                     raise e
@@ -181,7 +135,7 @@ class PresentationImageService:
         """Test Google Cloud Storage connection"""
         try:
             # Try to access the bucket
-            bucket_exists = self.bucket.exists()
+            bucket_exists = storage_service.backend(self.gcs_bucket_name).health_check()
             print(f"GCS Bucket '{self.gcs_bucket_name}' exists: {bucket_exists}")
             return bucket_exists
         except Exception as e:
@@ -0,0 +1,125 @@
+"""
+Generation Cache - In-memory cache of presentation generation results keyed by normalized inputs
+"""
+import os
+import re
+import copy
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+def content_hash(content: Any) -> str:
+    """SHA-256 of a source's content, so large documents are keyed by digest instead of text"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content or b"").hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    """Canonicalize inputs so cosmetic differences (whitespace, None vs "") share a key"""
+    if isinstance(value, str):
+        value = re.sub(r"\s+", " ", value).strip()
+        return value or None
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+class GenerationCache:
+    """
+    LRU cache with a per-entry TTL for generation results.
+
+    Entries expire after ttl_seconds, and the least recently used entry is evicted
+    once max_entries is exceeded. Values are deep-copied on the way in and out so
+    callers can freely mutate what they get back.
+    """
+
+    def __init__(self, max_entries: int = None, ttl_seconds: float = None, enabled: bool = None):
+        """
+        Initialize generation cache
+
+        Args:
+            max_entries: Maximum number of cached results (PRESENTATION_CACHE_MAX_ENTRIES)
+            ttl_seconds: Seconds before an entry expires (PRESENTATION_CACHE_TTL)
+            enabled: Whether caching is on at all (PRESENTATION_CACHE_ENABLED)
+        """
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("PRESENTATION_CACHE_MAX_ENTRIES", "256"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("PRESENTATION_CACHE_TTL", "3600"))
+        self.enabled = enabled if enabled is not None else os.getenv("PRESENTATION_CACHE_ENABLED", "true").lower() == "true"
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, namespace: str, **inputs) -> str:
+        """
+        Build a canonical cache key
+
+        Args:
+            namespace: What is being cached (e.g. "unified", "outline", "slides")
+            **inputs: Generation inputs; strings are whitespace-normalized and the
+                whole set is serialized with sorted keys before hashing
+
+        Returns:
+            Key of the form "<namespace>:<sha256>"
+        """
+        canonical = json.dumps(_normalize(inputs), sort_keys=True, separators=(",", ":"), default=str)
+        return f"{namespace}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached value, or None if missing or expired"""
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any):
+        """Store a copy of value, evicting the least recently used entries beyond max_entries"""
+        if not self.enabled or self.max_entries <= 0:
+            return
+
+        self._entries[key] = (time.time() + self.ttl_seconds, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        """Drop a single entry"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current size and hit/miss counters"""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Global generation cache instance
+generation_cache = GenerationCache()
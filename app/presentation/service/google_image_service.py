@@ -7,12 +7,15 @@ import io
 import asyncio
 import aiohttp
 import uuid
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
-from google.cloud import storage
 from urllib.parse import quote_plus
 import re
 
+from app.core.storage_service import storage_service
+from app.presentation.service.generation_cache import GenerationCache
+from app.presentation.service.image_probe import probe_image, layout_fit_score
+
 class GoogleImageSearchService:
     def __init__(self):
         # Google Custom Search API credentials
@@ -20,16 +23,55 @@ class GoogleImageSearchService:
         self.search_engine_id = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
         self.base_url = "https://www.googleapis.com/customsearch/v1"
         
-        # GCS setup for storing fetched images
-        from app.core.gcs_client import get_shared_gcs_client
-        self.storage_client = get_shared_gcs_client()
+        # Bucket for storing fetched images (through storage_service)
         self.gcs_bucket_name = os.getenv("GCS_BUCKET_NAME", "deck123")
-        self.bucket = self.storage_client.bucket(self.gcs_bucket_name)
+        
+        # Pooled HTTP session shared by searches and downloads (opened/closed by the app lifespan)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.http_pool_size = int(os.getenv("GOOGLE_IMAGE_HTTP_POOL_SIZE", "100"))
+        self.http_pool_per_host = int(os.getenv("GOOGLE_IMAGE_HTTP_POOL_PER_HOST", "20"))
+        self.http_timeout = float(os.getenv("GOOGLE_IMAGE_HTTP_TIMEOUT", "30"))
+        
+        # Custom Search responses keyed by cleaned query, to save latency and API quota
+        self.search_cache = GenerationCache(
+            max_entries=int(os.getenv("GOOGLE_SEARCH_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.getenv("GOOGLE_SEARCH_CACHE_TTL", "3600")),
+            enabled=os.getenv("GOOGLE_SEARCH_CACHE_ENABLED", "true").lower() == "true"
+        )
+        
+        # Candidates are ranked by probing only their headers, then just the winner is downloaded
+        self.candidate_count = int(os.getenv("GOOGLE_IMAGE_CANDIDATES", "5"))
+        self.probe_timeout = float(os.getenv("IMAGE_PROBE_TIMEOUT", "5"))
         
         print("🔍 Google Image Search Service initialized")
         if not self.api_key or not self.search_engine_id:
             print("⚠️ Warning: Google Search API credentials not configured")
     
+    async def startup(self):
+        """Open the pooled HTTP session"""
+        await self._get_session()
+    
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session, created on first use if the lifespan has not opened it"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.http_pool_size,
+                limit_per_host=self.http_pool_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.http_timeout)
+            )
+        return self._session
+    
     def _clean_search_query(self, prompt: str) -> str:
         """Clean and optimize search query for better results"""
         # Remove special characters and extra spaces
@@ -52,6 +94,12 @@ class GoogleImageSearchService:
         
         cleaned_query = self._clean_search_query(query)
         
+        cache_key = self.search_cache.make_key("google_search", query=cleaned_query, num=min(num_results, 10))
+        cached_images = self.search_cache.get(cache_key)
+        if cached_images is not None:
+            print(f"⚡ Search cache hit for query: {cleaned_query}")
+            return cached_images
+        
         params = {
             'key': self.api_key,
             'cx': self.search_engine_id,
@@ -65,27 +113,29 @@ class GoogleImageSearchService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        images = []
-                        if 'items' in data:
-                            for item in data['items']:
-                                images.append({
-                                    'url': item.get('link'),
-                                    'title': item.get('title', ''),
-                                    'thumbnail': item.get('image', {}).get('thumbnailLink'),
-                                    'context': item.get('image', {}).get('contextLink'),
-                                    'size': f"{item.get('image', {}).get('width', 0)}x{item.get('image', {}).get('height', 0)}"
-                                })
-                        
-                        print(f"🔍 Found {len(images)} images for query: {cleaned_query}")
-                        return images
-                    else:
-                        error_data = await response.json()
-                        raise Exception(f"Google Search API error: {error_data}")
+            session = await self._get_session()
+            async with session.get(self.base_url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    
+                    images = []
+                    if 'items' in data:
+                        for item in data['items']:
+                            images.append({
+                                'url': item.get('link'),
+                                'title': item.get('title', ''),
+                                'thumbnail': item.get('image', {}).get('thumbnailLink'),
+                                'context': item.get('image', {}).get('contextLink'),
+                                'size': f"{item.get('image', {}).get('width', 0)}x{item.get('image', {}).get('height', 0)}"
+                            })
+                    
+                    print(f"🔍 Found {len(images)} images for query: {cleaned_query}")
+                    if images:
+                        self.search_cache.set(cache_key, images)
+                    return images
+                else:
+                    error_data = await response.json()
+                    raise Exception(f"Google Search API error: {error_data}")
         
         except Exception as e:
             print(f"❌ Error searching images: {str(e)}")
@@ -94,55 +144,123 @@ class GoogleImageSearchService:
     async def download_and_store_image(self, image_url: str, filename: str = None) -> str:
         """Download image from URL and store in GCS"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(image_url) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        
-                        # Generate filename if not provided
-                        if not filename:
-                            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                            unique_id = str(uuid.uuid4())[:8]
-                            filename = f"google_images/img_{timestamp}_{unique_id}.jpg"
-                        elif not filename.startswith("google_images/"):
-                            filename = f"google_images/{filename}"
-                        
-                        # Upload to GCS
-                        blob = self.bucket.blob(filename)
-                        blob.upload_from_string(
-                            image_data,
-                            content_type=response.headers.get('content-type', 'image/jpeg')
-                        )
-                        
-                        # Make publicly accessible
-                        blob.make_public()
-                        
-                        public_url = blob.public_url
-                        print(f"📁 Image stored in GCS: {public_url}")
-                        
-                        return public_url
-                    else:
-                        raise Exception(f"Failed to download image: HTTP {response.status}")
+            image_data, content_type = await self._fetch_image(image_url)
+            return await self._store_image(image_data, content_type, filename)
         
         except Exception as e:
             print(f"❌ Error downloading/storing image: {str(e)}")
             raise e
     
+    async def _fetch_image(self, image_url: str) -> Tuple[bytes, str]:
+        """Download image bytes over the pooled session; non-image responses count as failures"""
+        session = await self._get_session()
+        async with session.get(image_url) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to download image: HTTP {response.status}")
+            
+            content_type = response.headers.get('content-type', 'image/jpeg')
+            if not content_type.startswith('image/'):
+                raise Exception(f"URL did not return an image ({content_type})")
+            
+            return await response.read(), content_type
+    
+    async def _store_image(self, image_data: bytes, content_type: str, filename: str = None) -> str:
+        """Upload image bytes to GCS and return the public URL"""
+        # Generate filename if not provided
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            unique_id = str(uuid.uuid4())[:8]
+            filename = f"google_images/img_{timestamp}_{unique_id}.jpg"
+        elif not filename.startswith("google_images/"):
+            filename = f"google_images/{filename}"
+        
+        # Upload to GCS (published in the same request)
+        public_url = await storage_service.upload(image_data, filename, content_type, self.gcs_bucket_name)
+        print(f"📁 Image stored in GCS: {public_url}")
+        
+        return public_url
+    
+    async def _rank_candidates(self, images: List[Dict], layout: Optional[str] = None) -> List[Dict]:
+        """
+        Probe every candidate's header concurrently and order them by fit for the slide layout
+        
+        Candidates that are unreachable, not images, or too slow to probe are dropped.
+        Ties keep the search ranking.
+        
+        Returns:
+            Candidates with a "probe" entry ({"format", "width", "height"}), best first
+        """
+        session = await self._get_session()
+        probes = await asyncio.gather(
+            *[asyncio.wait_for(probe_image(session, image['url']), self.probe_timeout) for image in images],
+            return_exceptions=True
+        )
+        
+        ranked = []
+        for image, probe in zip(images, probes):
+            if isinstance(probe, BaseException):
+                print(f"⚠️ Candidate probe failed ({image['url']}): {probe or type(probe).__name__}")
+                continue
+            ranked.append({**image, 'probe': probe})
+        
+        ranked.sort(key=lambda image: layout_fit_score(image['probe']['width'], image['probe']['height'], layout))
+        return ranked
+    
+    async def _download_ranked(self, ranked: List[Dict]) -> Tuple[Dict, bytes, str]:
+        """Download only the best candidate, moving down the ranking if it fails"""
+        for image in ranked:
+            try:
+                image_data, content_type = await self._fetch_image(image['url'])
+                return image, image_data, content_type
+            except Exception as e:
+                print(f"⚠️ Candidate download failed ({image['url']}): {e}")
+        raise Exception("All candidate image downloads failed")
+    
+    async def _download_first_available(self, images: List[Dict]) -> Tuple[Dict, bytes, str]:
+        """
+        Download all candidates concurrently and return the highest-ranked one that succeeds
+        
+        Hotlink-protected or dead candidates no longer cost a sequential retry: by the
+        time the first candidate fails, the next one is usually already downloaded.
+        
+        Returns:
+            (candidate, image bytes, content type)
+        """
+        tasks = [asyncio.create_task(self._fetch_image(image['url'])) for image in images]
+        try:
+            for image, task in zip(images, tasks):
+                try:
+                    image_data, content_type = await task
+                    return image, image_data, content_type
+                except Exception as e:
+                    print(f"⚠️ Candidate download failed ({image['url']}): {e}")
+            raise Exception("All candidate image downloads failed")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # Mark lower-ranked failures as retrieved
+    
     async def get_presentation_image_fast(
         self, 
         prompt: str, 
         store_in_gcs: bool = True,
-        filename: str = None
+        filename: str = None,
+        layout: Optional[str] = None
     ) -> Dict:
         """
         Fast image retrieval for presentations
         Returns the best matching image from Google search
+        
+        When storing, candidates are ranked by how well their aspect ratio fits the
+        slide layout ("left", "right" or "vertical"), read from header-only probes.
         """
         try:
             print(f"🚀 Fast image search for: {prompt}")
             
             # Search for images
-            images = await self.search_images(prompt, num_results=3)
+            images = await self.search_images(prompt, num_results=self.candidate_count)
             
             if not images:
                 raise Exception("No images found for the given prompt")
@@ -152,19 +270,27 @@ class GoogleImageSearchService:
             image_url = best_image['url']
             
             if store_in_gcs:
-                # Download and store in our GCS bucket
-                stored_url = await self.download_and_store_image(image_url, filename)
+                ranked = await self._rank_candidates(images, layout)
+                if ranked:
+                    best_image, image_data, content_type = await self._download_ranked(ranked)
+                else:
+                    # No candidate answered a probe: download them in parallel and keep the first that works
+                    best_image, image_data, content_type = await self._download_first_available(images)
+                stored_url = await self._store_image(image_data, content_type, filename)
                 
+                probe = best_image.get('probe')
                 return {
                     'success': True,
                     'url': stored_url,
-                    'original_url': image_url,
+                    'original_url': best_image['url'],
                     'prompt': prompt,
                     'title': best_image.get('title', ''),
-                    'size': best_image.get('size', ''),
+                    'size': f"{probe['width']}x{probe['height']}" if probe else best_image.get('size', ''),
+                    'format': probe['format'] if probe else None,
+                    'layout': layout,
                     'source': 'google_search',
                     'filename': filename,
-                    'alternatives': images[1:] if len(images) > 1 else []
+                    'alternatives': [image for image in images if image['url'] != best_image['url']]
                 }
             else:
                 # Return direct URL without storing
@@ -0,0 +1,164 @@
+"""
+Image Cache Service - Reuses stored images across presentations by normalized prompt, model and size
+"""
+import os
+import re
+import time
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.presentation.db_models import Presentation, PresentationImage
+
+IMAGE_CACHE_SCOPES = ("global", "user")
+
+
+def normalize_image_prompt(prompt: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation so trivially different prompts match"""
+    return re.sub(r"\s+", " ", (prompt or "").lower()).strip().rstrip(".!?,;: ")
+
+
+def image_prompt_hash(prompt: str, model: str, size: str) -> str:
+    """SHA-256 cache key of a normalized prompt together with the model and size it was generated for"""
+    key = f"{model or ''}|{size or ''}|{normalize_image_prompt(prompt)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ImageCacheService:
+    """
+    Prompt-keyed image cache backed by PresentationImage rows.
+
+    Every stored image row carries a prompt_hash. A lookup returns the URL of the most
+    recently used matching image (optionally only among the user's own presentations)
+    and bumps its last_used_at. Entries unused for longer than the TTL, or beyond the
+    most recently used max_entries, stop being served: their prompt_hash is cleared
+    while the rows themselves keep backing their presentations.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("IMAGE_CACHE_ENABLED", "true").lower() == "true"
+        self.scope = os.getenv("IMAGE_CACHE_SCOPE", "global")
+        self.ttl_days = float(os.getenv("IMAGE_CACHE_TTL_DAYS", "30"))
+        self.max_entries = int(os.getenv("IMAGE_CACHE_MAX_ENTRIES", "50000"))
+        self.prune_interval = float(os.getenv("IMAGE_CACHE_PRUNE_INTERVAL", "3600"))
+        self._last_prune = 0.0
+
+    async def lookup(
+        self,
+        prompt: str,
+        model: str,
+        size: str,
+        user_id: Optional[int] = None,
+        scope: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a previously stored image for the same prompt, model and size
+
+        Args:
+            prompt: Image prompt (normalized before hashing)
+            model: Model the image must have come from ("dall-e-3", "google_search", ...)
+            size: Image size
+            user_id: Owner whose presentations are searched in "user" scope
+            scope: "global" or "user" (IMAGE_CACHE_SCOPE); "user" without a user_id is a miss
+
+        Returns:
+            {"url", "filename", "model", "size", "variants", "prompt_hash"} or None on a miss
+        """
+        scope = scope or self.scope
+        if not self.enabled or (scope == "user" and user_id is None):
+            return None
+
+        self._maybe_prune()
+        prompt_hash = image_prompt_hash(prompt, model, size)
+        return await asyncio.to_thread(self._lookup, prompt_hash, user_id if scope == "user" else None)
+
+    def _lookup(self, prompt_hash: str, user_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Blocking lookup and LRU touch"""
+        db: Session = SessionLocal()
+        try:
+            last_used = func.coalesce(PresentationImage.last_used_at, PresentationImage.created_at)
+            query = db.query(PresentationImage).filter(
+                PresentationImage.prompt_hash == prompt_hash,
+                last_used >= datetime.now(timezone.utc) - timedelta(days=self.ttl_days)
+            )
+            if user_id is not None:
+                query = query.join(Presentation, Presentation.id == PresentationImage.presentation_id).filter(
+                    Presentation.user_id == user_id
+                )
+
+            image = query.order_by(last_used.desc()).first()
+            if not image:
+                return None
+
+            image.last_used_at = datetime.now(timezone.utc)
+            db.commit()
+
+            print(f"♻️ Image cache hit: {image.image_url}")
+            return {
+                "url": image.image_url,
+                "filename": image.filename,
+                "model": image.model,
+                "size": image.size,
+                "variants": image.variants,
+                "prompt_hash": prompt_hash
+            }
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Image cache lookup failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def prune(self) -> int:
+        """
+        Stop serving expired and least recently used entries
+
+        Returns:
+            Number of image rows removed from the cache
+        """
+        db: Session = SessionLocal()
+        try:
+            last_used = func.coalesce(PresentationImage.last_used_at, PresentationImage.created_at)
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.ttl_days)
+
+            evicted = db.query(PresentationImage).filter(
+                PresentationImage.prompt_hash.isnot(None),
+                last_used < cutoff
+            ).update({PresentationImage.prompt_hash: None}, synchronize_session=False)
+
+            # Over capacity: drop the least recently used prompt hashes
+            overflow = db.query(PresentationImage.prompt_hash).filter(
+                PresentationImage.prompt_hash.isnot(None)
+            ).group_by(PresentationImage.prompt_hash).order_by(
+                func.max(last_used).desc()
+            ).offset(self.max_entries).all()
+            if overflow:
+                evicted += db.query(PresentationImage).filter(
+                    PresentationImage.prompt_hash.in_([row.prompt_hash for row in overflow])
+                ).update({PresentationImage.prompt_hash: None}, synchronize_session=False)
+
+            db.commit()
+            if evicted:
+                print(f"🧹 Image cache evicted {evicted} entries")
+            return evicted
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Image cache prune failed: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def _maybe_prune(self):
+        """Run prune in the background at most once per prune_interval"""
+        now = time.time()
+        if now - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = now
+        asyncio.get_running_loop().run_in_executor(None, self.prune)
+
+
+# Global image cache instance
+image_cache_service = ImageCacheService()
@@ -0,0 +1,197 @@
+"""
+Image Prefetch Service - Resolves slide image queries while the rest of the deck is still generating
+"""
+import os
+import re
+import time
+import asyncio
+from typing import List, Dict, Any, Optional, Callable
+
+from app.presentation.service.slide_parser import parse_section
+from app.presentation.service.image_cache_service import image_cache_service
+
+IMAGE_PROVIDERS = ("google", "dalle")
+
+
+def image_filename(query: str) -> str:
+    """Slugified filename matching the src convention used in generated <IMG> tags"""
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", query.strip()).strip("_")
+    return slug + ".png"
+
+
+class SlideImagePrefetcher:
+    """
+    Per-generation image prefetcher.
+
+    submit() is called with each <SECTION> as soon as it closes. It starts resolving
+    the slide's image queries in the background under a concurrency limit, so image
+    search/generation overlaps with generation of the remaining slides.
+    """
+
+    def __init__(
+        self,
+        provider: str = "google",
+        concurrency: int = None,
+        max_images: int = None,
+        on_image: Optional[Callable[[Dict[str, Any]], None]] = None,
+        user_id: Optional[int] = None
+    ):
+        """
+        Args:
+            provider: "google" (image search, fast) or "dalle" (DALL-E 3 generation)
+            concurrency: Maximum concurrent image requests (PRESENTATION_IMAGE_CONCURRENCY)
+            max_images: Maximum images resolved per deck (PRESENTATION_MAX_PREFETCH_IMAGES)
+            on_image: Optional callback invoked with each image result as it resolves
+            user_id: Deck owner, used to scope image cache lookups (IMAGE_CACHE_SCOPE=user)
+        """
+        if provider not in IMAGE_PROVIDERS:
+            raise ValueError(f"Unsupported image provider: {provider}")
+
+        self.provider = provider
+        self.semaphore = asyncio.Semaphore(concurrency or int(os.getenv("PRESENTATION_IMAGE_CONCURRENCY", "4")))
+        self.max_images = max_images if max_images is not None else int(os.getenv("PRESENTATION_MAX_PREFETCH_IMAGES", "20"))
+        self.on_image = on_image
+        self.user_id = user_id
+        self._tasks: List[asyncio.Task] = []
+        self._submitted: List[tuple] = []
+        self._queries_seen = set()
+
+    def submit(self, slide_index: int, section_xml: str):
+        """Start resolving the image queries of a completed slide"""
+        slide = parse_section(section_xml)
+        for image in slide.get("images", []):
+            query = (image.get("query") or "").strip()
+            if not query or query in self._queries_seen or len(self._tasks) >= self.max_images:
+                continue
+
+            self._queries_seen.add(query)
+            self._submitted.append((slide_index, query, image.get("src")))
+            self._tasks.append(asyncio.create_task(
+                self._resolve(slide_index, query, image.get("src"), slide.get("layout"))
+            ))
+
+    async def wait(self, timeout: float = None) -> List[Dict[str, Any]]:
+        """
+        Wait for outstanding images and return every result
+
+        Images still pending after the timeout are cancelled and reported with an error;
+        their <IMG> src keeps the placeholder URL, so clients can still generate them lazily.
+
+        Args:
+            timeout: Seconds to wait after the text finished (PRESENTATION_IMAGE_PREFETCH_TIMEOUT)
+
+        Returns:
+            List of image result dictionaries in submission order
+        """
+        if not self._tasks:
+            return []
+
+        timeout = timeout if timeout is not None else float(os.getenv("PRESENTATION_IMAGE_PREFETCH_TIMEOUT", "30"))
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"⚠️ {len(pending)} prefetched images did not finish within {timeout}s")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        for task, (slide_index, query, placeholder_src) in zip(self._tasks, self._submitted):
+            if task.cancelled():
+                results.append({
+                    "query": query,
+                    "slide_index": slide_index,
+                    "placeholder_src": placeholder_src,
+                    "provider": self.provider,
+                    "url": None,
+                    "error": "Timed out"
+                })
+            else:
+                results.append(task.result())
+        return results
+
+    def cancel(self):
+        """Cancel all outstanding image requests"""
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+
+    def apply_to_xml(self, presentation_xml: str, images: List[Dict[str, Any]]) -> str:
+        """Point each <IMG> src at the stored image URL where it differs from the placeholder"""
+        for image in images:
+            if image.get("url") and image.get("placeholder_src") and image["url"] != image["placeholder_src"]:
+                presentation_xml = presentation_xml.replace(
+                    f'src="{image["placeholder_src"]}"', f'src="{image["url"]}"'
+                )
+        return presentation_xml
+
+    async def _resolve(
+        self,
+        slide_index: int,
+        query: str,
+        placeholder_src: Optional[str],
+        layout: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Fetch or generate one image; failures become error results"""
+        result = {
+            "query": query,
+            "slide_index": slide_index,
+            "placeholder_src": placeholder_src,
+            "provider": self.provider,
+            "url": None
+        }
+        start_time = time.time()
+
+        async with self.semaphore:
+            try:
+                model, size = ("dall-e-3", "1792x1024") if self.provider == "dalle" else ("google_search", "unknown")
+                cached = await image_cache_service.lookup(query, model, size, user_id=self.user_id)
+
+                if cached:
+                    result.update({
+                        "url": cached["url"],
+                        "model": model,
+                        "size": size,
+                        "filename": cached.get("filename"),
+                        "variants": cached.get("variants"),
+                        "cache_hit": True
+                    })
+                elif self.provider == "dalle":
+                    from app.presentation.service.enhanced_image_service import enhanced_image_service
+                    generated = await enhanced_image_service.generate_presentation_image_with_variants(
+                        prompt=query,
+                        model="dalle3",
+                        size="1792x1024",  # Landscape format for slides
+                        filename=image_filename(query)
+                    )
+                    result.update({
+                        "url": generated["url"],
+                        "model": generated["model"],
+                        "size": "1792x1024",
+                        "filename": image_filename(query),
+                        "variants": generated["variants"]
+                    })
+                else:
+                    from app.presentation.service.google_image_service import google_image_service
+                    search_result = await google_image_service.get_presentation_image_fast(
+                        prompt=query,
+                        store_in_gcs=True,
+                        filename=image_filename(query).replace(".png", ".jpg"),
+                        layout=layout
+                    )
+                    if not search_result.get("success"):
+                        raise Exception(search_result.get("error", "Image search failed"))
+                    result.update({
+                        "url": search_result["url"],
+                        "model": "google_search",
+                        "size": "unknown",
+                        "filename": search_result.get("filename")
+                    })
+            except Exception as e:
+                print(f"⚠️ Image prefetch failed for slide {slide_index + 1} ({query[:50]}): {e}")
+                result["error"] = str(e)
+
+        result["resolve_time"] = time.time() - start_time
+        if self.on_image:
+            self.on_image(result)
+        return result
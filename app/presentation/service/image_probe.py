@@ -0,0 +1,160 @@
+"""
+Image Probe - Reads image dimensions from the first bytes of a remote file to rank candidates without downloading them
+"""
+import os
+import math
+from typing import Optional, Dict, Any
+
+import aiohttp
+
+# Aspect ratio (width / height) of the image area for each slide layout
+LAYOUT_ASPECT_RATIOS = {
+    "left": 0.8,       # Side column next to the content
+    "right": 0.8,
+    "vertical": 16 / 9  # Banner across the top
+}
+DEFAULT_ASPECT_RATIO = 4 / 3
+
+PROBE_BYTES = int(os.getenv("IMAGE_PROBE_BYTES", "65536"))
+PROBE_CHUNK_BYTES = 4096
+MIN_IMAGE_WIDTH = int(os.getenv("IMAGE_PROBE_MIN_WIDTH", "600"))
+
+# JPEG start-of-frame markers (DHT, JPG and DAC share the range but carry no dimensions)
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def parse_image_header(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Read format and dimensions from the start of a PNG, JPEG, WebP or GIF file
+
+    Args:
+        data: Leading bytes of the file (a few KB is usually enough)
+
+    Returns:
+        {"format", "width", "height"}, or None if the header is incomplete or unsupported
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(data) >= 24 and data[12:16] == b"IHDR":
+            return _dimensions("png", int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big"))
+        return None
+
+    if data[:2] == b"\xff\xd8":
+        return _parse_jpeg(data)
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _parse_webp(data)
+
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return _dimensions("gif", int.from_bytes(data[6:8], "little"), int.from_bytes(data[8:10], "little"))
+
+    return None
+
+
+def layout_fit_score(width: int, height: int, layout: Optional[str] = None) -> float:
+    """
+    How badly an image fits a slide layout (lower is better)
+
+    The score is the log distance between the image's aspect ratio and the layout's,
+    so 2x too wide and 2x too tall are equally bad, plus a penalty for images narrower
+    than MIN_IMAGE_WIDTH that would look blurry when scaled up.
+    """
+    target = LAYOUT_ASPECT_RATIOS.get((layout or "").lower(), DEFAULT_ASPECT_RATIO)
+    score = abs(math.log((width / height) / target))
+    if width < MIN_IMAGE_WIDTH:
+        score += 1.0 + (MIN_IMAGE_WIDTH - width) / MIN_IMAGE_WIDTH
+    return score
+
+
+async def probe_image(session: aiohttp.ClientSession, url: str, max_bytes: int = None) -> Dict[str, Any]:
+    """
+    Fetch just enough of a remote image to read its header
+
+    Sends a Range request for the first max_bytes (IMAGE_PROBE_BYTES) and stops reading
+    as soon as the dimensions are known, so servers that ignore Range still only send
+    a few KB before the connection is dropped.
+
+    Returns:
+        {"format", "width", "height", "content_type"}
+
+    Raises:
+        Exception: If the URL is unreachable, not an image, or the header can't be parsed
+    """
+    max_bytes = max_bytes or PROBE_BYTES
+
+    async with session.get(url, headers={"Range": f"bytes=0-{max_bytes - 1}"}) as response:
+        if response.status not in (200, 206):
+            raise Exception(f"Probe failed: HTTP {response.status}")
+
+        content_type = response.headers.get("content-type", "")
+        if content_type and not content_type.startswith("image/"):
+            raise Exception(f"URL did not return an image ({content_type})")
+
+        data = b""
+        while len(data) < max_bytes:
+            chunk = await response.content.read(PROBE_CHUNK_BYTES)
+            if not chunk:
+                break
+            data += chunk
+
+            header = parse_image_header(data)
+            if header:
+                return {**header, "content_type": content_type}
+
+    raise Exception(f"Could not read image dimensions from the first {len(data)} bytes")
+
+
+def _dimensions(image_format: str, width: int, height: int) -> Optional[Dict[str, Any]]:
+    if width <= 0 or height <= 0:
+        return None
+    return {"format": image_format, "width": width, "height": height}
+
+
+def _parse_jpeg(data: bytes) -> Optional[Dict[str, Any]]:
+    """Walk JPEG segments up to the start-of-frame marker"""
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            i += 1  # Resync on garbage between segments
+            continue
+
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1  # Fill byte
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2  # Standalone markers have no length
+            continue
+
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return _dimensions("jpeg", width, height)
+
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+
+    return None
+
+
+def _parse_webp(data: bytes) -> Optional[Dict[str, Any]]:
+    """Read dimensions from a lossy (VP8), lossless (VP8L) or extended (VP8X) WebP header"""
+    if len(data) < 30:
+        return None
+
+    chunk = data[12:16]
+    if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+        width = int.from_bytes(data[26:28], "little") & 0x3FFF
+        height = int.from_bytes(data[28:30], "little") & 0x3FFF
+        return _dimensions("webp", width, height)
+
+    if chunk == b"VP8L" and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], "little")
+        return _dimensions("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return _dimensions("webp", width, height)
+
+    return None
@@ -1,9 +1,11 @@
 """
 Improved Presentation Service with better error handling and performance
 """
+import os
+import time
 import asyncio
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
@@ -11,6 +13,7 @@ from app.presentation.db_models import Presentation, PresentationImage
 from app.core.database import SessionLocal
 from app.presentation.service.enhanced_image_service import enhanced_image_service
 from app.presentation.service.google_image_service import google_image_service
+from app.presentation.service.image_cache_service import image_cache_service, image_prompt_hash
 
 class PresentationServiceError(Exception):
     """Custom exception for presentation service errors"""
@@ -30,6 +33,15 @@ class ImprovedPresentationService:
     def __init__(self):
         self.max_retries = 3
         self.cache = {}  # Simple in-memory cache (consider Redis for production)
+        # Per-provider caps so batches stay under each provider's rate limits
+        self.provider_semaphores = {
+            "dall-e-3": asyncio.Semaphore(int(os.getenv("IMAGE_DALLE_CONCURRENCY", "5"))),
+            "google_search": asyncio.Semaphore(int(os.getenv("IMAGE_SEARCH_CONCURRENCY", "8")))
+        }
+        # Hedged acquisition: "" keeps the sequential fallback, "fastest" or "prefer_ai" races both providers
+        self.hedge_policy = os.getenv("IMAGE_HEDGE_POLICY", "")
+        self.hedge_delay = float(os.getenv("IMAGE_HEDGE_DELAY", "0"))
+        self.ai_deadline = float(os.getenv("IMAGE_AI_DEADLINE", "8"))
     
     async def create_presentation_with_validation(
         self,
@@ -153,22 +165,40 @@ class ImprovedPresentationService:
         prompt: str,
         presentation_id: Optional[int] = None,
         prefer_ai: bool = True,
-        size: str = "1024x1024"
+        size: str = "1024x1024",
+        hedge_policy: Optional[str] = None,
+        user_id: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Generate image with fallback strategy"""
+        """
+        Generate image with fallback strategy
+        
+        Images previously stored for the same normalized prompt are reused first (see
+        image_cache_service; user_id scopes the lookup when IMAGE_CACHE_SCOPE=user).
+        With a hedge_policy ("fastest" or "prefer_ai", default IMAGE_HEDGE_POLICY) both
+        providers are raced instead; see generate_image_hedged.
+        """
         
         if not prompt or not prompt.strip():
             raise ImageGenerationError("Prompt is required for image generation")
         
+        cached = await self._cached_image(prompt, size, prefer_ai, presentation_id, user_id)
+        if cached:
+            return cached
+        
+        hedge_policy = hedge_policy if hedge_policy is not None else self.hedge_policy
+        if hedge_policy:
+            return await self.generate_image_hedged(
+                prompt=prompt,
+                presentation_id=presentation_id,
+                policy=hedge_policy,
+                size=size
+            )
+        
         # Try AI generation first if preferred
         if prefer_ai:
             try:
                 print(f"🎨 Attempting AI image generation for: {prompt}")
-                image_url = await enhanced_image_service.generate_presentation_image(
-                    prompt=prompt,
-                    model="dalle3",
-                    size=size
-                )
+                image_url = await self._generate_ai_image(prompt, size)
                 
                 # Save to database if presentation_id provided
                 if presentation_id and image_url:
@@ -194,10 +224,7 @@ class ImprovedPresentationService:
                 
                 # Fallback to Google search
                 try:
-                    result = await google_image_service.get_presentation_image_fast(
-                        prompt=prompt,
-                        store_in_gcs=True
-                    )
+                    result = await self._search_image(prompt)
                     
                     if result.get("success") and presentation_id:
                         await self._save_image_to_db(
@@ -224,10 +251,7 @@ class ImprovedPresentationService:
             # Try Google search first
             try:
                 print(f"🔍 Attempting Google search for: {prompt}")
-                result = await google_image_service.get_presentation_image_fast(
-                    prompt=prompt,
-                    store_in_gcs=True
-                )
+                result = await self._search_image(prompt)
                 
                 if result.get("success") and presentation_id:
                     await self._save_image_to_db(
@@ -252,11 +276,7 @@ class ImprovedPresentationService:
                 
                 # Fallback to AI generation
                 try:
-                    image_url = await enhanced_image_service.generate_presentation_image(
-                        prompt=prompt,
-                        model="dalle3",
-                        size=size
-                    )
+                    image_url = await self._generate_ai_image(prompt, size)
                     
                     if presentation_id and image_url:
                         await self._save_image_to_db(
@@ -279,6 +299,221 @@ class ImprovedPresentationService:
                 except Exception as fallback_error:
                     raise ImageGenerationError(f"Both search and AI fallback failed: {str(fallback_error)}")
     
+    async def generate_image_hedged(
+        self,
+        prompt: str,
+        presentation_id: Optional[int] = None,
+        policy: str = "prefer_ai",
+        size: str = "1024x1024",
+        hedge_delay: Optional[float] = None,
+        ai_deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Race DALL-E generation against Google image search
+        
+        DALL-E starts immediately and the search starts after hedge_delay seconds
+        (IMAGE_HEDGE_DELAY). The losing request is cancelled.
+        
+        Args:
+            policy: "fastest" returns the first successful image; "prefer_ai" returns the
+                DALL-E image if it succeeds within ai_deadline seconds (IMAGE_AI_DEADLINE),
+                otherwise whichever succeeds first after that
+        
+        Raises:
+            ImageGenerationError: If the policy is unknown or both providers fail
+        """
+        if policy not in ("fastest", "prefer_ai"):
+            raise ImageGenerationError(f"Unknown hedge policy: {policy}")
+        
+        hedge_delay = self.hedge_delay if hedge_delay is None else hedge_delay
+        ai_deadline = self.ai_deadline if ai_deadline is None else ai_deadline
+        start_time = time.time()
+        deadline = start_time + ai_deadline
+        
+        async def search_after_delay() -> Dict[str, Any]:
+            if hedge_delay > 0:
+                await asyncio.sleep(hedge_delay)
+            result = await self._search_image(prompt)
+            if not result.get("success"):
+                raise ImageGenerationError(result.get("error", "Image search failed"))
+            return result
+        
+        tasks = {
+            asyncio.create_task(self._generate_ai_image(prompt, size)): "ai",
+            asyncio.create_task(search_after_delay()): "search"
+        }
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        winner = None
+        pending = set(tasks)
+        
+        try:
+            while pending and winner is None:
+                # With a search image in hand, wait for DALL-E only until its deadline
+                timeout = max(0.0, deadline - time.time()) if policy == "prefer_ai" and "search" in results else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    provider = tasks[task]
+                    try:
+                        results[provider] = task.result()
+                    except Exception as e:
+                        errors[provider] = str(e)
+                        print(f"⚠️ Hedged {provider} request failed for '{prompt}': {e}")
+                
+                if "ai" in results:
+                    winner = "ai"
+                elif "search" in results and (policy == "fastest" or time.time() >= deadline or "ai" in errors):
+                    winner = "search"
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        elapsed = time.time() - start_time
+        hedge_info = {"policy": policy, "winner": winner, "elapsed": elapsed, "errors": errors}
+        
+        if winner == "ai":
+            image_url = results["ai"]
+            print(f"🏁 Hedged image for '{prompt}': DALL-E won in {elapsed:.2f}s")
+            if presentation_id:
+                await self._save_image_to_db(
+                    presentation_id=presentation_id,
+                    image_url=image_url,
+                    prompt=prompt,
+                    model="dall-e-3",
+                    size=size
+                )
+            return {
+                "success": True,
+                "url": image_url,
+                "prompt": prompt,
+                "method": "ai_generation_hedged",
+                "model": "dall-e-3",
+                "size": size,
+                "hedge": hedge_info
+            }
+        
+        if winner == "search":
+            result = results["search"]
+            print(f"🏁 Hedged image for '{prompt}': Google search won in {elapsed:.2f}s")
+            if presentation_id:
+                await self._save_image_to_db(
+                    presentation_id=presentation_id,
+                    image_url=result["url"],
+                    prompt=prompt,
+                    model="google_search",
+                    size="unknown"
+                )
+            return {
+                "success": True,
+                "url": result["url"],
+                "prompt": prompt,
+                "method": "google_search_hedged",
+                "model": "google_search",
+                "hedge": hedge_info
+            }
+        
+        raise ImageGenerationError(f"Both AI generation and search failed: {errors}")
+    
+    async def batch_generate_images(
+        self,
+        prompts: List[str],
+        presentation_id: Optional[int] = None,
+        prefer_ai: bool = True,
+        size: str = "1024x1024",
+        hedge_policy: Optional[str] = None,
+        user_id: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate images for several prompts concurrently
+        
+        All prompts start at once; the per-provider semaphores bound how many hit each
+        provider, so a batch takes roughly as long as its slowest image.
+        
+        Yields:
+            One result per prompt, in completion order, with "index" set to the
+            prompt's position in the request
+        """
+        async def generate(index: int, prompt: str) -> Dict[str, Any]:
+            try:
+                result = await self.generate_image_with_fallback(
+                    prompt=prompt,
+                    presentation_id=presentation_id,
+                    prefer_ai=prefer_ai,
+                    size=size,
+                    hedge_policy=hedge_policy,
+                    user_id=user_id
+                )
+            except Exception as e:
+                result = {"success": False, "prompt": prompt, "error": str(e)}
+            return {"index": index, **result}
+        
+        tasks = [asyncio.create_task(generate(index, prompt)) for index, prompt in enumerate(prompts)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Consumer went away (e.g. client disconnected): stop the remaining requests
+            for task in tasks:
+                task.cancel()
+    
+    async def _cached_image(
+        self,
+        prompt: str,
+        size: str,
+        prefer_ai: bool,
+        presentation_id: Optional[int],
+        user_id: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Reuse a stored image for this prompt, checking the preferred provider's images first"""
+        candidates = [("dall-e-3", size), ("google_search", "unknown")]
+        if not prefer_ai:
+            candidates.reverse()
+        
+        for model, image_size in candidates:
+            cached = await image_cache_service.lookup(prompt, model, image_size, user_id=user_id)
+            if not cached:
+                continue
+            
+            if presentation_id:
+                await self._save_image_to_db(
+                    presentation_id=presentation_id,
+                    image_url=cached["url"],
+                    prompt=prompt,
+                    model=model,
+                    size=image_size,
+                    filename=cached.get("filename")
+                )
+            
+            return {
+                "success": True,
+                "url": cached["url"],
+                "prompt": prompt,
+                "method": "cache",
+                "model": model,
+                "size": image_size,
+                "cache_hit": True
+            }
+        
+        return None
+    
+    async def _generate_ai_image(self, prompt: str, size: str) -> str:
+        """DALL-E generation under the DALL-E concurrency cap"""
+        async with self.provider_semaphores["dall-e-3"]:
+            return await enhanced_image_service.generate_presentation_image(
+                prompt=prompt,
+                model="dalle3",
+                size=size
+            )
+    
+    async def _search_image(self, prompt: str) -> Dict[str, Any]:
+        """Google image search under the search concurrency cap"""
+        async with self.provider_semaphores["google_search"]:
+            return await google_image_service.get_presentation_image_fast(
+                prompt=prompt,
+                store_in_gcs=True
+            )
+    
     async def _save_image_to_db(
         self,
         presentation_id: int,
@@ -288,7 +523,19 @@ class ImprovedPresentationService:
         size: str,
         filename: str = None
     ):
-        """Save image metadata to database"""
+        """Save image metadata to database (off the event loop)"""
+        await asyncio.to_thread(self._insert_image_row, presentation_id, image_url, prompt, model, size, filename)
+    
+    def _insert_image_row(
+        self,
+        presentation_id: int,
+        image_url: str,
+        prompt: str,
+        model: str,
+        size: str,
+        filename: str = None
+    ):
+        """Blocking insert of one PresentationImage row"""
         db: Session = SessionLocal()
         try:
             presentation_image = PresentationImage(
@@ -298,6 +545,7 @@ class ImprovedPresentationService:
                 filename=filename,
                 model=model,
                 size=size,
+                prompt_hash=image_prompt_hash(prompt, model, size),
                 created_at=datetime.utcnow()
             )
             
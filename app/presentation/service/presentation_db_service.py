@@ -3,8 +3,10 @@ import json
 import asyncio
 from datetime import datetime
 from sqlalchemy.orm import Session
-from app.presentation.db_models import Presentation
+from app.presentation.db_models import Presentation, PresentationSlide, PresentationImage
 from app.core.database import SessionLocal
+from app.presentation.service.image_cache_service import image_prompt_hash
+from app.presentation.service.slide_parser import parse_presentation, parse_section, stitch_sections, validate_section_xml
 
 class PresentationDBService:
     """Database service for managing presentations and generated images"""
@@ -87,6 +89,8 @@ class PresentationDBService:
                 tone=tone
             )
             db.add(presentation)
+            db.flush()
+            self._replace_slides(db, presentation.id, content)
             db.commit()
             db.refresh(presentation)
             result = presentation  # Return the model instance, not a dict
@@ -105,6 +109,7 @@ class PresentationDBService:
             if not presentation:
                 return None
             
+            self._apply_slide_edits(db, presentation)
             return presentation  # Return the model instance, not a dict
         finally:
             db.close()
@@ -133,6 +138,9 @@ class PresentationDBService:
             for key, value in update_data.items():
                 setattr(presentation, key, value)
             
+            if content:
+                self._replace_slides(db, presentation.id, content)
+            
             db.commit()
             db.refresh(presentation)
             
@@ -140,6 +148,160 @@ class PresentationDBService:
         finally:
             db.close()
     
+    # Per-slide Management
+    async def get_slides(self, presentation_id: int) -> List[PresentationSlide]:
+        """Get all slides of a presentation in order, backfilling rows for older presentations"""
+        await self.ensure_connected()
+        
+        db: Session = SessionLocal()
+        try:
+            slides = db.query(PresentationSlide).filter(
+                PresentationSlide.presentation_id == presentation_id
+            ).order_by(PresentationSlide.position).all()
+            
+            if not slides:
+                # Presentations created before per-slide storage only have the XML document
+                presentation = db.query(Presentation).filter(Presentation.id == presentation_id).first()
+                if presentation and self._replace_slides(db, presentation.id, presentation.content):
+                    db.commit()
+                    slides = db.query(PresentationSlide).filter(
+                        PresentationSlide.presentation_id == presentation_id
+                    ).order_by(PresentationSlide.position).all()
+            
+            return slides
+        finally:
+            db.close()
+    
+    async def get_slide(self, presentation_id: int, position: int) -> Optional[PresentationSlide]:
+        """Get a single slide by its zero-based position"""
+        await self.ensure_connected()
+        
+        db: Session = SessionLocal()
+        try:
+            return db.query(PresentationSlide).filter(
+                PresentationSlide.presentation_id == presentation_id,
+                PresentationSlide.position == position
+            ).first()
+        finally:
+            db.close()
+    
+    async def update_slide(self, presentation_id: int, position: int, xml: str) -> Optional[PresentationSlide]:
+        """
+        Replace a single slide's XML without rewriting the presentation document
+        
+        Raises:
+            ValueError: If xml is not a single well-formed <SECTION>
+        """
+        await self.ensure_connected()
+        
+        section_xml = validate_section_xml(xml)
+        
+        db: Session = SessionLocal()
+        try:
+            slide = db.query(PresentationSlide).filter(
+                PresentationSlide.presentation_id == presentation_id,
+                PresentationSlide.position == position
+            ).first()
+            if not slide:
+                return None
+            
+            data = parse_section(section_xml)
+            slide.xml = section_xml
+            slide.data = data
+            slide.layout = data.get("layout")
+            
+            db.commit()
+            db.refresh(slide)
+            return slide
+        finally:
+            db.close()
+    
+    async def add_presentation_images(self, presentation_id: int, images: List[Dict[str, Any]]) -> int:
+        """
+        Attach resolved slide images to a presentation in one transaction
+        
+        Args:
+            presentation_id: Presentation the images belong to
+            images: Image results with url, query, filename, model and size; entries
+                without a url (failed or timed out) are skipped
+        
+        Returns:
+            Number of PresentationImage rows created
+        """
+        await self.ensure_connected()
+        
+        db: Session = SessionLocal()
+        try:
+            created = 0
+            for image in images:
+                if not image.get("url"):
+                    continue
+                db.add(PresentationImage(
+                    presentation_id=presentation_id,
+                    image_url=image["url"],
+                    prompt=image.get("query"),
+                    filename=image.get("filename"),
+                    model=image.get("model"),
+                    size=image.get("size"),
+                    prompt_hash=image_prompt_hash(image.get("query"), image.get("model"), image.get("size")),
+                    variants=image.get("variants")
+                ))
+                created += 1
+            
+            db.commit()
+            return created
+        finally:
+            db.close()
+    
+    def _replace_slides(self, db: Session, presentation_id: int, content: Any) -> int:
+        """Re-split the presentation XML into per-slide rows (caller commits)"""
+        # Always drop the old rows, or they would be stitched back over content without XML slides
+        db.query(PresentationSlide).filter(PresentationSlide.presentation_id == presentation_id).delete()
+        
+        if isinstance(content, str):
+            try:
+                content = json.loads(content)
+            except ValueError:
+                return 0
+        
+        slides_xml = content.get("slides") if isinstance(content, dict) else None
+        if not isinstance(slides_xml, str):
+            return 0
+        
+        slides = parse_presentation(slides_xml)
+        for slide in slides:
+            db.add(PresentationSlide(
+                presentation_id=presentation_id,
+                position=slide["position"],
+                layout=slide["layout"],
+                data=slide["data"],
+                xml=slide["xml"]
+            ))
+        
+        return len(slides)
+    
+    def _apply_slide_edits(self, db: Session, presentation: Presentation):
+        """Rebuild content["slides"] from per-slide rows so single-slide edits show up in full reads"""
+        slides_xml = [row.xml for row in db.query(PresentationSlide.xml).filter(
+            PresentationSlide.presentation_id == presentation.id
+        ).order_by(PresentationSlide.position).all()]
+        if not slides_xml:
+            return
+        
+        # Detach first so the rebuilt document is never written back
+        db.expunge(presentation)
+        presentation.content = self._stitch_content(presentation.content, slides_xml)
+    
+    @staticmethod
+    def _stitch_content(content: Any, slides_xml: List[str]) -> Dict[str, Any]:
+        """Presentation content (dict or JSON string) with its slides replaced by the per-slide rows"""
+        if isinstance(content, str):
+            try:
+                content = json.loads(content)
+            except ValueError:
+                content = {}
+        return {**(content or {}), "slides": stitch_sections(slides_xml)}
+    
     async def get_user_presentations(self, user_email: str) -> List[Presentation]:
         """Get all presentations for a user by email"""
         await self.ensure_connected()
@@ -155,13 +317,25 @@ class PresentationDBService:
         try:
             presentations = db.query(Presentation).filter(Presentation.user_id == user_id).all()
             
+            # Per-slide rows of all the user's presentations in one query, so slide edits show up here too
+            slides_xml: Dict[int, List[str]] = {}
+            if presentations:
+                for presentation_id, xml in db.query(PresentationSlide.presentation_id, PresentationSlide.xml).filter(
+                    PresentationSlide.presentation_id.in_([presentation.id for presentation in presentations])
+                ).order_by(PresentationSlide.presentation_id, PresentationSlide.position).all():
+                    slides_xml.setdefault(presentation_id, []).append(xml)
+            
             # Convert to dict format for API response
             result = []
             for presentation in presentations:
+                content = presentation.content
+                if presentation.id in slides_xml:
+                    content = self._stitch_content(content, slides_xml[presentation.id])
+                
                 presentation_dict = {
                     "id": str(presentation.id),
                     "title": presentation.title,
-                    "content": presentation.content,
+                    "content": content,
                     "theme": presentation.theme,
                     "language": presentation.language,
                     "tone": presentation.tone,
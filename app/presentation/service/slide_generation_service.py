@@ -0,0 +1,446 @@
+"""
+Slide Generation Service - Generates presentation slides one outline item at a time, concurrently
+"""
+import os
+import json
+import time
+import zlib
+import base64
+import asyncio
+import xml.etree.ElementTree as ET
+from typing import List, Dict, Any, Optional, Callable
+from langchain_openai import ChatOpenAI
+from langchain.prompts import PromptTemplate
+from langchain.schema.output_parser import StrOutputParser
+from app.presentation.service.slide_parser import SECTION_PATTERN, escape_bare_ampersands, stitch_sections
+
+# Layout components and a minimal example of each, rotated across slides for variety
+LAYOUT_COMPONENTS = {
+    "BULLETS": """<BULLETS>
+  <DIV><H3>Main Point</H3><P>Context-based description</P></DIV>
+  <DIV><P>Supporting point with context details</P></DIV>
+</BULLETS>""",
+    "COLUMNS": """<COLUMNS>
+  <DIV><H3>First Concept</H3><P>Description from context</P></DIV>
+  <DIV><H3>Second Concept</H3><P>Description from context</P></DIV>
+</COLUMNS>""",
+    "ICONS": """<ICONS>
+  <DIV><ICON query="relevant-icon" /><H3>Concept</H3><P>Context-based description</P></DIV>
+</ICONS>""",
+    "CYCLE": """<CYCLE>
+  <DIV><H3>Step 1</H3><P>Process description from context</P></DIV>
+  <DIV><H3>Step 2</H3><P>Next step description</P></DIV>
+</CYCLE>""",
+    "ARROWS": """<ARROWS>
+  <DIV><H3>Challenge</H3><P>Problem from context</P></DIV>
+  <DIV><H3>Solution</H3><P>Solution from context</P></DIV>
+</ARROWS>""",
+    "TIMELINE": """<TIMELINE>
+  <DIV><H3>Phase 1</H3><P>Timeline item from context</P></DIV>
+  <DIV><H3>Phase 2</H3><P>Next phase description</P></DIV>
+</TIMELINE>""",
+    "PYRAMID": """<PYRAMID>
+  <DIV><H3>Vision</H3><P>Top-level goal from context</P></DIV>
+  <DIV><H3>Strategy</H3><P>Strategic approach</P></DIV>
+</PYRAMID>""",
+    "CHART": """<CHART charttype="vertical-bar">
+  <TABLE>
+    <TR><TD type="label"><VALUE>Metric 1</VALUE></TD><TD type="data"><VALUE>75</VALUE></TD></TR>
+    <TR><TD type="label"><VALUE>Metric 2</VALUE></TD><TD type="data"><VALUE>90</VALUE></TD></TR>
+  </TABLE>
+</CHART>"""
+}
+
+SECTION_LAYOUTS = ["left", "right", "vertical"]
+
+SLIDE_TEMPLATE = """You are an expert presentation designer. Create ONE slide of a presentation in XML format.
+
+## PRESENTATION DETAILS
+- Title: {title}
+- Language: {language}
+- Tone: {tone}
+- Theme: {color_theme}
+
+## CONTEXT INFORMATION
+{enhanced_context}
+
+## FULL OUTLINE (for flow only)
+{outline_formatted}
+
+## THIS SLIDE
+- Slide {slide_number} of {slides_count}: {topic}
+- SECTION layout attribute: {section_layout}
+- Layout component: {component}
+
+Use this component structure:
+```xml
+{component_example}
+```
+
+Include a detailed image query (10+ words) where it helps the slide:
+```xml
+<IMG query="detailed specific image description related to the context and slide topic" src="https://storage.googleapis.com/deck123/presentation_images/detailed_specific_image_description_related_to_the_context_and_slide_topic.png" />
+```
+The src file name is the query with spaces replaced by underscores.
+
+## RULES
+1. Output exactly one <SECTION layout="{section_layout}"> element and nothing else
+2. Use the {component} component inside the section
+3. Start the section with an <H1> or <H2> heading for the slide topic
+4. Expand the topic using information from the provided context
+5. Do not repeat content that belongs to other outline topics
+6. Follow these additional instructions: {instructions}
+
+Create the slide XML now:"""
+
+
+def compress_context(enhanced_context: Optional[str]) -> Optional[str]:
+    """Compress the enhanced context for storage alongside a presentation (zlib + base64)"""
+    if not enhanced_context:
+        return None
+    return base64.b64encode(zlib.compress(enhanced_context.encode("utf-8"), 9)).decode("ascii")
+
+
+def decompress_context(compressed_context: Optional[str]) -> Optional[str]:
+    """Inverse of compress_context; returns None for missing or corrupt data"""
+    if not compressed_context:
+        return None
+    try:
+        return zlib.decompress(base64.b64decode(compressed_context)).decode("utf-8")
+    except (ValueError, zlib.error):
+        return None
+
+
+class SlideGenerationError(Exception):
+    """Raised when a slide cannot be generated as a valid <SECTION>"""
+    pass
+
+
+class SlideGenerationService:
+    """Generates one <SECTION> per outline item concurrently and stitches them into a presentation"""
+
+    def __init__(self):
+        self.model = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.7)
+        self.chain = PromptTemplate.from_template(SLIDE_TEMPLATE) | self.model | StrOutputParser()
+        self.concurrency = int(os.getenv("PRESENTATION_SLIDE_CONCURRENCY", "8"))
+        self.max_retries = int(os.getenv("PRESENTATION_SLIDE_MAX_RETRIES", "2"))
+        self.slide_timeout = float(os.getenv("PRESENTATION_SLIDE_TIMEOUT", "60"))
+        print("✅ Slide Generation Service initialized")
+
+    def assign_layouts(self, slides_count: int) -> List[Dict[str, str]]:
+        """
+        Assign a layout component and SECTION layout to every slide
+
+        Components rotate through LAYOUT_COMPONENTS and section layouts through
+        SECTION_LAYOUTS, so neighbouring slides never share a layout.
+
+        Args:
+            slides_count: Number of slides in the presentation
+
+        Returns:
+            List of {"component", "section_layout"} dictionaries, one per slide
+        """
+        components = list(LAYOUT_COMPONENTS)
+        return [
+            {
+                "component": components[i % len(components)],
+                "section_layout": SECTION_LAYOUTS[i % len(SECTION_LAYOUTS)]
+            }
+            for i in range(slides_count)
+        ]
+
+    async def generate_presentation(
+        self,
+        title: str,
+        outline: List[str],
+        enhanced_context: str,
+        language: str,
+        tone: str,
+        color_theme: str,
+        on_slide: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate every slide concurrently and stitch the sections in outline order
+
+        Args:
+            title: Presentation title
+            outline: Slide topics, one per slide
+            enhanced_context: Shared context included in every slide prompt
+            language: Presentation language
+            tone: Presentation tone
+            color_theme: Presentation color theme
+            on_slide: Optional callback invoked with each slide result as soon as it completes
+
+        Returns:
+            Dictionary with presentation_xml, per-slide results and failed slide indices
+        """
+        start_time = time.time()
+        layouts = self.assign_layouts(len(outline))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def generate_with_cap(index: int) -> Dict[str, Any]:
+            async with semaphore:
+                slide = await self.generate_slide(
+                    index=index,
+                    title=title,
+                    outline=outline,
+                    enhanced_context=enhanced_context,
+                    language=language,
+                    tone=tone,
+                    color_theme=color_theme,
+                    layout=layouts[index]
+                )
+            if on_slide:
+                on_slide(slide)
+            return slide
+
+        print(f"🧩 Generating {len(outline)} slides in parallel (concurrency {self.concurrency})...")
+        slides = await asyncio.gather(*(generate_with_cap(i) for i in range(len(outline))))
+
+        failed_slides = [slide["index"] for slide in slides if not slide["success"]]
+        presentation_xml = self.stitch_sections([slide["section_xml"] for slide in slides])
+
+        print(
+            f"✅ Generated {len(slides) - len(failed_slides)}/{len(slides)} slides in "
+            f"{time.time() - start_time:.2f}s ({len(presentation_xml)} characters)"
+        )
+
+        return {
+            "presentation_xml": presentation_xml,
+            "slides": slides,
+            "failed_slides": failed_slides
+        }
+
+    async def generate_slide(
+        self,
+        index: int,
+        title: str,
+        outline: List[str],
+        enhanced_context: str,
+        language: str,
+        tone: str,
+        color_theme: str,
+        layout: Optional[Dict[str, str]] = None,
+        instructions: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a single slide, retrying until it yields a valid <SECTION>
+
+        A slide that still fails after all retries gets a placeholder section, so one bad
+        slide never breaks the rest of the deck.
+
+        Args:
+            index: Zero-based slide index in the outline
+            title: Presentation title
+            outline: Full outline, used for flow
+            enhanced_context: Shared presentation context
+            language: Presentation language
+            tone: Presentation tone
+            color_theme: Presentation color theme
+            layout: Assigned layout (defaults to the rotation from assign_layouts)
+            instructions: Optional extra guidance for this slide (e.g. a user's edit request)
+
+        Returns:
+            Dictionary with index, topic, section_xml, success, attempts and error
+        """
+        layout = layout or self.assign_layouts(index + 1)[index]
+        topic = outline[index]
+        last_error = None
+
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                raw_output = await asyncio.wait_for(
+                    self.chain.ainvoke({
+                        "title": title,
+                        "language": language,
+                        "tone": tone,
+                        "color_theme": color_theme,
+                        "enhanced_context": enhanced_context,
+                        "outline_formatted": "\n".join(f"{i+1}. {item}" for i, item in enumerate(outline)),
+                        "slide_number": index + 1,
+                        "slides_count": len(outline),
+                        "topic": topic,
+                        "section_layout": layout["section_layout"],
+                        "component": layout["component"],
+                        "component_example": LAYOUT_COMPONENTS[layout["component"]],
+                        "instructions": instructions or "None"
+                    }),
+                    timeout=self.slide_timeout
+                )
+
+                return {
+                    "index": index,
+                    "topic": topic,
+                    "layout": layout,
+                    "section_xml": self.validate_section(raw_output),
+                    "success": True,
+                    "attempts": attempt,
+                    "error": None
+                }
+
+            except asyncio.TimeoutError:
+                last_error = f"Timed out after {self.slide_timeout}s"
+            except Exception as e:
+                last_error = str(e)
+
+            print(f"⚠️ Slide {index + 1} attempt {attempt} failed: {last_error}")
+
+        print(f"❌ Slide {index + 1} failed after {self.max_retries + 1} attempts, using placeholder")
+        return {
+            "index": index,
+            "topic": topic,
+            "layout": layout,
+            "section_xml": self._placeholder_section(topic, layout),
+            "success": False,
+            "attempts": self.max_retries + 1,
+            "error": last_error
+        }
+
+    async def regenerate_slides(
+        self,
+        presentation_id: int,
+        start: int,
+        end: Optional[int] = None,
+        instructions: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Regenerate one slide, or a contiguous range, of a stored presentation
+
+        Reuses the outline and compressed enhanced context saved in the presentation's
+        generation_metadata, keeps each slide's current layout, and patches only the
+        regenerated slide rows. Slides that still fail after retries are left untouched.
+
+        Args:
+            presentation_id: Stored presentation ID
+            start: Zero-based position of the first slide to regenerate
+            end: Zero-based position of the last slide (inclusive, defaults to start)
+            instructions: Optional extra guidance applied to every regenerated slide
+
+        Returns:
+            Dictionary with the updated slide rows and failed positions
+
+        Raises:
+            SlideGenerationError: If the presentation or requested slides do not exist
+        """
+        from app.presentation.service.presentation_db_service import presentation_db_service
+
+        end = start if end is None else end
+        if start < 0 or end < start:
+            raise SlideGenerationError("Invalid slide range")
+
+        presentation = await presentation_db_service.get_presentation(presentation_id)
+        if not presentation:
+            raise SlideGenerationError("Presentation not found")
+
+        slides = await presentation_db_service.get_slides(presentation_id)
+        if end >= len(slides):
+            raise SlideGenerationError(f"Presentation has {len(slides)} slides; range {start}-{end} is out of bounds")
+
+        # Content is a JSON string when get_slides has only just backfilled the slide rows
+        content = presentation.content
+        if isinstance(content, str):
+            try:
+                content = json.loads(content)
+            except ValueError:
+                content = {}
+        metadata = (content or {}).get("generation_metadata") or {}
+        outline = metadata.get("outline") or []
+        if len(outline) != len(slides):
+            # Older or hand-edited decks: fall back to the slide titles as the outline
+            outline = [slide.data.get("title") or f"Slide {slide.position + 1}" for slide in slides]
+
+        enhanced_context = decompress_context(metadata.get("enhanced_context")) or f"Main Topic: {presentation.title}"
+
+        start_time = time.time()
+        print(f"🔁 Regenerating slides {start + 1}-{end + 1} of presentation {presentation_id}...")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def regenerate_with_cap(position: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.generate_slide(
+                    index=position,
+                    title=presentation.title,
+                    outline=outline,
+                    enhanced_context=enhanced_context,
+                    language=presentation.language,
+                    tone=presentation.tone,
+                    color_theme=presentation.theme,
+                    layout=self._current_layout(slides[position]),
+                    instructions=instructions
+                )
+
+        results = await asyncio.gather(*(regenerate_with_cap(position) for position in range(start, end + 1)))
+
+        updated_slides = []
+        failed_slides = []
+        for result in results:
+            if not result["success"]:
+                failed_slides.append(result["index"])
+                continue
+            updated_slides.append(
+                await presentation_db_service.update_slide(presentation_id, result["index"], result["section_xml"])
+            )
+
+        print(
+            f"✅ Regenerated {len(updated_slides)}/{len(results)} slides in {time.time() - start_time:.2f}s"
+        )
+        return {"slides": updated_slides, "failed_slides": failed_slides}
+
+    def _current_layout(self, slide) -> Dict[str, str]:
+        """Keep a stored slide's layout so regeneration doesn't disturb the deck's variety"""
+        layout = self.assign_layouts(slide.position + 1)[slide.position]
+
+        if slide.layout in SECTION_LAYOUTS:
+            layout["section_layout"] = slide.layout
+
+        for component in slide.data.get("components", []):
+            if component.get("type") in LAYOUT_COMPONENTS:
+                layout["component"] = component["type"]
+                break
+
+        return layout
+
+    def validate_section(self, raw_output: str) -> str:
+        """
+        Extract a single well-formed <SECTION> from model output
+
+        Args:
+            raw_output: Raw model response (may include code fences or chatter)
+
+        Returns:
+            The <SECTION>...</SECTION> XML string
+
+        Raises:
+            SlideGenerationError: If no well-formed section is found
+        """
+        match = SECTION_PATTERN.search(raw_output or "")
+        if not match:
+            raise SlideGenerationError("No <SECTION> element in model output")
+
+        section_xml = escape_bare_ampersands(match.group(0).strip())
+
+        try:
+            ET.fromstring(section_xml)
+        except ET.ParseError as e:
+            raise SlideGenerationError(f"Malformed <SECTION> XML: {e}")
+
+        return section_xml
+
+    def stitch_sections(self, sections: List[str]) -> str:
+        """Combine slide sections, in order, into a <PRESENTATION> document"""
+        return stitch_sections(sections)
+
+    def _placeholder_section(self, topic: str, layout: Dict[str, str]) -> str:
+        """Minimal valid slide used when generation keeps failing"""
+        safe_topic = topic.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        return (
+            f'<SECTION layout="{layout["section_layout"]}">'
+            f"<H1>{safe_topic}</H1>"
+            f"<BULLETS><DIV><P>{safe_topic}</P></DIV></BULLETS>"
+            f"</SECTION>"
+        )
+
+
+# Global slide generation service instance
+slide_generation_service = SlideGenerationService()
@@ -0,0 +1,184 @@
+"""
+Slide Parser - Turns presentation XML into compact structured slides, incrementally as it streams
+"""
+import re
+import xml.etree.ElementTree as ET
+from typing import List, Dict, Any, Optional
+
+SECTION_PATTERN = re.compile(r"<SECTION\b[^>]*>.*?</SECTION>", re.DOTALL | re.IGNORECASE)
+
+# Bare ampersands are common in model output but are not valid XML
+_BARE_AMPERSAND = re.compile(r"&(?!(?:[a-zA-Z]+|#\d+|#x[0-9a-fA-F]+);)")
+
+# Layout components whose children are <DIV> items
+ITEM_COMPONENTS = {"COLUMNS", "BULLETS", "ICONS", "CYCLE", "ARROWS", "TIMELINE", "PYRAMID"}
+
+HEADING_TAGS = ("H1", "H2", "H3", "H4")
+
+
+def escape_bare_ampersands(xml: str) -> str:
+    """Escape '&' characters that do not start an XML entity"""
+    return _BARE_AMPERSAND.sub("&amp;", xml)
+
+
+def parse_section(section_xml: str) -> Dict[str, Any]:
+    """
+    Parse one <SECTION> into a compact structured slide
+
+    Args:
+        section_xml: A single <SECTION>...</SECTION> element
+
+    Returns:
+        Dictionary with layout, title, components (type plus items or chart rows) and
+        images. Unparseable XML yields {"layout": None, "parse_error": ...}.
+    """
+    try:
+        section = ET.fromstring(escape_bare_ampersands(section_xml.strip()))
+    except ET.ParseError as e:
+        return {"layout": None, "title": None, "components": [], "images": [], "parse_error": str(e)}
+
+    slide = {
+        "layout": section.get("layout"),
+        "title": None,
+        "components": [],
+        "images": []
+    }
+
+    for element in section:
+        tag = element.tag.upper()
+
+        if tag in HEADING_TAGS and slide["title"] is None:
+            slide["title"] = _text(element)
+        elif tag == "IMG":
+            slide["images"].append({"query": element.get("query"), "src": element.get("src")})
+        elif tag == "CHART":
+            slide["components"].append(_parse_chart(element))
+        elif tag in ITEM_COMPONENTS:
+            slide["components"].append({
+                "type": tag,
+                "items": [_parse_item(item) for item in element if item.tag.upper() == "DIV"]
+            })
+        else:
+            slide["components"].append({"type": tag, "text": _text(element)})
+
+    # Images nested inside components still belong to the slide
+    for image in section.iter("IMG"):
+        entry = {"query": image.get("query"), "src": image.get("src")}
+        if entry not in slide["images"]:
+            slide["images"].append(entry)
+
+    return slide
+
+
+def parse_presentation(presentation_xml: str) -> List[Dict[str, Any]]:
+    """
+    Split a complete presentation into slides
+
+    Returns:
+        List of {"position", "xml", "layout", "data"} dictionaries in document order
+    """
+    parser = SlideStreamParser()
+    return parser.feed(presentation_xml or "")
+
+
+def stitch_sections(sections: List[str]) -> str:
+    """Combine slide sections, in order, into a <PRESENTATION> document"""
+    return "<PRESENTATION>\n" + "\n".join(sections) + "\n</PRESENTATION>"
+
+
+def validate_section_xml(section_xml: str) -> str:
+    """
+    Check that a string is exactly one well-formed <SECTION>
+
+    Returns:
+        The stripped section XML with bare ampersands escaped
+
+    Raises:
+        ValueError: If the string is not a single parseable <SECTION>
+    """
+    section_xml = escape_bare_ampersands((section_xml or "").strip())
+    if not SECTION_PATTERN.fullmatch(section_xml):
+        raise ValueError("Slide XML must be a single <SECTION>...</SECTION> element")
+
+    try:
+        ET.fromstring(section_xml)
+    except ET.ParseError as e:
+        raise ValueError(f"Malformed <SECTION> XML: {e}")
+
+    return section_xml
+
+
+class SlideStreamParser:
+    """
+    Incremental parser fed with model output chunks.
+
+    Each call to feed() returns the slides whose closing </SECTION> arrived in that
+    chunk, so callers can store or stream slides while later ones are still generating.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.scan_position = 0
+        self.slides_parsed = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Add a chunk of XML and return any newly completed slides
+
+        Args:
+            chunk: Next piece of streamed presentation XML
+
+        Returns:
+            List of {"position", "xml", "layout", "data"} dictionaries
+        """
+        self.buffer += chunk
+        completed = []
+
+        for match in SECTION_PATTERN.finditer(self.buffer, self.scan_position):
+            section_xml = match.group(0)
+            data = parse_section(section_xml)
+            completed.append({
+                "position": self.slides_parsed,
+                "xml": section_xml,
+                "layout": data.get("layout"),
+                "data": data
+            })
+            self.slides_parsed += 1
+            self.scan_position = match.end()
+
+        return completed
+
+
+def _text(element: ET.Element) -> str:
+    """All text inside an element, whitespace-collapsed"""
+    return re.sub(r"\s+", " ", "".join(element.itertext())).strip()
+
+
+def _parse_item(item: ET.Element) -> Dict[str, Any]:
+    """Compact form of a component <DIV>: heading, paragraph text and optional icon"""
+    parsed = {}
+
+    for child in item:
+        tag = child.tag.upper()
+        if tag in HEADING_TAGS and "title" not in parsed:
+            parsed["title"] = _text(child)
+        elif tag == "P":
+            parsed["text"] = f"{parsed['text']} {_text(child)}" if "text" in parsed else _text(child)
+        elif tag == "ICON":
+            parsed["icon"] = child.get("query")
+
+    return parsed
+
+
+def _parse_chart(chart: ET.Element) -> Dict[str, Any]:
+    """Compact form of a <CHART>: chart type and label/value rows"""
+    rows = []
+
+    for row in chart.iter("TR"):
+        parsed_row: Dict[str, Optional[str]] = {}
+        for cell in row.iter("TD"):
+            key = "label" if cell.get("type") == "label" else "value"
+            parsed_row[key] = _text(cell)
+        rows.append(parsed_row)
+
+    return {"type": "CHART", "chart_type": chart.get("charttype"), "rows": rows}
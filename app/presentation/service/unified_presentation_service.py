@@ -1,20 +1,28 @@
 """
 Unified Presentation Service - Combines outline, slides generation with RAG integration
 """
+import os
 import time
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.schema.output_parser import StrOutputParser
 import re
 
 # Import RAG services
+from app.core.database import SessionLocal
+from Rag.db_models import RAGDocument
 from Rag.services.rag_service import rag_service
+from Rag.services.embedding_service import embedding_service
 from Rag.services.web_scraper_service import web_scraper_service
 
 # Import presentation services
 from app.presentation.service.enhanced_image_service import enhanced_image_service
+from app.presentation.service.slide_generation_service import slide_generation_service
+from app.presentation.service.slide_parser import SlideStreamParser, parse_section, parse_presentation
+from app.presentation.service.generation_cache import generation_cache, content_hash
+from app.presentation.service.image_prefetch_service import SlideImagePrefetcher
 
 class UnifiedPresentationService:
     """Service that combines presentation generation with RAG context integration"""
@@ -22,6 +30,16 @@ class UnifiedPresentationService:
     def __init__(self):
         self.model = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.7, streaming=True)
         self.image_service = enhanced_image_service
+        self.context_concurrency = int(os.getenv("PRESENTATION_CONTEXT_CONCURRENCY", "4"))
+        self.context_source_timeout = float(os.getenv("PRESENTATION_CONTEXT_SOURCE_TIMEOUT", "90"))
+        # Context documents up to this many tokens are inlined instead of going through RAG
+        self.inline_context_max_tokens = int(os.getenv("PRESENTATION_INLINE_CONTEXT_MAX_TOKENS", "2000"))
+        # Opt-in: also add inlined documents to the user's RAG library (embed + upsert in the background)
+        self.index_inlined_context = os.getenv("PRESENTATION_INDEX_INLINED_CONTEXT", "false").lower() == "true"
+        self._index_semaphore = asyncio.Semaphore(int(os.getenv("PRESENTATION_INDEX_CONCURRENCY", "2")))
+        self._indexing = set()
+        self._background_tasks = set()
+        self.image_provider = os.getenv("PRESENTATION_IMAGE_PROVIDER", "google")
         print("✅ Unified Presentation Service initialized")
     
     async def generate_presentation_with_context(
@@ -43,21 +61,79 @@ class UnifiedPresentationService:
         vision: str = None,
         language: str = "English",
         tone: str = "Professional",
-        generate_images: bool = True
+        generate_images: bool = True,
+        generation_mode: str = "single",
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        regenerate: bool = False,
+        image_provider: str = None
     ) -> Dict[str, Any]:
         """
         Generate complete presentation with RAG context integration
+        
+        generation_mode "single" writes the whole deck in one model call; "parallel"
+        generates one slide per outline item concurrently and stitches the sections.
+        
+        on_event, if given, is called with progress events as they happen:
+        ("source_processed", source), ("outline", {"outline"}) and
+        ("section", {"index", "xml", "slide"}) for every completed <SECTION>, where
+        slide is the structured form from slide_parser.parse_section.
+        
+        With generate_images, each slide's <IMG> queries are resolved (image_provider
+        "google" or "dalle") as soon as its section closes, concurrently with the
+        remaining slides; every resolved image is emitted as ("image", result).
+        
+        Successful results are cached by a canonical hash of the inputs (context files
+        by content hash); regenerate=True skips the lookup and refreshes the entry.
         """
         start_time = time.time()
+        image_provider = image_provider or self.image_provider
+        prefetcher = None
         
         try:
+            cache_key = generation_cache.make_key(
+                "unified",
+                user_id=user_id,
+                slides_count=slides_count,
+                prompt=prompt,
+                color_theme=color_theme,
+                website_urls=website_urls or [],
+                context_documents=[
+                    {"filename": doc.get("filename"), "content_hash": content_hash(doc.get("content", ""))}
+                    for doc in context_documents or []
+                ],
+                industry_sector=industry_sector,
+                one_line_pitch=one_line_pitch,
+                problem_solving=problem_solving,
+                unique_solution=unique_solution,
+                target_audience=target_audience,
+                business_model=business_model,
+                revenue_plan=revenue_plan,
+                competitors=competitors,
+                vision=vision,
+                language=language,
+                tone=tone,
+                generation_mode=generation_mode,
+                image_provider=image_provider if generate_images else None
+            )
+            
+            if not regenerate:
+                cached_result = generation_cache.get(cache_key)
+                if cached_result:
+                    print(f"⚡ Returning cached presentation for: {prompt}")
+                    if on_event:
+                        self._replay_events(cached_result, on_event)
+                    cached_result["cache_hit"] = True
+                    cached_result["processing_time"] = time.time() - start_time
+                    return cached_result
+            
             print(f"🎯 Generating unified presentation: {prompt}")
             
             # Step 1: Gather context from RAG sources
             context_data = await self._gather_rag_context(
                 user_id=user_id,
                 website_urls=website_urls or [],
-                context_documents=context_documents or []
+                context_documents=context_documents or [],
+                on_event=on_event
             )
             
             # Step 2: Build comprehensive context
@@ -76,44 +152,110 @@ class UnifiedPresentationService:
             )
             
             # Step 3: Generate presentation outline with context
-            outline = await self._generate_contextual_outline(
-                enhanced_context=enhanced_context,
-                slides_count=slides_count,
-                language=language
-            )
+            # A model failure falls back to a placeholder outline or an error deck; both are
+            # returned to the caller but never cached
+            used_fallback = False
+            try:
+                outline = await self._generate_contextual_outline(
+                    enhanced_context=enhanced_context,
+                    slides_count=slides_count,
+                    language=language
+                )
+            except Exception as e:
+                print(f"❌ Error generating outline: {e}")
+                outline = [f"Slide {i+1} Topic" for i in range(slides_count)]
+                used_fallback = True
             
-            # Step 4: Generate detailed slides
-            presentation_xml = await self._generate_contextual_slides(
-                title=prompt,
-                outline=outline,
-                enhanced_context=enhanced_context,
-                language=language,
-                tone=tone,
-                slides_count=slides_count,
-                color_theme=color_theme
-            )
+            if on_event:
+                on_event("outline", {"outline": outline})
+            
+            # Step 4: Generate detailed slides, prefetching images as each section completes
+            if generate_images:
+                prefetcher = SlideImagePrefetcher(
+                    provider=image_provider,
+                    on_image=(lambda image: on_event("image", image)) if on_event else None,
+                    user_id=user_id
+                )
+            
+            def handle_section(index: int, xml: str):
+                if prefetcher:
+                    prefetcher.submit(index, xml)
+                if on_event:
+                    self._emit_section(on_event, index, xml)
+            
+            failed_slides = []
+            if generation_mode == "parallel":
+                slides_result = await slide_generation_service.generate_presentation(
+                    title=prompt,
+                    outline=outline,
+                    enhanced_context=enhanced_context,
+                    language=language,
+                    tone=tone,
+                    color_theme=color_theme,
+                    on_slide=lambda slide: handle_section(slide["index"], slide["section_xml"])
+                )
+                presentation_xml = slides_result["presentation_xml"]
+                failed_slides = slides_result["failed_slides"]
+            else:
+                try:
+                    presentation_xml = await self._generate_contextual_slides(
+                        title=prompt,
+                        outline=outline,
+                        enhanced_context=enhanced_context,
+                        language=language,
+                        tone=tone,
+                        slides_count=slides_count,
+                        color_theme=color_theme,
+                        on_section=handle_section
+                    )
+                except Exception as e:
+                    print(f"❌ Error generating slides: {e}")
+                    presentation_xml = f"<PRESENTATION><SECTION><H1>Error generating presentation: {str(e)}</H1></SECTION></PRESENTATION>"
+                    used_fallback = True
             
-            # Step 5: Skip image generation (always return empty array)
+            # Step 5: Collect prefetched images; most are already done by the time the text is
             generated_images = []
-            print("🖼️ Image generation skipped (disabled for performance)")
+            if prefetcher:
+                generated_images = await prefetcher.wait()
+                presentation_xml = prefetcher.apply_to_xml(presentation_xml, generated_images)
+                resolved = sum(1 for image in generated_images if image.get("url"))
+                print(f"🖼️ Prefetched {resolved}/{len(generated_images)} slide images via {image_provider}")
             
             processing_time = time.time() - start_time
             
             print(f"✅ Unified presentation generated in {processing_time:.2f}s")
             
-            return {
+            result = {
                 "success": True,
                 "presentation_xml": presentation_xml,
                 "slides_count": slides_count,
                 "processing_time": processing_time,
                 "generated_images": generated_images,
                 "context_sources_used": context_data["sources_used"],
+                "outline": outline,
+                "enhanced_context": enhanced_context,
+                "generation_mode": generation_mode,
+                "failed_slides": failed_slides,
+                "cache_hit": False,
                 "prompt": prompt,
                 "theme": color_theme,
                 "language": language,
                 "tone": tone
             }
             
+            # Decks with a fallback outline or deck, placeholder slides, missing images or context
+            # sources that failed or timed out are not cached, so the next click retries them
+            context_failed = any("error" in source for source in context_data["sources_used"])
+            if (
+                not used_fallback
+                and not failed_slides
+                and not context_failed
+                and all(image.get("url") for image in generated_images)
+            ):
+                generation_cache.set(cache_key, result)
+            
+            return result
+            
         except Exception as e:
             processing_time = time.time() - start_time
             print(f"❌ Error generating unified presentation: {e}")
@@ -131,122 +273,300 @@ class UnifiedPresentationService:
                 "language": language,
                 "tone": tone
             }
+        
+        finally:
+            # Stop outstanding image requests if generation failed or was cancelled
+            if prefetcher:
+                prefetcher.cancel()
+    
+    async def stream_presentation_with_context(self, **generation_kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a presentation and yield progress events while it is being generated
+        
+        Accepts the same arguments as generate_presentation_with_context. Yields
+        {"event": name, "data": payload} dictionaries for every progress event, then a
+        final "generated" event whose data is the full generation result.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        generation = asyncio.create_task(self.generate_presentation_with_context(
+            **generation_kwargs,
+            on_event=lambda event, data: events.put_nowait({"event": event, "data": data})
+        ))
+        
+        try:
+            while not generation.done() or not events.empty():
+                next_event = asyncio.create_task(events.get())
+                await asyncio.wait({next_event, generation}, return_when=asyncio.FIRST_COMPLETED)
+                
+                if next_event.done():
+                    yield next_event.result()
+                else:
+                    next_event.cancel()
+            
+            yield {"event": "generated", "data": generation.result()}
+        finally:
+            # Client disconnected mid-stream: stop generating
+            if not generation.done():
+                generation.cancel()
+    
+    def _replay_events(self, result: Dict[str, Any], on_event: Callable[[str, Dict[str, Any]], None]):
+        """Emit the progress events of a cached result so streaming clients see the usual sequence"""
+        for source in result.get("context_sources_used", []):
+            on_event("source_processed", source)
+        on_event("outline", {"outline": result.get("outline", [])})
+        for slide in parse_presentation(result.get("presentation_xml") or ""):
+            on_event("section", {"index": slide["position"], "xml": slide["xml"], "slide": slide["data"]})
+        for image in result.get("generated_images", []):
+            on_event("image", image)
+    
+    def _emit_section(self, on_event: Callable[[str, Dict[str, Any]], None], index: int, xml: str):
+        """Emit a completed <SECTION> together with its structured form"""
+        on_event("section", {"index": index, "xml": xml, "slide": parse_section(xml)})
     
     async def _gather_rag_context(
         self,
         user_id: int,
         website_urls: List[str],
-        context_documents: List[Dict[str, Any]]
+        context_documents: List[Dict[str, Any]],
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
-        """Gather context from RAG sources (websites and uploaded documents)"""
+        """
+        Gather context from RAG sources (websites and uploaded documents)
+        
+        All sources are ingested and summarized concurrently, capped by a semaphore and
+        bounded by a per-source timeout. A failed or timed-out source is reported in
+        sources_used with its error, and the remaining sources are still used. Small
+        context documents are inlined verbatim (see inline_context_max_tokens).
+        """
         context_data = {
             "website_content": "",
             "context_content": "",
             "sources_used": []
         }
         
-        try:
-            # Process website URLs
-            if website_urls:
-                print(f"🌐 Processing {len(website_urls)} website URLs...")
-                
-                for url in website_urls:
-                    try:
-                        # Process website with RAG service
-                        document = await rag_service.process_website(
-                            user_id=user_id,
-                            url=url,
-                            title=f"Context from {url}",
-                            max_pages=1
-                        )
-                        
-                        # Query the processed website for relevant content
-                        query_result = await rag_service.query_documents(
-                            user_id=user_id,
-                            query="Summarize the main content and key information from this website",
-                            max_results=3
-                        )
-                        
-                        if query_result["sources"]:
-                            website_summary = query_result["answer"]
-                            context_data["website_content"] += f"\n\n--- Content from {url} ---\n{website_summary}"
-                            
-                            context_data["sources_used"].append({
-                                "type": "website",
-                                "url": url,
-                                "title": document.title,
-                                "chunks_count": document.chunks_count,
-                                "summary": website_summary[:200] + "..."
-                            })
-                        
-                    except Exception as e:
-                        print(f"⚠️ Error processing website {url}: {e}")
-                        context_data["sources_used"].append({
-                            "type": "website",
-                            "url": url,
-                            "error": str(e)
-                        })
-            
-            # Process uploaded context documents
-            if context_documents:
-                print(f"📄 Processing {len(context_documents)} uploaded context documents...")
-                
-                for i, doc_data in enumerate(context_documents):
-                    try:
-                        filename = doc_data.get("filename", f"context_document_{i+1}")
-                        content = doc_data.get("content", "")
-                        metadata = doc_data.get("metadata", {})
-                        
-                        if not content.strip():
-                            print(f"⚠️ Empty content in document: {filename}")
-                            continue
-                        
-                        # Process document with RAG service
-                        document = await rag_service.process_document(
-                            user_id=user_id,
-                            file_content=content,
-                            filename=filename,
-                            file_type=metadata.get("file_type", "txt"),
-                            title=f"Context: {filename}",
-                            metadata=metadata
-                        )
-                        
-                        # Query the processed document for relevant content
-                        query_result = await rag_service.query_documents(
-                            user_id=user_id,
-                            query="Summarize the key points and important information from this document",
-                            max_results=3
-                        )
-                        
-                        if query_result["sources"]:
-                            context_summary = query_result["answer"]
-                            context_data["context_content"] += f"\n\n--- Document: {filename} ---\n{context_summary}"
-                            
-                            context_data["sources_used"].append({
-                                "type": "document",
-                                "filename": filename,
-                                "title": document.title,
-                                "chunks_count": document.chunks_count,
-                                "file_type": metadata.get("file_type", "txt"),
-                                "file_size": len(content),
-                                "summary": context_summary[:200] + "..."
-                            })
-                            
-                            print(f"✅ Processed context document: {filename}")
-                        
-                    except Exception as e:
-                        print(f"⚠️ Error processing context document {i+1}: {e}")
-                        context_data["sources_used"].append({
-                            "type": "document",
-                            "filename": doc_data.get("filename", f"document_{i+1}"),
-                            "error": str(e)
-                        })
-            
+        if not website_urls and not context_documents:
             return context_data
+        
+        start_time = time.time()
+        print(
+            f"🔄 Gathering context from {len(website_urls)} website URLs and "
+            f"{len(context_documents)} context documents (concurrency {self.context_concurrency})..."
+        )
+        
+        semaphore = asyncio.Semaphore(self.context_concurrency)
+        tasks = [
+            self._run_context_source(
+                semaphore,
+                self._process_website_source(user_id, url),
+                error_source={"type": "website", "url": url},
+                label=url,
+                on_event=on_event
+            )
+            for url in website_urls
+        ]
+        tasks += [
+            self._run_context_source(
+                semaphore,
+                self._process_document_source(user_id, i, doc_data),
+                error_source={"type": "document", "filename": doc_data.get("filename", f"document_{i+1}")},
+                label=doc_data.get("filename", f"document_{i+1}"),
+                on_event=on_event
+            )
+            for i, doc_data in enumerate(context_documents)
+        ]
+        
+        # gather preserves input order, so the combined context is deterministic
+        for result in await asyncio.gather(*tasks):
+            if not result:
+                continue
+            if result.get("content_key"):
+                context_data[result["content_key"]] += result["content"]
+            context_data["sources_used"].append(result["source"])
+        
+        failed = sum(1 for source in context_data["sources_used"] if "error" in source)
+        print(
+            f"✅ Gathered context from {len(context_data['sources_used']) - failed} sources "
+            f"({failed} failed) in {time.time() - start_time:.2f}s"
+        )
+        return context_data
+    
+    async def _run_context_source(
+        self,
+        semaphore: asyncio.Semaphore,
+        source_coro,
+        error_source: Dict[str, Any],
+        label: str,
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Run one context source under the concurrency cap and timeout, converting failures to error entries"""
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(source_coro, timeout=self.context_source_timeout)
+            except asyncio.TimeoutError:
+                # The cancelled ingestion marks its RAG document failed; blocking calls it left
+                # running in threads end within their own request timeouts
+                print(f"⚠️ Timed out processing context source {label} after {self.context_source_timeout}s")
+                result = {"source": {**error_source, "error": f"Timed out after {self.context_source_timeout}s"}}
+            except Exception as e:
+                print(f"⚠️ Error processing context source {label}: {e}")
+                result = {"source": {**error_source, "error": str(e)}}
+        
+        if result and on_event:
+            on_event("source_processed", result["source"])
+        return result
+    
+    async def _process_website_source(self, user_id: int, url: str) -> Optional[Dict[str, Any]]:
+        """Ingest a website and summarize it with a query scoped to that document"""
+        document = await rag_service.process_website(
+            user_id=user_id,
+            url=url,
+            title=f"Context from {url}",
+            max_pages=1
+        )
+        
+        # Query only the just-processed website, not the user's whole namespace
+        query_result = await rag_service.query_documents(
+            user_id=user_id,
+            query="Summarize the main content and key information from this website",
+            max_results=3,
+            document_ids=[document.id]
+        )
+        
+        if not query_result["sources"]:
+            return None
+        
+        website_summary = query_result["answer"]
+        return {
+            "content_key": "website_content",
+            "content": f"\n\n--- Content from {url} ---\n{website_summary}",
+            "source": {
+                "type": "website",
+                "url": url,
+                "title": document.title,
+                "chunks_count": document.chunks_count,
+                "summary": website_summary[:200] + "..."
+            }
+        }
+    
+    async def _process_document_source(self, user_id: int, index: int, doc_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Ingest an uploaded context document and summarize it with a query scoped to that document"""
+        filename = doc_data.get("filename", f"context_document_{index+1}")
+        content = doc_data.get("content", "")
+        metadata = doc_data.get("metadata", {})
+        
+        if not content.strip():
+            print(f"⚠️ Empty content in document: {filename}")
+            return None
+        
+        # Fast path: a small document fits in the prompt as-is, so skip embed/upsert/query/summarize
+        token_count = embedding_service.count_tokens(content)
+        if token_count <= self.inline_context_max_tokens:
+            print(f"⚡ Inlining small context document: {filename} ({token_count} tokens)")
             
-        except Exception as e:
-            print(f"❌ Error gathering RAG context: {e}")
-            return context_data
+            if self.index_inlined_context:
+                self._index_in_background(user_id, filename, content, metadata)
+            
+            return {
+                "content_key": "context_content",
+                "content": f"\n\n--- Document: {filename} ---\n{content.strip()}",
+                "source": {
+                    "type": "document",
+                    "filename": filename,
+                    "title": f"Context: {filename}",
+                    "chunks_count": 0,
+                    "file_type": metadata.get("file_type", "txt"),
+                    "file_size": len(content),
+                    "token_count": token_count,
+                    "inlined": True,
+                    "summary": content.strip()[:200] + "..."
+                }
+            }
+        
+        document = await rag_service.process_document(
+            user_id=user_id,
+            file_content=content,
+            filename=filename,
+            file_type=metadata.get("file_type", "txt"),
+            title=f"Context: {filename}",
+            metadata=metadata
+        )
+        
+        # Query only the just-processed document, not the user's whole namespace
+        query_result = await rag_service.query_documents(
+            user_id=user_id,
+            query="Summarize the key points and important information from this document",
+            max_results=3,
+            document_ids=[document.id]
+        )
+        
+        if not query_result["sources"]:
+            return None
+        
+        context_summary = query_result["answer"]
+        print(f"✅ Processed context document: {filename}")
+        return {
+            "content_key": "context_content",
+            "content": f"\n\n--- Document: {filename} ---\n{context_summary}",
+            "source": {
+                "type": "document",
+                "filename": filename,
+                "title": document.title,
+                "chunks_count": document.chunks_count,
+                "file_type": metadata.get("file_type", "txt"),
+                "file_size": len(content),
+                "summary": context_summary[:200] + "..."
+            }
+        }
+    
+    def _index_in_background(self, user_id: int, filename: str, content: str, metadata: Dict[str, Any]):
+        """
+        Index an inlined context document into the user's RAG library without blocking generation
+        
+        Documents are keyed by the SHA-256 of their content, so the same file used in
+        many generations is indexed once; at most PRESENTATION_INDEX_CONCURRENCY
+        documents are embedded at a time.
+        """
+        sha256 = content_hash(content)
+        key = (user_id, sha256)
+        if key in self._indexing:
+            return
+        self._indexing.add(key)
+        
+        async def index_document():
+            try:
+                async with self._index_semaphore:
+                    if await asyncio.to_thread(self._is_indexed, user_id, filename, sha256):
+                        return
+                    await rag_service.process_document(
+                        user_id=user_id,
+                        file_content=content,
+                        filename=filename,
+                        file_type=metadata.get("file_type", "txt"),
+                        title=f"Context: {filename}",
+                        metadata={**metadata, "content_sha256": sha256}
+                    )
+            except Exception as e:
+                print(f"⚠️ Background indexing failed for {filename}: {e}")
+            finally:
+                self._indexing.discard(key)
+        
+        # Keep a reference so the task isn't garbage collected before it finishes
+        task = asyncio.create_task(index_document())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    def _is_indexed(self, user_id: int, filename: str, sha256: str) -> bool:
+        """Whether the user's RAG library already holds this content (blocking)"""
+        db = SessionLocal()
+        try:
+            documents = db.query(RAGDocument.document_metadata).filter(
+                RAGDocument.user_id == user_id,
+                RAGDocument.filename == filename,
+                RAGDocument.status != "failed"
+            ).all()
+            return any((metadata or {}).get("content_sha256") == sha256 for (metadata,) in documents)
+        finally:
+            db.close()
     
     def _build_enhanced_context(
         self,
@@ -295,7 +615,12 @@ class UnifiedPresentationService:
         slides_count: int,
         language: str
     ) -> List[str]:
-        """Generate presentation outline with enhanced context"""
+        """
+        Generate presentation outline with enhanced context
+        
+        Raises:
+            Exception: If the model call fails; the caller decides on a fallback
+        """
         
         outline_template = """Based on the following comprehensive context, generate a structured presentation outline with exactly {slides_count} main topics.
 
@@ -327,33 +652,27 @@ Generate exactly {slides_count} topics now:"""
         prompt_template = PromptTemplate.from_template(outline_template)
         chain = prompt_template | self.model | StrOutputParser()
         
-        try:
-            outline_text = ""
-            async for chunk in chain.astream({
-                "enhanced_context": enhanced_context,
-                "slides_count": slides_count,
-                "language": language
-            }):
-                outline_text += chunk
-            
-            # Parse outline into list
-            outline_lines = [line.strip() for line in outline_text.split('\n') if line.strip()]
-            
-            # Ensure we have exactly the requested number of slides
-            if len(outline_lines) > slides_count:
-                outline_lines = outline_lines[:slides_count]
-            elif len(outline_lines) < slides_count:
-                # Pad with generic topics if needed
-                while len(outline_lines) < slides_count:
-                    outline_lines.append(f"Additional Topic {len(outline_lines) + 1}")
-            
-            print(f"✅ Generated outline with {len(outline_lines)} topics")
-            return outline_lines
-            
-        except Exception as e:
-            print(f"❌ Error generating outline: {e}")
-            # Fallback outline
-            return [f"Slide {i+1} Topic" for i in range(slides_count)]
+        outline_text = ""
+        async for chunk in chain.astream({
+            "enhanced_context": enhanced_context,
+            "slides_count": slides_count,
+            "language": language
+        }):
+            outline_text += chunk
+        
+        # Parse outline into list
+        outline_lines = [line.strip() for line in outline_text.split('\n') if line.strip()]
+        
+        # Ensure we have exactly the requested number of slides
+        if len(outline_lines) > slides_count:
+            outline_lines = outline_lines[:slides_count]
+        elif len(outline_lines) < slides_count:
+            # Pad with generic topics if needed
+            while len(outline_lines) < slides_count:
+                outline_lines.append(f"Additional Topic {len(outline_lines) + 1}")
+        
+        print(f"✅ Generated outline with {len(outline_lines)} topics")
+        return outline_lines
     
     async def _generate_contextual_slides(
         self,
@@ -363,9 +682,18 @@ Generate exactly {slides_count} topics now:"""
         language: str,
         tone: str,
         slides_count: int,
-        color_theme: str
+        color_theme: str,
+        on_section: Optional[Callable[[int, str], None]] = None
     ) -> str:
-        """Generate detailed slides with enhanced context"""
+        """
+        Generate detailed slides with enhanced context
+        
+        If on_section is given, it is called with (index, xml) as soon as each
+        </SECTION> closes in the model stream.
+        
+        Raises:
+            Exception: If the model call fails; the caller decides on a fallback
+        """
         
         slides_template = """You are an expert presentation designer. Create an engaging presentation in XML format using the provided context and outline.
 
@@ -488,25 +816,25 @@ Create a complete XML presentation now:"""
         prompt_template = PromptTemplate.from_template(slides_template)
         chain = prompt_template | self.model | StrOutputParser()
         
-        try:
-            presentation_xml = ""
-            async for chunk in chain.astream({
-                "title": title,
-                "language": language,
-                "tone": tone,
-                "slides_count": slides_count,
-                "color_theme": color_theme,
-                "enhanced_context": enhanced_context,
-                "outline_formatted": "\n".join([f"{i+1}. {topic}" for i, topic in enumerate(outline)])
-            }):
-                presentation_xml += chunk
+        presentation_xml = ""
+        stream_parser = SlideStreamParser()
+        async for chunk in chain.astream({
+            "title": title,
+            "language": language,
+            "tone": tone,
+            "slides_count": slides_count,
+            "color_theme": color_theme,
+            "enhanced_context": enhanced_context,
+            "outline_formatted": "\n".join([f"{i+1}. {topic}" for i, topic in enumerate(outline)])
+        }):
+            presentation_xml += chunk
             
-            print(f"✅ Generated presentation XML ({len(presentation_xml)} characters)")
-            return presentation_xml
-            
-        except Exception as e:
-            print(f"❌ Error generating slides: {e}")
-            return f"<PRESENTATION><SECTION><H1>Error generating presentation: {str(e)}</H1></SECTION></PRESENTATION>"
+            if on_section:
+                for slide in stream_parser.feed(chunk):
+                    on_section(slide["position"], slide["xml"])
+        
+        print(f"✅ Generated presentation XML ({len(presentation_xml)} characters)")
+        return presentation_xml
     
     async def _generate_slide_images(
         self,
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from app.short_video.db_models import ShortVideo
+from app.short_video.db_models import ShortVideo, ShortVideoJob
 from typing import Optional
 
 def create_short_video(
@@ -44,4 +44,26 @@ def delete_short_video(db: Session, video_id: int):
         db.delete(video)
         db.commit()
         return True
-    return False
\ No newline at end of file
+    return False
+
+def create_short_video_job(db: Session, user_id: int, prompt: str, priority: int = 0):
+    """Create a queued short video generation job"""
+    job = ShortVideoJob(
+        user_id=user_id,
+        prompt=prompt,
+        status="queued",
+        priority=priority,
+        attempts=0
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_short_video_job(db: Session, job_id: int):
+    """Get a specific short video generation job by ID"""
+    return db.query(ShortVideoJob).filter(ShortVideoJob.id == job_id).first()
+
+def get_user_short_video_jobs(db: Session, user_id: int):
+    """Get all short video generation jobs for a specific user, newest first"""
+    return db.query(ShortVideoJob).filter(ShortVideoJob.user_id == user_id).order_by(ShortVideoJob.id.desc()).all()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index, func
 from app.core.database import Base
 
 class ShortVideo(Base):
@@ -14,4 +14,29 @@ class ShortVideo(Base):
     watermark = Column(Boolean, default=True)
     person_generation = Column(String, default="allow_all")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+
+class ShortVideoJob(Base):
+    """A queued or running Veo generation; the ShortVideo row is created when it succeeds"""
+    __tablename__ = "short_video_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    prompt = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")  # queued | running | succeeded | failed
+    priority = Column(Integer, nullable=False, default=0)
+    operation_name = Column(String, nullable=True)  # Veo long-running operation, set once started
+    video_id = Column(Integer, ForeignKey("short_videos.id", ondelete="SET NULL"), nullable=True)
+    video_url = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    locked_until = Column(DateTime(timezone=True), nullable=True)  # Lease held by the process running the job
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_short_video_jobs_status", "status"),
+        Index("ix_short_video_jobs_user_id", "user_id"),
+    )
@@ -5,6 +5,7 @@ from datetime import datetime
 class ShortVideoRequest(BaseModel):
     user_id: int
     prompt: str
+    priority: Optional[int] = 0  # Higher priority jobs start first when Veo capacity is full
 
 class ShortVideoRequestFull(BaseModel):
     """Full request model for backward compatibility"""
@@ -33,4 +34,22 @@ class VideoGenerationResponse(BaseModel):
     success: bool
     video_url: Optional[str] = None
     message: Optional[str] = None
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+
+class ShortVideoJobResponse(BaseModel):
+    id: int
+    user_id: int
+    prompt: str
+    status: str  # queued | running | succeeded | failed
+    priority: int
+    video_id: Optional[int] = None
+    video_url: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,65 +1,118 @@
-from fastapi import APIRouter, HTTPException, Depends
+import json
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.short_video.models import (
     ShortVideoRequest,
     ShortVideoResponse,
+    ShortVideoJobResponse,
     VideoGenerationResponse
 )
 from app.short_video.services.gemini_video_service import gemini_video_service
+from app.short_video.services.video_job_service import video_job_service
+from app.core.storage_service import storage_service
 from app.short_video.crud import (
-    create_short_video,
+    create_short_video_job,
     get_short_video,
+    get_short_video_job,
     get_user_short_videos,
+    get_user_short_video_jobs,
     delete_short_video
 )
-from typing import List
+from typing import Any, List
 
 router = APIRouter()
 
-@router.post("/short-video/generate", response_model=ShortVideoResponse)
+JOB_EVENTS_REFRESH_SECONDS = 5
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/short-video/generate", response_model=ShortVideoJobResponse, status_code=202)
 async def generate_short_video(request: ShortVideoRequest, db: Session = Depends(get_db)):
-    """Generate a short video using AI and save to database"""
+    """
+    Queue a short video generation and return the job right away
+
+    Poll GET /short-video/jobs/{job_id} or subscribe to GET /short-video/jobs/{job_id}/events;
+    once the job has succeeded, video_id and video_url point to the saved short video.
+    """
     try:
-        print(f"🎬 Generating short video for user {request.user_id}")
+        print(f"🎬 Queueing short video for user {request.user_id}")
         print(f"📝 Prompt: {request.prompt}")
-        
-        # Generate video using Gemini with Veo 3.0
-        video_url = await gemini_video_service.generate_video(
-            prompt=request.prompt
-        )
-        
-        # Save to database with fixed values as requested
-        video_record = create_short_video(
+
+        job = create_short_video_job(
             db=db,
             user_id=request.user_id,
             prompt=request.prompt,
-            video_url=video_url,
-            aspect_ratio="16:9",
-            duration=8,
-            audio_generation=True,  # Boolean for database
-            watermark=False,        # Boolean for database
-            person_generation="allow-all"
-        )
-        
-        return ShortVideoResponse(
-            id=video_record.id,
-            user_id=video_record.user_id,
-            prompt=video_record.prompt,
-            video_url=video_record.video_url,
-            aspect_ratio=video_record.aspect_ratio,
-            duration=video_record.duration,
-            audio_generation=video_record.audio_generation,
-            watermark=video_record.watermark,
-            person_generation=video_record.person_generation,
-            created_at=video_record.created_at,
-            updated_at=video_record.updated_at
+            priority=request.priority or 0
         )
-        
+        video_job_service.submit(job)
+        return ShortVideoJobResponse.model_validate(job)
+
     except Exception as e:
         print(f"❌ Video generation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Video generation failed: {str(e)}")
 
+@router.get("/short-video/jobs/{job_id}", response_model=ShortVideoJobResponse)
+async def get_short_video_job_endpoint(job_id: int, db: Session = Depends(get_db)):
+    """Get the status of a short video generation job"""
+    job = get_short_video_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Short video job not found")
+    return ShortVideoJobResponse.model_validate(job)
+
+@router.get("/short-video/jobs/user/{user_id}", response_model=List[ShortVideoJobResponse])
+async def get_user_short_video_jobs_endpoint(user_id: int, db: Session = Depends(get_db)):
+    """Get all short video generation jobs for a specific user"""
+    return [ShortVideoJobResponse.model_validate(job) for job in get_user_short_video_jobs(db, user_id)]
+
+@router.get("/short-video/jobs/{job_id}/events")
+async def stream_short_video_job_events(job_id: int, request: Request):
+    """
+    Server-sent events for a job: a "status" event whenever it changes, ending with
+    "done" (succeeded) or "error" (failed)
+
+    Changes made in this process are pushed immediately; the job is also re-read
+    every JOB_EVENTS_REFRESH_SECONDS, which covers jobs run by another worker process.
+    """
+    def load_job():
+        db = SessionLocal()
+        try:
+            job = get_short_video_job(db, job_id)
+            return ShortVideoJobResponse.model_validate(job).model_dump(mode="json") if job else None
+        finally:
+            db.close()
+
+    if not await asyncio.to_thread(load_job):
+        raise HTTPException(status_code=404, detail="Short video job not found")
+
+    async def event_stream():
+        last = None
+        while not await request.is_disconnected():
+            job = await asyncio.to_thread(load_job)
+            if job != last:
+                last = job
+                if job["status"] == "succeeded":
+                    yield _sse_event("done", job)
+                    return
+                if job["status"] == "failed":
+                    yield _sse_event("error", job)
+                    return
+                yield _sse_event("status", job)
+            else:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+            await video_job_service.wait_for_change(job_id, JOB_EVENTS_REFRESH_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/short-video/{video_id}", response_model=ShortVideoResponse)
 async def get_short_video_endpoint(video_id: int, db: Session = Depends(get_db)):
     """Get a specific short video by ID"""
@@ -104,9 +157,14 @@ async def get_user_short_videos_endpoint(user_id: int, db: Session = Depends(get
 @router.delete("/short-video/{video_id}")
 async def delete_short_video_endpoint(video_id: int, db: Session = Depends(get_db)):
     """Delete a short video"""
+    video = get_short_video(db, video_id)
+    video_url = video.video_url if video else None
     success = delete_short_video(db, video_id)
     if not success:
         raise HTTPException(status_code=404, detail="Short video not found")
+    
+    # Drop this video's reference to the stored file (see object_index_service)
+    await storage_service.release(video_url)
     return {"message": "Short video deleted successfully"}
 
 @router.get("/short-video/status/check")
@@ -120,6 +178,7 @@ async def check_video_service_status():
             "status": "healthy" if service_healthy else "unhealthy",
             "service": "Gemini Video Generation with Veo 3.0",
             "model": "veo-3.0-generate-preview",
+            "job_queue": video_job_service.stats(),
             "api": "google.genai",
             "fixed_settings": {
                 "aspect_ratio": "16:9",
@@ -5,18 +5,33 @@ This service uses the working google.genai client for video generation
 import os
 import time
 import uuid
-from pathlib import Path
+import asyncio
+import requests
+from typing import Optional, Callable, Awaitable, Iterator
 from google import genai
 from google.genai import types
-from app.core.storage_service import upload_to_gcs
-import io
+from app.core.storage_service import storage_service
+from app.core.storage_backends import GCSStorageBackend
+from app.gcs.utils import GCSURLParser
+
+VEO_MODEL = "veo-3.0-generate-preview"
+VIDEO_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+VIDEO_DOWNLOAD_TIMEOUT_SECONDS = 60
 
 class GeminiVideoService:
     def __init__(self):
         """Initialize Gemini video service with Veo 3.0"""
+        # Operation polling: VEO_POLL_INITIAL_SECONDS, growing by VEO_POLL_BACKOFF up to VEO_POLL_MAX_SECONDS
+        self.poll_initial_seconds = float(os.getenv("VEO_POLL_INITIAL_SECONDS", "10"))
+        self.poll_max_seconds = float(os.getenv("VEO_POLL_MAX_SECONDS", "60"))
+        self.poll_backoff = float(os.getenv("VEO_POLL_BACKOFF", "1.5"))
+        self.poll_max_errors = int(os.getenv("VEO_POLL_MAX_ERRORS", "5"))
+        self.timeout_seconds = float(os.getenv("VEO_GENERATION_TIMEOUT_SECONDS", "1800"))
+
         try:
             # Initialize the Gemini client with API key
             api_key = os.getenv("GEMINI_API_KEY")
+            self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
             if api_key:
                 self.client = genai.Client(api_key=api_key)
             else:
@@ -29,103 +44,180 @@ class GeminiVideoService:
             print(f"❌ Error initializing Gemini Video Service: {e}")
             raise
     
-    async def generate_video(
+    def start_generation(self, prompt: str):
+        """
+        Submit a prompt to Veo 3.0 (blocking)
+
+        Returns:
+            The long-running operation; its name identifies the generation across restarts
+        """
+        print(f"🎬 Starting video generation with Veo 3.0...")
+        print(f"📝 Prompt: {prompt}")
+        operation = self.client.models.generate_videos(
+            model=VEO_MODEL,
+            prompt=prompt,
+        )
+        print(f"🔄 Video generation started. Operation: {operation.name}")
+        return operation
+
+    def get_operation(self, operation):
+        """
+        Refresh an operation, or rebuild one from its name (blocking)
+
+        Args:
+            operation: Operation returned by start_generation, or its name
+        """
+        if isinstance(operation, str):
+            operation = types.GenerateVideosOperation(name=operation)
+        return self.client.operations.get(operation)
+
+    async def wait_for_operation(
         self,
-        prompt: str,
-        # aspect_ratio: str = "16:9",
-        # duration: str = "8",
-        # audio_generation: bool = True,
-        # watermark: bool = False,
-        # person_generation: str = "allow_all"
-    ) -> str:
+        operation,
+        deadline: float,
+        on_poll: Optional[Callable[[], Awaitable[None]]] = None
+    ):
+        """
+        Poll an operation until it is done without blocking the event loop
+
+        The first check happens after VEO_POLL_INITIAL_SECONDS; the interval then grows
+        by VEO_POLL_BACKOFF up to VEO_POLL_MAX_SECONDS. Up to VEO_POLL_MAX_ERRORS
+        consecutive failed status checks are retried.
+
+        Args:
+            operation: Operation returned by start_generation, or its name
+            deadline: Unix time after which the generation counts as timed out
+            on_poll: Optional coroutine function awaited after every status check
+
+        Returns:
+            The finished operation
+
+        Raises:
+            TimeoutError: If the operation isn't done by the deadline
+        """
+        if isinstance(operation, str):
+            operation = types.GenerateVideosOperation(name=operation)
+
+        delay = self.poll_initial_seconds
+        errors = 0
+        while not operation.done:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError(f"Video generation timeout for operation {operation.name}")
+
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * self.poll_backoff, self.poll_max_seconds)
+            try:
+                operation = await asyncio.to_thread(self.get_operation, operation)
+                errors = 0
+            except Exception as e:
+                errors += 1
+                print(f"⚠️ Status check {errors}/{self.poll_max_errors} for {operation.name} failed: {e}")
+                if errors >= self.poll_max_errors:
+                    raise
+
+            if on_poll:
+                await on_poll()
+            if not operation.done:
+                print(f"⏳ Waiting for video generation... (next check in {delay:.0f}s)")
+
+        return operation
+
+    async def store_video(self, operation, prompt: str) -> str:
+        """
+        Download the video of a finished operation and upload it to storage
+
+        Returns:
+            str: URL of the uploaded video
+        """
+        if operation.error:
+            raise Exception(f"Video generation failed: {operation.error}")
+
+        # Check if generation was successful
+        if not operation.response or not operation.response.generated_videos:
+            raise Exception("Video generation failed - no videos in response")
+
+        # Create unique filename
+        safe_prompt = "".join(c for c in prompt if c.isalnum() or c in (' ', '-', '_')).strip()
+        safe_prompt = safe_prompt.replace(' ', '_')[:30]
+        unique_id = uuid.uuid4().hex[:8]
+        timestamp = int(time.time())
+        aspect_suffix = "16x9"  # Fixed aspect ratio since it's always 16:9
+        filename = f"short_video_{aspect_suffix}_{safe_prompt}_{timestamp}_{unique_id}.mp4"
+
+        print(f"💾 Streaming video to storage...")
+        video_url = await storage_service.upload_stream(
+            self._video_chunks(operation.response.generated_videos[0].video),
+            filename,
+            "video/mp4"
+        )
+
+        print(f"✅ Video generated and uploaded successfully!")
+        print(f"🔗 Video URL: {video_url}")
+        return video_url
+
+    def _video_chunks(self, video) -> Iterator[bytes]:
+        """
+        Yield the generated video in VIDEO_DOWNLOAD_CHUNK_SIZE chunks (blocking)
+
+        Videos hosted by the Gemini API are streamed over HTTP and Vertex AI output in
+        GCS is read in ranges, so neither is held in memory or written to disk; inline
+        video bytes are sliced as they are.
+        """
+        if video.video_bytes:
+            for offset in range(0, len(video.video_bytes), VIDEO_DOWNLOAD_CHUNK_SIZE):
+                yield video.video_bytes[offset:offset + VIDEO_DOWNLOAD_CHUNK_SIZE]
+            return
+
+        if not video.uri:
+            raise Exception("Video generation failed - video has neither a URI nor bytes")
+
+        if video.uri.startswith("gs://"):
+            bucket_name, file_path = GCSURLParser.parse_gcs_url(video.uri)
+            yield from GCSStorageBackend(bucket_name).stream(file_path, chunk_size=VIDEO_DOWNLOAD_CHUNK_SIZE)
+            return
+
+        if not self.api_key:
+            # Without an API key only the client can authorize the download; it returns the whole file
+            yield self.client.files.download(file=video)
+            return
+
+        with requests.get(
+            video.uri,
+            headers={"x-goog-api-key": self.api_key},
+            stream=True,
+            timeout=VIDEO_DOWNLOAD_TIMEOUT_SECONDS
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=VIDEO_DOWNLOAD_CHUNK_SIZE):
+                if chunk:
+                    yield chunk
+
+    async def generate_video(self, prompt: str) -> str:
         """
         Generate video using Gemini with Veo 3.0 and upload to GCS
-        
+
+        Waits for the whole generation; routes should submit a job through
+        video_job_service instead, which survives restarts.
+
         Args:
             prompt (str): Text description for the video
-        
+
         Returns:
             str: URL of the uploaded video
         """
         try:
-            print(f"🎬 Starting video generation with Veo 3.0...")
-            print(f"📝 Prompt: {prompt}")
-            # print(f"📐 Aspect ratio: {aspect_ratio}")
-            # print(f"👥 Person generation: {person_generation}")
-            
             start_time = time.time()
-            
-            # Create negative prompt for better quality
-            #negative_prompt = "blurry, low quality, distorted faces, bad lighting, shaky camera, poor audio"
-            
-            # Generate video using Veo 3.0 model
-            print("🔄 Sending request to Veo 3.0...")
-            operation = self.client.models.generate_videos(
-                model="veo-3.0-generate-preview",
-                prompt=prompt,
-                # negative_prompt=negative_prompt,
-                # aspect_ratio=aspect_ratio,
-                # person_generation=person_generation,
-            )
-            
-            print(f"🔄 Video generation started. Operation: {operation.name}")
-            
-            # Poll the operation status until the video is ready
-            max_wait_time = 1800  # 30 minutes timeout
-            while not operation.done:
-                elapsed_time = time.time() - start_time
-                
-                if elapsed_time > max_wait_time:
-                    raise Exception(f"Video generation timeout after {max_wait_time} seconds")
-                
-                print(f"⏳ Waiting for video generation... ({elapsed_time:.0f}s elapsed)")
-                time.sleep(15)  # Check every 15 seconds
-                operation = self.client.operations.get(operation)
-            
-            # Check if generation was successful
-            if not hasattr(operation.response, 'generated_videos') or not operation.response.generated_videos:
-                raise Exception("Video generation failed - no videos in response")
-            
-            # Get the generated video
-            generated_video = operation.response.generated_videos[0]
-            
-            print(f"💾 Downloading video...")
-            
-            # Download video data
-            self.client.files.download(file=generated_video.video)
-            
-            # Create unique filename
-            safe_prompt = "".join(c for c in prompt if c.isalnum() or c in (' ', '-', '_')).strip()
-            safe_prompt = safe_prompt.replace(' ', '_')[:30]
-            unique_id = uuid.uuid4().hex[:8]
-            timestamp = int(time.time())
-            aspect_suffix = "16x9"  # Fixed aspect ratio since it's always 16:9
-            filename = f"short_video_{aspect_suffix}_{safe_prompt}_{timestamp}_{unique_id}.mp4"
-            
-            # Save video temporarily to get file data
-            temp_path = Path(f"/tmp/{filename}")
-            generated_video.video.save(str(temp_path))
-            
-            # Read the video file and upload to GCS
-            with open(temp_path, 'rb') as video_file:
-                video_data = video_file.read()
-                file_obj = io.BytesIO(video_data)
-                video_url = upload_to_gcs(file_obj, filename, "video/mp4")
-            
-            # Clean up temporary file
-            if temp_path.exists():
-                temp_path.unlink()
-            
-            print(f"✅ Video generated and uploaded successfully!")
-            print(f"🔗 Video URL: {video_url}")
+            operation = await asyncio.to_thread(self.start_generation, prompt)
+            operation = await self.wait_for_operation(operation, start_time + self.timeout_seconds)
+            video_url = await self.store_video(operation, prompt)
             print(f"⏱️ Total generation time: {time.time() - start_time:.1f} seconds")
-            
             return video_url
-            
+
         except Exception as e:
             print(f"❌ Error generating video: {e}")
             raise Exception(f"Video generation failed: {str(e)}")
-    
+
     def test_connection(self) -> bool:
         """Test if the Gemini video service is working"""
         try:
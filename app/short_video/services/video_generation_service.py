@@ -4,11 +4,12 @@ import requests
 import time
 import base64
 import uuid
+import asyncio
+from typing import Iterator
 from google.oauth2 import service_account
 from google.auth.transport.requests import Request
 from google.cloud import storage
-from app.core.storage_service import upload_to_gcs
-import io
+from app.core.storage_service import storage_service
 
 # CONFIGURATION
 PROJECT_ID = "intrepid-stock-394612"  # Veo project ID
@@ -17,6 +18,15 @@ API_ENDPOINT = "us-central1-aiplatform.googleapis.com"
 MODEL_ID = "veo-3.0-generate-preview"
 GCS_BUCKET_NAME = "deck123"
 
+# Base64 characters decoded per chunk (a multiple of 4 decodes to 768 KB)
+B64_DECODE_CHUNK_CHARS = 1024 * 1024
+
+
+def _b64decode_chunks(encoded: str) -> Iterator[bytes]:
+    """Decode an unbroken base64 string (as returned in JSON) chunk by chunk"""
+    for offset in range(0, len(encoded), B64_DECODE_CHUNK_CHARS):
+        yield base64.b64decode(encoded[offset:offset + B64_DECODE_CHUNK_CHARS])
+
 class VideoGenerationService:
     def __init__(self):
         self.project_id = PROJECT_ID
@@ -80,7 +90,7 @@ class VideoGenerationService:
         """Generate video using Veo 3.0 model and upload to GCS"""
         try:
             # Get access token
-            access_token = self.get_access_token()
+            access_token = await asyncio.to_thread(self.get_access_token)
             
             # Build the request payload
             payload = {
@@ -106,7 +116,7 @@ class VideoGenerationService:
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(url, headers=headers, json=payload)
+            response = await asyncio.to_thread(requests.post, url, headers=headers, json=payload, timeout=60)
             
             if response.status_code != 200:
                 raise Exception(f"API call failed with status {response.status_code}: {response.text}")
@@ -134,17 +144,22 @@ class VideoGenerationService:
             "Content-Type": "application/json"
         }
         
-        max_attempts = 30  # Maximum polling attempts (10 minutes)
+        # Non-blocking polling, backing off from 10s to at most 60s, for up to 30 minutes
+        deadline = time.time() + 1800
+        delay = 10
         attempt = 0
         
-        while attempt < max_attempts:
+        while time.time() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 60)
+            attempt += 1
             try:
-                fetch_resp = requests.post(fetch_url, headers=fetch_headers, json=fetch_payload)
+                fetch_resp = await asyncio.to_thread(
+                    requests.post, fetch_url, headers=fetch_headers, json=fetch_payload, timeout=60
+                )
                 
                 if fetch_resp.status_code != 200:
                     print(f"Fetch operation failed with status {fetch_resp.status_code}")
-                    time.sleep(20)
-                    attempt += 1
                     continue
                 
                 fetch_json = fetch_resp.json()
@@ -169,31 +184,23 @@ class VideoGenerationService:
                     else:
                         video_b64 = video_dict
                     
-                    # Decode video data
-                    video_data = base64.b64decode(video_b64)
-                    
                     # Create unique filename
                     safe_prompt = "".join(c for c in prompt if c.isalnum() or c in (' ', '-', '_')).strip()
                     safe_prompt = safe_prompt.replace(' ', '_')[:30]
                     unique_id = uuid.uuid4().hex[:8]
                     filename = f"short_video_{safe_prompt}_{unique_id}.mp4"
                     
-                    # Upload to GCS
-                    file_obj = io.BytesIO(video_data)
-                    video_url = upload_to_gcs(file_obj, filename, "video/mp4")
+                    # Decode while uploading, so the decoded video is never held in memory as a whole
+                    video_url = await storage_service.upload_stream(_b64decode_chunks(video_b64), filename, "video/mp4")
                     
                     print(f"Video generated and uploaded successfully: {video_url}")
                     return video_url
                 
                 else:
-                    print(f"No video data found yet. Attempt {attempt + 1}/{max_attempts}. Waiting 20 seconds...")
-                    time.sleep(20)
-                    attempt += 1
+                    print(f"No video data found yet. Attempt {attempt}. Waiting {delay:.0f} seconds...")
                     
             except Exception as e:
-                print(f"Error during polling attempt {attempt + 1}: {e}")
-                time.sleep(20)
-                attempt += 1
+                print(f"Error during polling attempt {attempt}: {e}")
         
         raise Exception("Video generation timed out after maximum polling attempts")
 
@@ -0,0 +1,358 @@
+"""
+Video Job Service - Durable queue for Veo video generation jobs
+"""
+import os
+import asyncio
+import itertools
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, List, Set
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.short_video.db_models import ShortVideo, ShortVideoJob
+from app.short_video.services.gemini_video_service import gemini_video_service
+from app.core.storage_service import storage_service
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+
+class VideoJobService:
+    """
+    Runs short video generations in the background, persisted in short_video_jobs.
+
+    Routes create a job row and return; the job is queued in an in-process priority
+    queue (higher priority first, then oldest first) served by VEO_MAX_CONCURRENT_OPERATIONS
+    workers, which caps how many Veo operations this process has in flight. A worker
+    starts the Veo operation, stores its name on the job and polls it with
+    non-blocking, backed-off sleeps, then uploads the video and creates the
+    ShortVideo row in the same transaction that marks the job succeeded.
+
+    A worker holds a lease on its job (locked_until, renewed on every status check
+    and periodically while the video is stored) and only claims jobs whose lease is
+    free, so several processes can share the table without running a job twice; a
+    job that is no longer running when its video is stored is not completed again. On startup, and every VEO_JOB_LEASE_SECONDS
+    afterwards, jobs without a live lease are picked up again: queued jobs start
+    from scratch and started ones re-attach to their Veo operation by name, so a
+    restart neither loses nor re-bills a generation. Jobs that were already running
+    are resumed ahead of new ones.
+    """
+
+    def __init__(self):
+        self.max_concurrent = max(1, int(os.getenv("VEO_MAX_CONCURRENT_OPERATIONS", "2")))
+        self.lease_seconds = int(os.getenv("VEO_JOB_LEASE_SECONDS", "180"))
+        self.max_attempts = int(os.getenv("VEO_JOB_MAX_ATTEMPTS", "3"))
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending: Set[int] = set()
+        self._running: Set[int] = set()
+        self._changed: Dict[int, asyncio.Event] = {}
+        self._sequence = itertools.count()
+
+    async def startup(self):
+        """Start the workers and the resume sweep; call once the event loop is running"""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        # Queue unfinished jobs before any new submission so resumed operations go first
+        await self._resume()
+        self._tasks = [
+            asyncio.create_task(self._worker(index), name=f"veo-job-worker-{index}")
+            for index in range(self.max_concurrent)
+        ]
+        self._tasks.append(asyncio.create_task(self._sweep(), name="veo-job-sweep"))
+        print(f"🎞️ Video job queue started with {self.max_concurrent} workers")
+
+    async def close(self):
+        """
+        Stop the workers
+
+        In-flight jobs stay in the database with their operation name and are resumed
+        by the next process once their lease expires.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+        self._running.clear()
+
+    def submit(self, job: ShortVideoJob):
+        """
+        Queue a freshly created job
+
+        The job is only held in memory until a worker claims it; if this process
+        stops first, the sweep in any process picks it up from the database.
+        """
+        self._enqueue(job.id, job.priority, resumed=False)
+
+    async def wait_for_change(self, job_id: int, timeout: float) -> bool:
+        """
+        Wait until this process updates a job, or until timeout
+
+        Returns:
+            True if the job changed; False on timeout (it may still have changed in another process)
+        """
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if self._changed.get(job_id) is event and event.is_set():
+                self._changed.pop(job_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue size and in-flight operations of this process"""
+        return {
+            "max_concurrent_operations": self.max_concurrent,
+            "queued": len(self._pending) - len(self._running),
+            "running": len(self._running),
+            "started": bool(self._tasks)
+        }
+
+    def _enqueue(self, job_id: int, priority: int, resumed: bool):
+        if self._queue is None:
+            print(f"⚠️ Video job queue not started; job {job_id} will be picked up on startup")
+            return
+        if job_id in self._pending:
+            return
+        self._pending.add(job_id)
+        # Resumed operations are already running at Veo, so they go first
+        self._queue.put_nowait((0 if resumed else 1, -priority, next(self._sequence), job_id))
+
+    def _notify(self, job_id: int):
+        event = self._changed.pop(job_id, None)
+        if event:
+            event.set()
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, _, job_id = await self._queue.get()
+            try:
+                self._running.add(job_id)
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Video job worker {index} failed on job {job_id}: {e}")
+            finally:
+                self._running.discard(job_id)
+                self._pending.discard(job_id)
+                self._queue.task_done()
+
+    async def _sweep(self):
+        """Pick up jobs whose lease expired (e.g. their process died) every lease period"""
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            await self._resume()
+
+    async def _resume(self):
+        """Queue active jobs nobody holds a lease on"""
+        try:
+            for job_id, priority, started in await asyncio.to_thread(self._find_unleased):
+                self._enqueue(job_id, priority, resumed=started)
+        except Exception as e:
+            print(f"⚠️ Could not look up video jobs to resume: {e}")
+
+    async def _run(self, job_id: int):
+        """Start or re-attach to the job's Veo operation and see it through to a stored video"""
+        job = await asyncio.to_thread(self._claim, job_id)
+        if not job:
+            return
+        self._notify(job_id)
+
+        try:
+            if job["attempts"] > self.max_attempts:
+                raise Exception(f"Gave up after {self.max_attempts} attempts")
+
+            operation = job["operation_name"]
+            if not operation:
+                operation = await asyncio.to_thread(gemini_video_service.start_generation, job["prompt"])
+                job["started_at"] = await asyncio.to_thread(self._mark_started, job_id, operation.name)
+                self._notify(job_id)
+            else:
+                print(f"🔁 Resuming video job {job_id} (operation {operation})")
+
+            started_at = job["started_at"]
+            if started_at.tzinfo is None:
+                started_at = started_at.replace(tzinfo=timezone.utc)
+            deadline = started_at.timestamp() + gemini_video_service.timeout_seconds
+
+            async def renew_lease():
+                await asyncio.to_thread(self._renew_lease, job_id)
+
+            operation = await gemini_video_service.wait_for_operation(operation, deadline, on_poll=renew_lease)
+            await renew_lease()
+
+            # The transfer can outlast a lease, so keep renewing it until the video is stored
+            heartbeat = asyncio.create_task(self._keep_lease(job_id))
+            try:
+                video_url = await gemini_video_service.store_video(operation, job["prompt"])
+            finally:
+                heartbeat.cancel()
+
+            if await asyncio.to_thread(self._complete, job_id, video_url):
+                print(f"✅ Video job {job_id} succeeded")
+            else:
+                print(f"⚠️ Video job {job_id} was already finished elsewhere; dropping duplicate video {video_url}")
+                await storage_service.release(video_url)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Video job {job_id} failed: {e}")
+            await asyncio.to_thread(self._fail, job_id, str(e))
+
+        self._notify(job_id)
+
+    async def _keep_lease(self, job_id: int):
+        """Renew the job's lease every third of a lease period until cancelled"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self._renew_lease, job_id)
+            except Exception as e:
+                print(f"⚠️ Could not renew lease of video job {job_id}: {e}")
+
+    # Blocking database helpers, run with asyncio.to_thread
+
+    def _claim(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Take the lease on an active job; None if it is finished or leased by someone else"""
+        now = datetime.now(timezone.utc)
+        db: Session = SessionLocal()
+        try:
+            claimed = db.query(ShortVideoJob).filter(
+                ShortVideoJob.id == job_id,
+                ShortVideoJob.status.in_(ACTIVE_JOB_STATUSES),
+                or_(ShortVideoJob.locked_until.is_(None), ShortVideoJob.locked_until < now)
+            ).update({
+                ShortVideoJob.status: JOB_RUNNING,
+                ShortVideoJob.attempts: ShortVideoJob.attempts + 1,
+                ShortVideoJob.locked_until: now + timedelta(seconds=self.lease_seconds)
+            }, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                return None
+
+            job = db.query(ShortVideoJob).filter(ShortVideoJob.id == job_id).first()
+            return {
+                "prompt": job.prompt,
+                "operation_name": job.operation_name,
+                "attempts": job.attempts,
+                "started_at": job.started_at
+            }
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _mark_started(self, job_id: int, operation_name: str) -> datetime:
+        """Record the Veo operation so the job can re-attach to it after a restart"""
+        started_at = datetime.now(timezone.utc)
+        self._update(job_id, operation_name=operation_name, started_at=started_at)
+        return started_at
+
+    def _renew_lease(self, job_id: int):
+        self._update(job_id, locked_until=datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds))
+
+    def _complete(self, job_id: int, video_url: str) -> bool:
+        """
+        Create the ShortVideo row and mark the job succeeded in one transaction
+
+        Returns:
+            False if the job is no longer running (e.g. another worker already stored its video)
+        """
+        db: Session = SessionLocal()
+        try:
+            job = db.query(ShortVideoJob).filter(ShortVideoJob.id == job_id).with_for_update().first()
+            if not job or job.status != JOB_RUNNING:
+                db.rollback()
+                return False
+
+            video = ShortVideo(
+                user_id=job.user_id,
+                prompt=job.prompt,
+                video_url=video_url,
+                aspect_ratio="16:9",
+                duration=8,
+                audio_generation=True,
+                watermark=False,
+                person_generation="allow-all"
+            )
+            db.add(video)
+            db.flush()
+
+            job.status = JOB_SUCCEEDED
+            job.video_id = video.id
+            job.video_url = video_url
+            job.error = None
+            job.locked_until = None
+            job.completed_at = datetime.now(timezone.utc)
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _fail(self, job_id: int, error: str):
+        """Mark the job failed unless it already finished (e.g. another worker stored its video)"""
+        db: Session = SessionLocal()
+        try:
+            db.query(ShortVideoJob).filter(
+                ShortVideoJob.id == job_id,
+                ShortVideoJob.status.in_(ACTIVE_JOB_STATUSES)
+            ).update({
+                ShortVideoJob.status: JOB_FAILED,
+                ShortVideoJob.error: error[:1000],
+                ShortVideoJob.locked_until: None,
+                ShortVideoJob.completed_at: datetime.now(timezone.utc)
+            }, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _update(self, job_id: int, **values):
+        db: Session = SessionLocal()
+        try:
+            db.query(ShortVideoJob).filter(ShortVideoJob.id == job_id).update(
+                {getattr(ShortVideoJob, key): value for key, value in values.items()},
+                synchronize_session=False
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _find_unleased(self) -> List[tuple]:
+        """(id, priority, has an operation) of active jobs nobody holds a lease on"""
+        now = datetime.now(timezone.utc)
+        db: Session = SessionLocal()
+        try:
+            rows = db.query(
+                ShortVideoJob.id, ShortVideoJob.priority, ShortVideoJob.operation_name
+            ).filter(
+                ShortVideoJob.status.in_(ACTIVE_JOB_STATUSES),
+                or_(ShortVideoJob.locked_until.is_(None), ShortVideoJob.locked_until < now)
+            ).order_by(ShortVideoJob.id).all()
+            return [(job_id, priority, operation_name is not None) for job_id, priority, operation_name in rows]
+        finally:
+            db.close()
+
+
+# Global video job service instance
+video_job_service = VideoJobService()